@@ -1,5 +1,10 @@
 from langchain.agents import create_agent
+from ai.compaction import ToolOutputCompactionMiddleware
+from ai.history import HistoryBudgetMiddleware
+from ai.instrumentation import ToolMetricsMiddleware
+from ai.memo import ToolMemoMiddleware
 from ai.tools.documents import document_tools
+from ai.tools.jobs import job_tools
 from ai.tools.movie_discovery import movie_tools
 
 
@@ -12,6 +17,8 @@ Rules:
 - Convert tool responses into natural language
 - If list_documents returns empty, reply:
   "You have no recent documents."
+- Some tools start a background job and return a job_id; tell the user it is
+  running and use get_job_status when they ask how it is going
 - Be concise and user-friendly
 """
 
@@ -19,8 +26,14 @@ Rules:
 def get_document_agent(llm, checkpointer=None):
     return create_agent(
         model=llm,
-        tools=document_tools,      # ✅ flat list
+        tools=document_tools + job_tools,
         system_prompt=SYSTEM_PROMPT,
+        middleware=[
+            HistoryBudgetMiddleware(llm, "document_agent"),
+            ToolMemoMiddleware(),
+            ToolOutputCompactionMiddleware(),
+            ToolMetricsMiddleware(),
+        ],
         checkpointer=checkpointer,
         name="document_agent",
     )
@@ -31,6 +44,12 @@ def get_movie_agent(llm, checkpointer=None):
         model=llm,
         tools=movie_tools,         # ✅ flat list
         system_prompt=SYSTEM_PROMPT,
+        middleware=[
+            HistoryBudgetMiddleware(llm, "movie_agent"),
+            ToolMemoMiddleware(),
+            ToolOutputCompactionMiddleware(),
+            ToolMetricsMiddleware(),
+        ],
         checkpointer=checkpointer,
         name="movie_agent",
     )
@@ -0,0 +1,24 @@
+from django.apps import AppConfig
+
+
+class AiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'ai'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_save
+
+        from ai import metrics, signals
+
+        # Registers the system checks
+        import ai.checks
+
+        connection_created.connect(metrics.install_query_timer, dispatch_uid="ai.metrics.query_timer")
+        post_save.connect(signals.document_saved, sender="directories.Directory", dispatch_uid="ai.signals.document_saved")
+
+        if settings.AGENT_WARMUP_ON_FIRST_REQUEST:
+            from ai.warmup import install_warmup_hook
+
+            install_warmup_hook()
@@ -0,0 +1,76 @@
+import itertools
+import json
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class ScriptExhausted(Exception):
+    """The graph asked the model for more replies than the turn's script has."""
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that replays a fixed list of replies, one per call.
+
+    The supervisor and both agents share one model, so a turn's script lists
+    every reply in the order the graph asks for them, e.g. handoff, tool call,
+    agent answer, supervisor answer. Each step is {"content": str} and/or
+    {"tool_calls": [{"name": str, "args": dict}]}. Streamed replies arrive
+    word by word, followed by one chunk with the tool calls.
+
+    Args:
+        latency (float): Seconds to sleep per call, to stand in for the API.
+    """
+
+    latency: float = 0.0
+    script: list = []
+    position: int = 0
+    calls: int = 0
+
+    @property
+    def _llm_type(self):
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        # Replies are scripted, so tool schemas are irrelevant
+        return self
+
+    def load(self, script):
+        """Start a new turn with `script`."""
+        self.script = script
+        self.position = 0
+
+    def _next_message(self):
+        if self.position >= len(self.script):
+            raise ScriptExhausted(f"Script has {len(self.script)} steps, the graph asked for more")
+        step = self.script[self.position]
+        self.position += 1
+        self.calls += 1
+
+        ids = itertools.count()
+        tool_calls = [
+            {"name": call["name"], "args": call.get("args", {}), "id": f"call_{self.calls}_{next(ids)}"}
+            for call in step.get("tool_calls", [])
+        ]
+        return AIMessage(content=step.get("content", ""), tool_calls=tool_calls)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message())])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        message = self._next_message()
+        for index, word in enumerate(message.content.split(" ") if message.content else []):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if index == 0 else f" {word}"))
+        if message.tool_calls:
+            tool_call_chunks = [
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                for index, call in enumerate(message.tool_calls)
+            ]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=tool_call_chunks))
@@ -0,0 +1,233 @@
+import json
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ai.benchmark.fakes import ScriptedChatModel
+from directories.models import Directory
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+FIXTURE = DATA_DIR / "benchmark.json"
+BASELINE = DATA_DIR / "benchmark_baseline.json"
+
+BENCHMARK_USERNAME = "agent-benchmark"
+DOCUMENT_PLACEHOLDER = "$doc:"
+HANDOFF_PREFIXES = ("transfer_to_", "transfer_back_to_")
+
+
+# -----------------------------
+# Tool timing and query counting
+# -----------------------------
+class ToolRecorder(BaseCallbackHandler):
+    """
+    Record wall time and DB queries for every tool run.
+
+    Tools run on worker threads, and Django connections are per thread, so the
+    query counter is attached to the running thread's connections when the tool
+    starts and removed when it ends.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.records = []  # (tool name, seconds, queries, failed)
+        self._running = {}
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        if name.startswith(HANDOFF_PREFIXES):
+            return
+
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        attached = list(connections.all())
+        for connection in attached:
+            connection.execute_wrappers.append(count_queries)
+        self._running[run_id] = (name, time.perf_counter(), queries, count_queries, attached)
+
+    def _finish(self, run_id, failed):
+        running = self._running.pop(run_id, None)
+        if running is None:
+            return
+        name, start, queries, count_queries, attached = running
+        for connection in attached:
+            connection.execute_wrappers.remove(count_queries)
+        self.records.append((name, time.perf_counter() - start, queries[0], failed))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id, failed=False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, failed=True)
+
+
+# -----------------------------
+# Fixture helpers
+# -----------------------------
+def load_fixture(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _seed_documents(user, documents):
+    # Every conversation starts from the same documents so write tools stay comparable
+    Directory.objects.filter(owner=user).delete()
+    created = Directory.objects.bulk_create(
+        Directory(owner=user, title=document["title"], content=document["content"]) for document in documents
+    )
+    return {document.title: document.id for document in created}
+
+
+def _resolve(value, document_ids):
+    # "$doc:<title>" in tool args stands for the seeded document's id
+    if isinstance(value, str) and value.startswith(DOCUMENT_PLACEHOLDER):
+        return document_ids[value[len(DOCUMENT_PLACEHOLDER):]]
+    if isinstance(value, dict):
+        return {key: _resolve(item, document_ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, document_ids) for item in value]
+    return value
+
+
+# -----------------------------
+# Running
+# -----------------------------
+def _percentiles(samples):
+    samples = sorted(samples)
+    p95 = statistics.quantiles(samples, n=20, method="inclusive")[-1] if len(samples) > 1 else samples[0]
+    return {"p50": round(statistics.median(samples) * 1000, 3), "p95": round(p95 * 1000, 3)}
+
+
+def run_benchmark(fixture, repeat=10, llm_latency=0.0, checkpointer=None, stdout=None):
+    """
+    Run every fixture conversation through the real supervisor graph `repeat` times.
+
+    The first pass is a warm-up and isn't measured. External services must
+    already point at local stand-ins, and the default database should be a
+    throwaway one: the run creates and finally deletes the BENCHMARK_USERNAME
+    user and its documents (the benchmark_agents command sets both up).
+
+    Args:
+        fixture (dict): {"documents": [...], "conversations": [...]}.
+        repeat (int): Measured passes over the conversations.
+        llm_latency (float): Seconds the scripted model waits per call.
+        checkpointer: Checkpointer for the graph (default: in-memory).
+
+    Returns:
+        dict: {"database": vendor, "turns": {...}, "tools": {...}} with p50/p95
+        in milliseconds.
+    """
+    # Imported here so the command doesn't load every agent graph just to parse its options
+    from ai.supervisor import get_supervisor
+
+    user, _ = get_user_model().objects.get_or_create(username=BENCHMARK_USERNAME)
+    model = ScriptedChatModel(latency=llm_latency)
+    graph = get_supervisor(model=model, checkpointer=checkpointer or InMemorySaver())
+
+    recorder = ToolRecorder()
+    turn_times = defaultdict(list)
+
+    try:
+        for iteration in range(repeat + 1):
+            measured = iteration > 0
+            records_before = len(recorder.records)
+
+            for conversation in fixture["conversations"]:
+                document_ids = _seed_documents(user, fixture.get("documents", []))
+                config = {
+                    "configurable": {"user_id": user.id, "thread_id": f"benchmark-{uuid.uuid4().hex}"},
+                    "callbacks": [recorder],
+                }
+                for number, turn in enumerate(conversation["turns"], start=1):
+                    model.load(_resolve(turn["script"], document_ids))
+                    start = time.perf_counter()
+                    graph.invoke({"messages": [HumanMessage(content=turn["user"])]}, config)
+                    elapsed = time.perf_counter() - start
+
+                    if model.position != len(model.script):
+                        raise RuntimeError(
+                            f"{conversation['name']} turn {number}: graph used {model.position} "
+                            f"of {len(model.script)} scripted replies"
+                        )
+                    if measured:
+                        turn_times[f"{conversation['name']} #{number}"].append(elapsed)
+
+            if not measured:
+                del recorder.records[records_before:]
+            if stdout:
+                stdout.write(f"  pass {iteration}/{repeat}{'' if measured else ' (warm-up)'} done")
+    finally:
+        user.delete()
+
+    tools = defaultdict(lambda: {"samples": [], "queries": [], "errors": 0})
+    for name, seconds, queries, failed in recorder.records:
+        tools[name]["samples"].append(seconds)
+        tools[name]["queries"].append(queries)
+        tools[name]["errors"] += failed
+
+    all_turns = [sample for samples in turn_times.values() for sample in samples]
+    return {
+        # Query counts depend on the backend, so baselines record which one
+        "database": connections["default"].vendor,
+        "turns": {key: _percentiles(samples) for key, samples in turn_times.items()},
+        "all_turns": _percentiles(all_turns),
+        "tools": {
+            name: {
+                "calls": len(stats["samples"]),
+                **_percentiles(stats["samples"]),
+                "queries": round(statistics.mean(stats["queries"]), 2),
+                "errors": stats["errors"],
+            }
+            for name, stats in sorted(tools.items())
+        },
+    }
+
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+def compare(results, baseline, tolerance=0.25, min_delta_ms=10.0):
+    """
+    List regressions versus a stored baseline.
+
+    A p95 regresses when it is both `tolerance` (relative) and `min_delta_ms`
+    (absolute) above the baseline; query counts regress on any increase, and
+    are only compared when both runs used the same database backend.
+
+    Returns:
+        list[str]: Human-readable regressions, empty if none.
+    """
+    regressions = []
+    same_database = baseline.get("database") in (None, results.get("database"))
+
+    def check_latency(label, current, previous):
+        limit = max(previous["p95"] * (1 + tolerance), previous["p95"] + min_delta_ms)
+        if current["p95"] > limit:
+            regressions.append(f"{label}: p95 {current['p95']:.1f} ms vs baseline {previous['p95']:.1f} ms")
+
+    for key, current in results["turns"].items():
+        if key in baseline.get("turns", {}):
+            check_latency(f"turn {key}", current, baseline["turns"][key])
+
+    for name, current in results["tools"].items():
+        previous = baseline.get("tools", {}).get(name)
+        if previous is None:
+            continue
+        check_latency(f"tool {name}", current, previous)
+        if same_database and current["queries"] > previous["queries"]:
+            regressions.append(f"tool {name}: {current['queries']} queries vs baseline {previous['queries']}")
+
+    return regressions
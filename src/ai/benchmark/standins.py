@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    # Set on the per-server subclass
+    latency = 0.0
+    stand_in = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method):
+        if self.latency:
+            time.sleep(self.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlparse(self.path)
+        self.stand_in.requests += 1
+        status, response = self.stand_in.respond(method, url.path, parse_qs(url.query), body)
+        self._reply(status, response)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class StandInServer:
+    """
+    Local HTTP server that answers like an external API, with a fixed delay.
+
+    Args:
+        latency (float): Seconds to wait before every response.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        handler = type(f"{type(self).__name__}Handler", (_StandInHandler,), {"latency": latency, "stand_in": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, method, path, query, body):
+        raise NotImplementedError
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class PermitPDPStandIn(StandInServer):
+    """
+    Answers the Permit SDK's `/allowed` and `/allowed/bulk` checks.
+
+    Args:
+        denied (set): (user_key, action) pairs to deny; everything else is allowed.
+    """
+
+    def __init__(self, latency=0.0, denied=()):
+        super().__init__(latency)
+        self.denied = set(denied)
+
+    def _allowed(self, request):
+        return (request["user"]["key"], request["action"]) not in self.denied
+
+    def respond(self, method, path, query, body):
+        path = path.rstrip("/")
+        if method == "POST" and path == "/allowed":
+            return 200, {"allow": self._allowed(json.loads(body or b"{}"))}
+        if method == "POST" and path == "/allowed/bulk":
+            return 200, {"allow": [{"allow": self._allowed(request)} for request in json.loads(body or b"[]")]}
+        return 404, {"detail": "Not found"}
+
+
+class TMDBStandIn(StandInServer):
+    """
+    Serves `/search/movie` and `/movie/<id>` from a fixed catalog.
+
+    Args:
+        movies (list): TMDB-shaped movie dicts (id, title, release_date, overview, genres, runtime).
+    """
+
+    def __init__(self, movies, latency=0.0):
+        super().__init__(latency)
+        self.movies = {movie["id"]: movie for movie in movies}
+
+    def respond(self, method, path, query, body):
+        if path == "/search/movie":
+            terms = (query.get("query") or [""])[0].lower().split()
+            results = [
+                {key: movie[key] for key in ("id", "title", "release_date", "overview")}
+                for movie in self.movies.values()
+                if any(term in f"{movie['title']} {movie['overview']}".lower() for term in terms)
+            ]
+            return 200, {"page": 1, "results": results, "total_results": len(results), "total_pages": 1}
+
+        if path.startswith("/movie/"):
+            movie_id = path.rsplit("/", 1)[-1]
+            movie = self.movies.get(int(movie_id)) if movie_id.isdigit() else None
+            if movie is None:
+                return 404, {"success": False, "status_code": 34, "status_message": "The resource you requested could not be found."}
+            return 200, movie
+
+        return 404, {"success": False, "status_message": "Invalid endpoint"}
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import math
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from ai.db import release_connections
+from ai.models import LLMCacheEntry
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize_message(message: dict) -> dict:
+    """
+    Keep only the parts of a serialized message that affect the model output.
+
+    Message ids, tool call ids and response metadata differ on every run and
+    would otherwise make identical conversations miss the cache.
+    """
+    kwargs = message.get("kwargs", {})
+    normalized = {
+        "type": kwargs.get("type"),
+        "content": kwargs.get("content"),
+        "name": kwargs.get("name"),
+    }
+    tool_calls = kwargs.get("tool_calls")
+    if tool_calls:
+        normalized["tool_calls"] = [{"name": call.get("name"), "args": call.get("args")} for call in tool_calls]
+    return normalized
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class DatabaseLLMCache(BaseCache):
+    """
+    LLM response cache stored in a Django database (Postgres or SQLite).
+
+    Exact mode matches on (llm_string, normalized messages); llm_string already
+    carries the model name, call parameters and bound tools. With an embeddings
+    model, a miss whose last message is a user turn is retried against earlier
+    entries with the same model, tools and preceding history, and served if the
+    user text is at least `similarity_threshold` cosine-similar.
+    """
+
+    # Check the size limit once every this many writes
+    evict_every = 100
+    # Semantic lookups compare against at most this many recent candidates
+    semantic_candidates = 200
+
+    def __init__(self, ttl=None, max_entries=None, embeddings=None, similarity_threshold=0.95, using="default"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.using = using
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._embedding_memo = {}
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # Keys
+    # -----------------------------
+    def _keys(self, prompt: str, llm_string: str):
+        messages = [_normalize_message(message) for message in json.loads(prompt)]
+        llm_hash = _sha256(llm_string)
+        key = _sha256(llm_hash + json.dumps(messages, sort_keys=True, default=str))
+
+        prefix_hash, query_text = "", ""
+        if messages and messages[-1]["type"] == "human" and isinstance(messages[-1]["content"], str):
+            prefix_hash = _sha256(json.dumps(messages[:-1], sort_keys=True, default=str))
+            query_text = messages[-1]["content"]
+        return key, llm_hash, prefix_hash, query_text
+
+    def _embed(self, text: str):
+        embedding = self._embedding_memo.get(text)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(text)
+            with self._lock:
+                if len(self._embedding_memo) >= 256:
+                    self._embedding_memo.clear()
+                self._embedding_memo[text] = embedding
+        return embedding
+
+    def _queryset(self):
+        queryset = LLMCacheEntry.objects.using(self.using)
+        if self.ttl:
+            queryset = queryset.filter(created_at__gte=timezone.now() - timedelta(seconds=self.ttl))
+        return queryset
+
+    # -----------------------------
+    # BaseCache interface
+    # -----------------------------
+    # LangChain's alookup/aupdate run these on executor threads, so each call
+    # gives its pooled connection back when it's done
+    def lookup(self, prompt, llm_string):
+        try:
+            return self._lookup(prompt, llm_string)
+        finally:
+            release_connections()
+
+    def update(self, prompt, llm_string, return_val):
+        try:
+            self._update(prompt, llm_string, return_val)
+        finally:
+            release_connections()
+
+    def _lookup(self, prompt, llm_string):
+        key, llm_hash, prefix_hash, query_text = self._keys(prompt, llm_string)
+
+        entry = self._queryset().filter(key=key).only("id", "response").first()
+        if entry is not None:
+            self._record_hit(entry)
+            return self._loads(entry.response)
+
+        if self.embeddings is not None and query_text:
+            entry = self._semantic_lookup(llm_hash, prefix_hash, query_text)
+            if entry is not None:
+                self._record_hit(entry, semantic=True)
+                return self._loads(entry.response)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _update(self, prompt, llm_string, return_val):
+        key, llm_hash, prefix_hash, query_text = self._keys(prompt, llm_string)
+
+        embedding = None
+        if self.embeddings is not None and query_text:
+            embedding = self._embed(query_text)
+
+        LLMCacheEntry.objects.using(self.using).update_or_create(
+            key=key,
+            defaults={
+                "llm_hash": llm_hash,
+                "prefix_hash": prefix_hash,
+                "query_text": query_text,
+                "embedding": embedding,
+                "response": self._dumps(return_val),
+                "created_at": timezone.now(),
+                "last_used_at": timezone.now(),
+            },
+        )
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        if evict:
+            self.evict()
+
+    def clear(self, **kwargs):
+        LLMCacheEntry.objects.using(self.using).all().delete()
+
+    # -----------------------------
+    # Semantic mode
+    # -----------------------------
+    def _semantic_lookup(self, llm_hash, prefix_hash, query_text):
+        embedding = self._embed(query_text)
+        candidates = (
+            self._queryset()
+            .filter(llm_hash=llm_hash, prefix_hash=prefix_hash, embedding__isnull=False)
+            .order_by("-last_used_at")
+            .only("id", "response", "embedding")[: self.semantic_candidates]
+        )
+
+        best, best_score = None, self.similarity_threshold
+        for candidate in candidates:
+            score = _cosine(embedding, candidate.embedding)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    # -----------------------------
+    # Eviction
+    # -----------------------------
+    def evict(self):
+        """
+        Delete expired entries and trim the table to `max_entries`,
+        least recently used first.
+
+        Returns:
+            int: Number of deleted entries.
+        """
+        entries = LLMCacheEntry.objects.using(self.using)
+        deleted = 0
+
+        if self.ttl:
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            deleted += entries.filter(created_at__lt=cutoff).delete()[0]
+
+        if self.max_entries:
+            stale_ids = entries.order_by("-last_used_at").values_list("id", flat=True)[self.max_entries:]
+            deleted += entries.filter(id__in=list(stale_ids)).delete()[0]
+
+        return deleted
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def _record_hit(self, entry, semantic=False):
+        LLMCacheEntry.objects.using(self.using).filter(id=entry.id).update(
+            hits=F("hits") + 1, last_used_at=timezone.now()
+        )
+        with self._lock:
+            self.hits += 1
+            if semantic:
+                self.semantic_hits += 1
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    # -----------------------------
+    # Serialization
+    # -----------------------------
+    def _dumps(self, generations) -> str:
+        stored = []
+        for generation in generations:
+            # Drop the message id so the graph assigns a fresh one and a replayed
+            # message never overwrites an earlier one in the same thread
+            message = getattr(generation, "message", None)
+            if message is not None:
+                generation = generation.model_copy(update={"message": message.model_copy(update={"id": None})})
+            stored.append(generation)
+        return dumps(stored)
+
+    def _loads(self, value: str):
+        return loads(value)
+
+
+# -----------------------------
+# Process-wide cache
+# -----------------------------
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Return the configured LLM cache, or None when LLM_CACHE_ENABLED is off.
+    """
+    global _llm_cache
+
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                embeddings = None
+                if settings.LLM_CACHE_SEMANTIC:
+                    from langchain_openai import OpenAIEmbeddings
+
+                    embeddings = OpenAIEmbeddings(
+                        model=settings.LLM_CACHE_EMBEDDING_MODEL,
+                        api_key=settings.OPENAI_API_KEY,
+                    )
+                _llm_cache = DatabaseLLMCache(
+                    ttl=settings.LLM_CACHE_TTL,
+                    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                    embeddings=embeddings,
+                    similarity_threshold=settings.LLM_CACHE_SIMILARITY_THRESHOLD,
+                    using=settings.LLM_CACHE_DATABASE,
+                )
+    return _llm_cache
@@ -0,0 +1,356 @@
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, Max, OuterRef, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from ai.db import release_connections
+from ai.models import AgentCheckpoint, AgentCheckpointWrite
+
+
+class DjangoCheckpointSaver(BaseCheckpointSaver[int]):
+    """
+    LangGraph checkpointer stored in the project database through the Django ORM.
+
+    Each checkpoint row carries its channel values inline, so loading the latest
+    state of a thread is one read on the (thread_id, checkpoint_ns, checkpoint_id)
+    unique index plus the pending writes of that checkpoint.
+
+    Args:
+        keep_last (int, optional): Checkpoints kept per thread when a thread is
+            trimmed after `prune_every` saves. None disables inline trimming.
+        prune_every (int): Trim a thread once every this many saves.
+        using (str): Database alias.
+    """
+
+    def __init__(self, *, serde=None, keep_last=None, prune_every=10, using="default"):
+        super().__init__(serde=serde)
+        # A run needs its current checkpoint and the parent it was forked from
+        self.keep_last = max(keep_last, 2) if keep_last else None
+        self.prune_every = max(prune_every, 1)
+        self.using = using
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def _checkpoints(self):
+        return AgentCheckpoint.objects.using(self.using)
+
+    def _writes(self):
+        return AgentCheckpointWrite.objects.using(self.using)
+
+    def _to_tuple(self, row):
+        writes = self._writes().filter(
+            thread_id=row.thread_id,
+            checkpoint_ns=row.checkpoint_ns,
+            checkpoint_id=row.checkpoint_id,
+        ).order_by("task_id", "idx")
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": row.thread_id,
+                    "checkpoint_ns": row.checkpoint_ns,
+                    "checkpoint_id": row.checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((row.checkpoint_type, bytes(row.checkpoint))),
+            metadata=self.serde.loads_typed((row.metadata_type, bytes(row.metadata))),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": row.thread_id,
+                        "checkpoint_ns": row.checkpoint_ns,
+                        "checkpoint_id": row.parent_checkpoint_id,
+                    }
+                }
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (write.task_id, write.channel, self.serde.loads_typed((write.value_type, bytes(write.value))))
+                for write in writes
+            ],
+        )
+
+    # -----------------------------
+    # BaseCheckpointSaver interface
+    # -----------------------------
+    def get_tuple(self, config):
+        try:
+            return self._get_tuple(config)
+        finally:
+            release_connections()
+
+    def _get_tuple(self, config):
+        configurable = config["configurable"]
+        queryset = self._checkpoints().filter(
+            thread_id=configurable["thread_id"],
+            checkpoint_ns=configurable.get("checkpoint_ns", ""),
+        )
+
+        if checkpoint_id := get_checkpoint_id(config):
+            row = queryset.filter(checkpoint_id=checkpoint_id).first()
+        else:
+            row = queryset.order_by("-checkpoint_id").first()
+
+        return self._to_tuple(row) if row else None
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        queryset = self._checkpoints()
+
+        if config:
+            configurable = config["configurable"]
+            queryset = queryset.filter(thread_id=configurable["thread_id"])
+            if configurable.get("checkpoint_ns") is not None:
+                queryset = queryset.filter(checkpoint_ns=configurable["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                queryset = queryset.filter(checkpoint_id=checkpoint_id)
+
+        if before and (before_id := get_checkpoint_id(before)):
+            queryset = queryset.filter(checkpoint_id__lt=before_id)
+
+        queryset = queryset.order_by("thread_id", "checkpoint_ns", "-checkpoint_id")
+
+        try:
+            for row in queryset.iterator(chunk_size=100):
+                if filter:
+                    # Metadata is serialized, so filtering happens after loading
+                    metadata = self.serde.loads_typed((row.metadata_type, bytes(row.metadata)))
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+
+                if limit is not None:
+                    if limit <= 0:
+                        break
+                    limit -= 1
+
+                yield self._to_tuple(row)
+        finally:
+            release_connections()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        try:
+            return self._put(config, checkpoint, metadata, new_versions)
+        finally:
+            release_connections()
+
+    def _put(self, config, checkpoint, metadata, new_versions):
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+
+        checkpoint_type, checkpoint_data = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        self._checkpoints().update_or_create(
+            thread_id=thread_id,
+            checkpoint_ns=checkpoint_ns,
+            checkpoint_id=checkpoint["id"],
+            defaults={
+                "parent_checkpoint_id": configurable.get("checkpoint_id"),
+                "checkpoint_type": checkpoint_type,
+                "checkpoint": checkpoint_data,
+                "metadata_type": metadata_type,
+                "metadata": metadata_data,
+            },
+        )
+
+        if self.keep_last:
+            with self._lock:
+                self._puts += 1
+                trim = self._puts % self.prune_every == 0
+            if trim:
+                self.prune_thread(thread_id, checkpoint_ns, self.keep_last)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        try:
+            self._put_writes(config, writes, task_id, task_path)
+        finally:
+            release_connections()
+
+    def _put_writes(self, config, writes, task_id, task_path=""):
+        configurable = config["configurable"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_data = self.serde.dumps_typed(value)
+            rows.append(
+                AgentCheckpointWrite(
+                    thread_id=configurable["thread_id"],
+                    checkpoint_ns=configurable.get("checkpoint_ns", ""),
+                    checkpoint_id=configurable["checkpoint_id"],
+                    task_id=task_id,
+                    task_path=task_path,
+                    idx=WRITES_IDX_MAP.get(channel, idx),
+                    channel=channel,
+                    value_type=value_type,
+                    value=value_data,
+                )
+            )
+
+        # Special writes (errors, interrupts, ...) replace earlier ones; regular
+        # writes are idempotent and the first one wins
+        if all(channel in WRITES_IDX_MAP for channel, _ in writes):
+            self._writes().bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx"],
+                update_fields=["channel", "value_type", "value", "task_path"],
+            )
+        else:
+            self._writes().bulk_create(rows, ignore_conflicts=True)
+
+    def delete_thread(self, thread_id):
+        try:
+            with transaction.atomic(using=self.using):
+                self._checkpoints().filter(thread_id=thread_id).delete()
+                self._writes().filter(thread_id=thread_id).delete()
+        finally:
+            release_connections()
+
+    # -----------------------------
+    # Async interface (ORM runs in a worker thread)
+    # -----------------------------
+    async def aget_tuple(self, config):
+        return await sync_to_async(self.get_tuple)(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        rows = await sync_to_async(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))()
+        for row in rows:
+            yield row
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await sync_to_async(self.put)(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await sync_to_async(self.put_writes)(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await sync_to_async(self.delete_thread)(thread_id)
+
+    # -----------------------------
+    # Retention
+    # -----------------------------
+    def prune_thread(self, thread_id, checkpoint_ns="", keep_last=2):
+        """
+        Delete all but the newest `keep_last` checkpoints of one thread namespace.
+
+        Returns:
+            int: Number of deleted checkpoints.
+        """
+        checkpoints = self._checkpoints().filter(thread_id=thread_id, checkpoint_ns=checkpoint_ns)
+        oldest_kept = (
+            checkpoints.order_by("-checkpoint_id")
+            .values_list("checkpoint_id", flat=True)[keep_last - 1:keep_last]
+            .first()
+        )
+        if oldest_kept is None:
+            return 0
+
+        with transaction.atomic(using=self.using):
+            deleted, _ = checkpoints.filter(checkpoint_id__lt=oldest_kept).delete()
+            self._writes().filter(
+                thread_id=thread_id,
+                checkpoint_ns=checkpoint_ns,
+                checkpoint_id__lt=oldest_kept,
+            ).delete()
+        return deleted
+
+    def prune(self, keep_last=None, idle_for=None):
+        """
+        Apply the retention policy to every thread.
+
+        Args:
+            keep_last (int, optional): Keep the newest N checkpoints per thread namespace.
+            idle_for (timedelta, optional): Drop threads with no checkpoint newer than this.
+
+        Returns:
+            dict: Deleted threads, checkpoints and writes.
+        """
+        result = {"threads": 0, "checkpoints": 0, "writes": 0}
+
+        if idle_for is not None:
+            cutoff = timezone.now() - idle_for
+            idle_threads = list(
+                self._checkpoints()
+                .values("thread_id")
+                .annotate(last_activity=Max("created_at"))
+                .filter(last_activity__lt=cutoff)
+                .values_list("thread_id", flat=True)
+            )
+            for thread_id in idle_threads:
+                result["checkpoints"] += self._checkpoints().filter(thread_id=thread_id).delete()[0]
+            result["threads"] = len(idle_threads)
+
+        if keep_last:
+            keep_last = max(keep_last, 2)
+            ranked = self._checkpoints().annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F("thread_id"), F("checkpoint_ns")],
+                    order_by=F("checkpoint_id").desc(),
+                )
+            )
+            stale_ids = list(ranked.filter(rank__gt=keep_last).values_list("id", flat=True))
+            for start in range(0, len(stale_ids), 1000):
+                batch = stale_ids[start:start + 1000]
+                result["checkpoints"] += self._checkpoints().filter(id__in=batch).delete()[0]
+
+        # Writes only matter for checkpoints that still exist
+        orphaned = ~Exists(
+            self._checkpoints().filter(
+                thread_id=OuterRef("thread_id"),
+                checkpoint_ns=OuterRef("checkpoint_ns"),
+                checkpoint_id=OuterRef("checkpoint_id"),
+            )
+        )
+        result["writes"] = self._writes().filter(orphaned).delete()[0]
+        return result
+
+
+# -----------------------------
+# Process-wide checkpointer
+# -----------------------------
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """Return the project's durable checkpointer (one per process)."""
+    global _checkpointer
+
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                _checkpointer = DjangoCheckpointSaver(
+                    keep_last=settings.CHECKPOINT_KEEP_LAST,
+                    using=settings.CHECKPOINT_DATABASE,
+                )
+    return _checkpointer
+
+
+def retention_policy():
+    """Return (keep_last, idle_for) from settings."""
+    idle_days = settings.CHECKPOINT_IDLE_DAYS
+    return settings.CHECKPOINT_KEEP_LAST, timedelta(days=idle_days) if idle_days else None
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from movies.db_routers import replica_configured
+
+
+# Backends whose entries only the process that wrote them can see
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache(alias):
+    """Whether every worker process (and the job runner) sees the same `alias` cache."""
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    return backend is not None and backend not in PER_PROCESS_CACHE_BACKENDS
+
+
+def _shared_cache_error(setting, purpose, id):
+    alias = getattr(settings, setting)
+    return Error(
+        f"{setting} = {alias!r} is not a cache shared between processes; {purpose}.",
+        hint="Point it at a database or Redis cache in CACHES (e.g. the 'shared' alias).",
+        id=id,
+    )
+
+
+@register(Tags.caches)
+def check_replica_cache(app_configs, **kwargs):
+    if replica_configured() and not is_shared_cache(settings.REPLICA_CACHE_ALIAS):
+        return [
+            _shared_cache_error(
+                "REPLICA_CACHE_ALIAS", "a write would only pin replica reads in the worker that made it", "ai.E001"
+            )
+        ]
+    return []
+
+
+@register(Tags.caches)
+def check_memo_cache(app_configs, **kwargs):
+    if settings.TOOL_MEMO_TTL and not is_shared_cache(settings.TOOL_MEMO_CACHE_ALIAS):
+        return [
+            _shared_cache_error(
+                "TOOL_MEMO_CACHE_ALIAS",
+                "writes in other workers couldn't invalidate memoized tool results, so memoization is off",
+                "ai.E002",
+            )
+        ]
+    return []
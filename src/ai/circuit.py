@@ -0,0 +1,196 @@
+"""
+Circuit breakers and stale-serve for the Permit PDP and TMDB.
+
+A breaker counts consecutive failed (or too slow) calls to one dependency.
+When it opens, calls fail fast with CircuitOpenError instead of waiting on a
+service that is down; after `reset_timeout` one probe call is let through and
+its outcome closes or re-opens the circuit. Callers that cache responses keep
+them in a StaleCache, so they can answer from expired entries meanwhile.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from ai.metrics import CIRCUIT_REJECTIONS, CIRCUIT_STATE, CIRCUIT_TRANSITIONS
+
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class ServiceUnavailable(Exception):
+    """
+    A dependency failed or is switched off by its breaker.
+
+    Args:
+        service (str): Dependency name, e.g. "tmdb".
+        message (str): What went wrong.
+        retry_after (float, optional): Seconds until a retry may succeed.
+    """
+
+    def __init__(self, service, message, retry_after=None):
+        super().__init__(message)
+        self.service = service
+        self.retry_after = retry_after
+
+    def as_result(self):
+        """The error result tools return to the agent."""
+        error = f"{self.service} is temporarily unavailable ({self})."
+        if self.retry_after:
+            error += f" Try again in {self.retry_after:.0f} seconds."
+        return {"error": error, "retry_after": round(self.retry_after) if self.retry_after else None}
+
+
+class CircuitOpenError(ServiceUnavailable):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, service, retry_after):
+        super().__init__(service, "circuit open", retry_after)
+
+
+class CircuitBreaker:
+    """
+    Args:
+        name (str): Dependency name used in errors and metrics.
+        failure_threshold (int): Consecutive failures that open the circuit.
+        slow_call_seconds (float, optional): Successful calls slower than this
+            count as failures.
+        reset_timeout (float): Seconds the circuit stays open before a probe.
+    """
+
+    def __init__(self, name, failure_threshold=5, slow_call_seconds=None, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(name).set(STATE_VALUES[CLOSED])
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            CIRCUIT_STATE.labels(self.name).set(STATE_VALUES[state])
+            CIRCUIT_TRANSITIONS.labels(self.name, state).inc()
+
+    def _reject(self, retry_after):
+        CIRCUIT_REJECTIONS.labels(self.name).inc()
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _allow(self):
+        """Admit a call or raise CircuitOpenError; returns True for the half-open probe."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self._reject(remaining)
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    self._reject(self.reset_timeout)
+                self._probing = True
+                return True
+            return False
+
+    def _record(self, failed, probe):
+        with self._lock:
+            if probe:
+                self._probing = False
+            if not failed:
+                self.failures = 0
+                self._set_state(CLOSED)
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    @contextmanager
+    def guard(self):
+        """
+        Run one call to the dependency through the breaker. Exceptions raised in
+        the block count as failures; so do blocks slower than slow_call_seconds.
+
+        Raises:
+            CircuitOpenError: The circuit is open (or a probe is already running).
+        """
+        probe = self._allow()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self._record(True, probe)
+            raise
+        except BaseException:
+            # Cancelled (e.g. the client went away): says nothing about the dependency
+            if probe:
+                with self._lock:
+                    self._probing = False
+            raise
+        else:
+            elapsed = time.monotonic() - start
+            self._record(self.slow_call_seconds is not None and elapsed > self.slow_call_seconds, probe)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, **options):
+    """Return the process-wide breaker for `name`, created with `options` on first use."""
+    if name not in _breakers:
+        with _breakers_lock:
+            if name not in _breakers:
+                _breakers[name] = CircuitBreaker(name, **options)
+    return _breakers[name]
+
+
+def reset_breakers():
+    """Forget every breaker so the next use starts closed with current settings."""
+    with _breakers_lock:
+        for name in _breakers:
+            CIRCUIT_STATE.labels(name).set(STATE_VALUES[CLOSED])
+        _breakers.clear()
+
+
+# -----------------------------
+# Stale-serve
+# -----------------------------
+class StaleCache:
+    """
+    Django cache wrapper whose entries are fresh for `ttl` seconds and kept
+    another `stale_ttl` seconds, for get_stale() while the source is failing.
+    """
+
+    def __init__(self, cache, ttl, stale_ttl=0):
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    def _value(self, entry, stale):
+        # Entries are (stored at, value); anything else predates stale-serve
+        if not isinstance(entry, tuple) or len(entry) != 2:
+            return None
+        stored_at, value = entry
+        if stale or time.time() - stored_at < self.ttl:
+            return value
+        return None
+
+    def get(self, key):
+        return self._value(self.cache.get(key), stale=False)
+
+    def get_stale(self, key):
+        return self._value(self.cache.get(key), stale=True)
+
+    def set(self, key, value):
+        self.cache.set(key, (time.time(), value), self.ttl + self.stale_ttl)
+
+    def set_many(self, mapping):
+        now = time.time()
+        self.cache.set_many({key: (now, value) for key, value in mapping.items()}, self.ttl + self.stale_ttl)
@@ -0,0 +1,132 @@
+import json
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+
+
+def truncation_marker(dropped):
+    return f"…[+{dropped} chars]"
+
+
+@dataclass(frozen=True)
+class CompactionPolicy:
+    """
+    How one tool's result is shrunk before the model sees it.
+
+    Args:
+        fields (tuple, optional): Keys to keep in result dicts, at any depth.
+            None keeps every key.
+        max_chars (dict): Per-key string limits, e.g. {"overview": 200}.
+        default_max_chars (int): Limit for any other string value.
+        max_items (int, optional): Longest list kept; the rest is counted in a marker.
+    """
+
+    fields: tuple | None = None
+    max_chars: dict = field(default_factory=dict)
+    default_max_chars: int = 300
+    max_items: int | None = None
+
+
+ERROR_FIELDS = ("success", "error", "message", "retry_after")
+
+# Exception text (URLs, reprs) rarely helps the model past the first sentence
+ERROR_MAX_CHARS = 200
+
+# Documents carry full `content`; movies carry full `overview`. Results the
+# model just wrote (create/update) don't need their content echoed back.
+TOOL_POLICIES = {
+    "list_documents": CompactionPolicy(fields=ERROR_FIELDS + ("documents", "id", "title"), max_items=25),
+    "get_document": CompactionPolicy(max_chars={"content": 2000}),
+    "create_document": CompactionPolicy(fields=ERROR_FIELDS + ("id", "title", "created_at")),
+    "update_document": CompactionPolicy(fields=ERROR_FIELDS + ("id", "title")),
+    "delete_document": CompactionPolicy(),
+    "delete_all_documents": CompactionPolicy(),
+    "get_job_status": CompactionPolicy(fields=ERROR_FIELDS + ("job_id", "kind", "status", "result", "error", "finished_at")),
+    "list_jobs": CompactionPolicy(fields=ERROR_FIELDS + ("jobs", "job_id", "kind", "status", "created_at"), max_items=10),
+    "search_query_documents": CompactionPolicy(
+        fields=ERROR_FIELDS + ("documents", "id", "title", "content"),
+        max_chars={"content": 200},
+        max_items=10,
+    ),
+    "search_movies": CompactionPolicy(
+        fields=ERROR_FIELDS + ("movies", "id", "title", "release_date", "overview"),
+        max_chars={"overview": 160},
+        max_items=10,
+    ),
+    "get_movie_details": CompactionPolicy(
+        fields=ERROR_FIELDS + ("id", "title", "release_date", "overview", "genres", "runtime"),
+        max_chars={"overview": 600},
+    ),
+}
+
+DEFAULT_POLICY = CompactionPolicy(default_max_chars=1000)
+
+
+def _compact_value(value, policy, key=None):
+    if isinstance(value, dict):
+        return {
+            k: _compact_value(v, policy, k)
+            for k, v in value.items()
+            if v is not None and (policy.fields is None or k in policy.fields)
+        }
+
+    if isinstance(value, list):
+        items = [_compact_value(item, policy, key) for item in value[:policy.max_items]]
+        if policy.max_items is not None and len(value) > policy.max_items:
+            items.append(f"…[+{len(value) - policy.max_items} more]")
+        return items
+
+    if isinstance(value, str):
+        limit = policy.max_chars.get(key, ERROR_MAX_CHARS if key == "error" else policy.default_max_chars)
+        if len(value) > limit:
+            return value[:limit] + truncation_marker(len(value) - limit)
+
+    return value
+
+
+def compact(output, policy):
+    """
+    Shrink a tool result according to `policy`.
+
+    Args:
+        output: The tool's return value (usually a dict) or its serialized content.
+        policy (CompactionPolicy): Fields and limits to apply.
+
+    Returns:
+        str: Compact JSON, or the truncated text if the output isn't JSON.
+    """
+    if isinstance(output, str):
+        try:
+            output = json.loads(output)
+        except ValueError:
+            return _compact_value(output, policy)
+
+    # Stable key order and no whitespace: same result, same tokens, cache-friendly
+    return json.dumps(_compact_value(output, policy), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def compact_for_tool(tool_name, output):
+    return compact(output, TOOL_POLICIES.get(tool_name, DEFAULT_POLICY))
+
+
+class ToolOutputCompactionMiddleware(AgentMiddleware):
+    """Compact every tool result before it is added to the agent's messages."""
+
+    def __init__(self, policies=None, enabled=None):
+        super().__init__()
+        self.policies = TOOL_POLICIES if policies is None else policies
+        self.enabled = settings.TOOL_OUTPUT_COMPACTION if enabled is None else enabled
+
+    def _compact(self, result):
+        if not self.enabled or not isinstance(result, ToolMessage) or not isinstance(result.content, str):
+            return result
+        policy = self.policies.get(result.name, DEFAULT_POLICY)
+        return result.model_copy(update={"content": compact(result.content, policy)})
+
+    def wrap_tool_call(self, request, handler):
+        return self._compact(handler(request))
+
+    async def awrap_tool_call(self, request, handler):
+        return self._compact(await handler(request))
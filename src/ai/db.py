@@ -0,0 +1,15 @@
+from django.db import connections
+
+
+def release_connections():
+    """
+    Do what Django does at the end of a request, unless a transaction is open:
+    give pooled connections back, and close unpooled ones past CONN_MAX_AGE.
+
+    LangGraph runs tools, checkpointer calls and LLM cache lookups on its own
+    worker threads, which Django's end-of-request cleanup never reaches, so
+    without this every such thread keeps a connection checked out (or open).
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
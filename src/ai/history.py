@@ -0,0 +1,235 @@
+from django.conf import settings
+from django.core.cache import caches
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_config
+
+
+SUMMARY_PROMPT = """
+You maintain a running summary of a conversation between a user and an AI assistant.
+Update the existing summary with the new messages below. Keep user goals, decisions,
+document ids/titles and movie ids/titles that may be referenced later. Drop raw tool
+output and pleasantries. Reply with the updated summary only.
+
+Existing summary:
+{summary}
+
+New messages:
+{messages}
+"""
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+TRUNCATED_MARKER = "…[truncated]"
+
+# Summaries are per thread, so keep them around as long as idle threads are
+SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _summaries():
+    # Shared, so a thread summarized in one worker isn't summarized again in the next
+    return caches[settings.HISTORY_SUMMARY_CACHE_ALIAS]
+
+
+def _truncate(text, limit):
+    if not isinstance(text, str) or len(text) <= limit:
+        return text
+    return text[:limit] + TRUNCATED_MARKER
+
+
+def _last_human(messages):
+    return max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+
+
+def _render(messages, limit):
+    lines = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if isinstance(message, ToolMessage):
+            content = _truncate(content, limit)
+        lines.append(f"{message.type}: {content}")
+        for call in getattr(message, "tool_calls", None) or []:
+            lines.append(f"{message.type} called {call['name']}({call['args']})")
+    return "\n".join(lines)
+
+
+class HistoryBudget:
+    """
+    Fit a conversation into a per-call token budget.
+
+    Tool outputs from earlier turns are truncated first; if the history is
+    still over budget, the oldest turns are folded into a running summary.
+    The latest user turn is always kept whole; when it alone is over budget,
+    its tool outputs are truncated as well. The summary is cached per (agent, thread)
+    in HISTORY_SUMMARY_CACHE_ALIAS and only extended with the messages that fell
+    out of the window since the last call.
+
+    Args:
+        llm: Chat model used to write summaries.
+        name (str): Agent name, part of the summary cache key.
+        max_tokens (int): Token budget for the messages sent to the model.
+        tool_output_chars (int): Length kept of tool outputs from earlier turns.
+    """
+
+    def __init__(self, llm, name, max_tokens=None, tool_output_chars=None):
+        self.llm = llm
+        self.name = name
+        self.max_tokens = max_tokens if max_tokens is not None else settings.HISTORY_TOKEN_BUDGET
+        self.tool_output_chars = (
+            tool_output_chars if tool_output_chars is not None else settings.HISTORY_TOOL_OUTPUT_CHARS
+        )
+
+    # -----------------------------
+    # Planning
+    # -----------------------------
+    def _trim_tool_outputs(self, messages, end=None):
+        """Truncate tool outputs before index `end` (default: the latest user turn)."""
+        if end is None:
+            end = _last_human(messages)
+        trimmed = []
+        for index, message in enumerate(messages):
+            if index < end and isinstance(message, ToolMessage):
+                content = _truncate(message.content, self.tool_output_chars)
+                if content is not message.content:
+                    message = message.model_copy(update={"content": content})
+            trimmed.append(message)
+        return trimmed
+
+    def _split(self, messages):
+        # Leave a quarter of the budget for the summary itself
+        window = self.max_tokens * 3 // 4
+        split, used = len(messages), 0
+        while split > 0:
+            cost = count_tokens_approximately([messages[split - 1]])
+            if used + cost > window:
+                break
+            used += cost
+            split -= 1
+
+        # Keep at least the latest user turn, and start the kept window on a
+        # user turn so no tool result is separated from its call
+        last_human = _last_human(messages)
+        split = min(split, last_human)
+        while split < last_human and not isinstance(messages[split], HumanMessage):
+            split += 1
+        return split
+
+    def _cache_key(self):
+        try:
+            configurable = get_config().get("configurable") or {}
+        except RuntimeError:
+            return None
+        thread_id = configurable.get("thread_id")
+        if thread_id is None:
+            return None
+        return f"ai:history-summary:{self.name}:{thread_id}"
+
+    def _plan(self, messages):
+        """Return (messages, summary_job); summary_job is None when there is nothing to summarize."""
+        if not self.max_tokens or count_tokens_approximately(messages) <= self.max_tokens:
+            return messages, None
+
+        messages = self._trim_tool_outputs(messages)
+        if count_tokens_approximately(messages) <= self.max_tokens:
+            return messages, None
+
+        split = self._split(messages)
+        older, recent = messages[:split], messages[split:]
+        if count_tokens_approximately(recent) > self.max_tokens * 3 // 4:
+            # The current turn alone is too big: trim its tool outputs too
+            recent = self._trim_tool_outputs(recent, len(recent))
+        if split == 0:
+            return recent, None
+
+        return recent, {"key": self._cache_key(), "older": older, "summary": "", "delta": older}
+
+    def _resume(self, job, cached):
+        """Continue from the cached summary if it covers a prefix of the older messages."""
+        older = job["older"]
+        if cached and cached["count"] <= len(older) and older[cached["count"] - 1].id == cached["last_id"]:
+            job["summary"], job["delta"] = cached["summary"], older[cached["count"]:]
+
+    def _cache_entry(self, job, summary):
+        return {"count": len(job["older"]), "last_id": job["older"][-1].id, "summary": summary}
+
+    def _finish(self, recent, summary):
+        return [HumanMessage(content=SUMMARY_PREFIX + summary)] + recent
+
+    def _summary_prompt(self, job):
+        return [
+            SystemMessage(
+                content=SUMMARY_PROMPT.format(
+                    summary=job["summary"] or "(none)",
+                    messages=_render(job["delta"], self.tool_output_chars),
+                )
+            )
+        ]
+
+    # -----------------------------
+    # Entry points
+    # -----------------------------
+    def prepare(self, messages):
+        recent, job = self._plan(messages)
+        if job is None:
+            return recent
+        if job["key"]:
+            self._resume(job, _summaries().get(job["key"]))
+
+        summary = job["summary"]
+        if job["delta"]:
+            summary = self.llm.invoke(self._summary_prompt(job)).text
+            if job["key"]:
+                _summaries().set(job["key"], self._cache_entry(job, summary), SUMMARY_CACHE_TIMEOUT)
+        return self._finish(recent, summary)
+
+    async def aprepare(self, messages):
+        recent, job = self._plan(messages)
+        if job is None:
+            return recent
+        # The shared cache may be the database, which is sync-only here
+        if job["key"]:
+            self._resume(job, await _summaries().aget(job["key"]))
+
+        summary = job["summary"]
+        if job["delta"]:
+            summary = (await self.llm.ainvoke(self._summary_prompt(job))).text
+            if job["key"]:
+                await _summaries().aset(job["key"], self._cache_entry(job, summary), SUMMARY_CACHE_TIMEOUT)
+        return self._finish(recent, summary)
+
+
+class HistoryBudgetMiddleware(AgentMiddleware):
+    """Apply a HistoryBudget to the messages of every model call of a create_agent graph."""
+
+    def __init__(self, llm, name, **kwargs):
+        super().__init__()
+        self.budget = HistoryBudget(llm, name, **kwargs)
+
+    @property
+    def name(self):
+        return f"HistoryBudgetMiddleware[{self.budget.name}]"
+
+    def wrap_model_call(self, request, handler):
+        return handler(request.override(messages=self.budget.prepare(request.messages)))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(request.override(messages=await self.budget.aprepare(request.messages)))
+
+
+def history_pre_model_hook(llm, name, **kwargs):
+    """
+    Build a pre_model_hook applying a HistoryBudget (for create_supervisor).
+
+    The trimmed history goes to the model through `llm_input_messages`, so the
+    stored conversation is left untouched.
+    """
+    budget = HistoryBudget(llm, name, **kwargs)
+
+    def hook(state):
+        return {"llm_input_messages": budget.prepare(state["messages"])}
+
+    async def ahook(state):
+        return {"llm_input_messages": await budget.aprepare(state["messages"])}
+
+    return RunnableLambda(hook, afunc=ahook, name=f"history_budget[{name}]")
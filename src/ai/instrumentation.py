@@ -0,0 +1,202 @@
+"""
+LangChain and LangGraph hooks for ai.metrics and movies.tracing.
+
+They live apart from those modules because they need LangChain at import time,
+while the metrics and spans are also used by code that runs without it (Django
+startup, the Permit and TMDB clients).
+"""
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.errors import GraphBubbleUp
+from langgraph.prebuilt import ToolNode
+
+from ai import metrics
+from movies import tracing
+
+
+HANDOFF_PREFIX = "transfer_to_"
+
+
+# -----------------------------
+# Tool metrics
+# -----------------------------
+def _track(request, handler):
+    with metrics.track_tool_call(request.tool_call["name"]) as call:
+        call.result = handler(request)
+        return call.result
+
+
+async def _atrack(request, handler):
+    with metrics.track_tool_call(request.tool_call["name"]) as call:
+        call.result = await handler(request)
+        return call.result
+
+
+class ToolMetricsMiddleware(AgentMiddleware):
+    """
+    Time every tool call and count its outcome (see ai.metrics).
+
+    Keep it after ToolOutputCompactionMiddleware so it sees the tool's own
+    output rather than the compacted one.
+    """
+
+    def wrap_tool_call(self, request, handler):
+        return _track(request, handler)
+
+    async def awrap_tool_call(self, request, handler):
+        return await _atrack(request, handler)
+
+
+def _track_supervisor_tool(request, handler):
+    if request.tool_call["name"].startswith(HANDOFF_PREFIX):
+        return handler(request)
+    return _track(request, handler)
+
+
+async def _atrack_supervisor_tool(request, handler):
+    if request.tool_call["name"].startswith(HANDOFF_PREFIX):
+        return await handler(request)
+    return await _atrack(request, handler)
+
+
+def metered_tool_node(tools):
+    """
+    ToolNode for create_supervisor that counts its tools like ToolMetricsMiddleware.
+
+    The supervisor runs its own tools (workflows, parallel delegation) in a
+    plain ToolNode, which takes no agent middleware. Handoffs only pass control
+    to an agent and aren't counted.
+    """
+    return ToolNode(tools, wrap_tool_call=_track_supervisor_tool, awrap_tool_call=_atrack_supervisor_tool)
+
+
+# -----------------------------
+# Graph tracing
+# -----------------------------
+def _agent_name(metadata):
+    # Checkpoint namespaces start with the agent's node, e.g. "movie_agent:<id>|tools:<id>"
+    namespace = (metadata or {}).get("langgraph_checkpoint_ns")
+    return namespace.split(":", 1)[0] if namespace else None
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Turn LangChain callbacks from one graph run into spans.
+
+    Traced: the root run (one user turn), each agent node, every chat model call
+    and every tool call. Other internal runnables are skipped; their children are
+    attached to the nearest traced ancestor. While a tool runs its span is the
+    current span, so Permit, TMDB and ORM spans nest under it.
+    """
+
+    run_inline = True
+
+    def __init__(self, tracer, agent_names=()):
+        self.tracer = tracer
+        self.agent_names = set(agent_names)
+        self._spans = {}  # run_id -> Span
+        self._parents = {}  # run_id -> nearest traced ancestor Span
+        self._tokens = {}
+
+    def _parent(self, parent_run_id):
+        if parent_run_id is None:
+            return tracing.current_span()
+        return self._spans.get(parent_run_id) or self._parents.get(parent_run_id)
+
+    def _open(self, run_id, parent_run_id, name, attributes):
+        parent = self._parent(parent_run_id)
+        span = self.tracer.start_span(name, parent=parent, attributes=attributes)
+        self._spans[run_id] = span
+        return span
+
+    def _close(self, run_id, error=None):
+        self._parents.pop(run_id, None)
+        token = self._tokens.pop(run_id, None)
+        if token is not None:
+            try:
+                tracing.reset_current_span(token)
+            except ValueError:
+                # Ended from a different context than it started in; nothing to restore
+                pass
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        # Handoffs and interrupts travel up the graph as GraphBubbleUp; they aren't failures
+        if error is not None and not isinstance(error, GraphBubbleUp):
+            span.record_exception(error)
+        span.end()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        parent = self._parent(parent_run_id)
+        if parent_run_id is None:
+            self._open(run_id, None, "agent.turn", {
+                "thread_id": metadata.get("thread_id"),
+                "user_id": metadata.get("user_id"),
+                "graph": kwargs.get("name"),
+            })
+        elif node in self.agent_names and kwargs.get("name") == node and not (parent and parent.name == f"agent {node}"):
+            # An agent node runs a compiled graph of the same name; one span covers both
+            self._open(run_id, parent_run_id, f"agent {node}", {"agent": node})
+        else:
+            self._parents[run_id] = parent
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        invocation = kwargs.get("invocation_params") or {}
+        self._open(run_id, parent_run_id, "llm.call", {
+            "agent": _agent_name(metadata),
+            "model": invocation.get("model_name") or invocation.get("model") or invocation.get("_type"),
+            "messages": sum(len(batch) for batch in messages),
+        })
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        span = self._spans.get(run_id)
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if span is not None and usage:
+            span.set_attribute("prompt_tokens", usage.get("prompt_tokens"))
+            span.set_attribute("completion_tokens", usage.get("completion_tokens"))
+        self._close(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        if name.startswith(HANDOFF_PREFIX):
+            span = self._open(run_id, parent_run_id, "handoff", {"to_agent": name[len(HANDOFF_PREFIX):]})
+        else:
+            span = self._open(run_id, parent_run_id, f"tool {name}", {"tool": name, "agent": _agent_name(kwargs.get("metadata"))})
+        # The tool body runs in a copy of this context, so nested spans find it
+        self._tokens[run_id] = tracing.set_current_span(span)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        span = self._spans.get(run_id)
+        if span is not None and getattr(output, "status", None) == "error":
+            span.status = "ERROR"
+        self._close(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+
+def traced_config(config, agent_names=()):
+    """
+    Add a TracingCallbackHandler to a run config when tracing is enabled.
+
+    Returns:
+        dict: The config to run the graph with (unchanged when tracing is off).
+    """
+    tracer = tracing.get_tracer()
+    if tracer is None:
+        return config
+    callbacks = list(config.get("callbacks") or [])
+    callbacks.append(TracingCallbackHandler(tracer, agent_names))
+    return {**config, "callbacks": callbacks}
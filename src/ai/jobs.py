@@ -0,0 +1,297 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from ai import memo
+from ai.metrics import JOB_DURATION, JOB_RUNS
+from ai.models import AgentJob
+from directories.models import Directory
+from movies.db_routers import pin_to_primary
+
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(job) returning a JSON-serializable result
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    """Register `func(job)` as the handler for jobs of `kind`."""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+# -----------------------------
+# Queueing
+# -----------------------------
+def enqueue(kind, owner_id, payload=None, dedupe=False):
+    """
+    Queue a job for `manage.py run_jobs`.
+
+    Args:
+        kind (str): Registered handler name.
+        owner_id (int): User the job acts for; only they can see it.
+        payload (dict, optional): Handler arguments.
+        dedupe (bool): Return the owner's unfinished job of the same kind instead
+            of queueing a second one.
+
+    Returns:
+        AgentJob: The queued (or already pending) job.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind!r}")
+    if dedupe:
+        pending = AgentJob.objects.filter(
+            kind=kind, owner_id=owner_id, status__in=[AgentJob.QUEUED, AgentJob.RUNNING]
+        ).order_by("id").first()
+        if pending is not None:
+            return pending
+    return AgentJob.objects.create(
+        kind=kind,
+        owner_id=owner_id,
+        payload=payload or {},
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def job_status(job):
+    """What the agent (and the status tools) report about a job."""
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error or None,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def report_progress(job, **progress):
+    """Store partial results while a job runs so status polls can show them."""
+    job.result = {**(job.result or {}), **progress}
+    _owned(job).update(result=job.result)
+
+
+# -----------------------------
+# Claiming and running
+# -----------------------------
+def claim(worker):
+    """
+    Take the oldest runnable job, skipping rows other workers have locked.
+
+    Returns:
+        AgentJob | None: The job, now marked running, or None when nothing is ready.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            AgentJob.objects.select_for_update(skip_locked=True)
+            .filter(status=AgentJob.QUEUED, run_after__lte=now)
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = AgentJob.RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.locked_by = worker
+        job.locked_at = now
+        job.save(update_fields=["status", "attempts", "started_at", "locked_by", "locked_at"])
+    return job
+
+
+def _owned(job):
+    """The job's row, as long as this attempt still holds it (requeue_stale() may have taken it back)."""
+    return AgentJob.objects.filter(
+        pk=job.pk, status=AgentJob.RUNNING, attempts=job.attempts, locked_by=job.locked_by
+    )
+
+
+class Heartbeat:
+    """
+    Refresh a running job's `locked_at` every JOB_HEARTBEAT_INTERVAL seconds
+    from a background thread, so requeue_stale() leaves it to its worker
+    however long it runs.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"job-{job.pk}-heartbeat", daemon=True)
+
+    def _beat(self):
+        try:
+            while not self._stopped.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                if not _owned(self.job).update(locked_at=timezone.now()):
+                    logger.warning("Job %s attempt %s was taken back from this worker", self.job.id, self.job.attempts)
+                    return
+        finally:
+            # Connections are per thread; this one's would otherwise stay open
+            connections.close_all()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def execute(job):
+    """Run a claimed job and record its outcome; failures are retried with backoff."""
+    handler = JOB_HANDLERS.get(job.kind)
+    start = time.perf_counter()
+    try:
+        if handler is None:
+            raise LookupError(f"No handler for job kind {job.kind!r}")
+        with Heartbeat(job):
+            result = handler(job)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        job.error = f"{type(e).__name__}: {e}"
+        if handler is not None and job.attempts < job.max_attempts:
+            outcome = "retried"
+            job.status = AgentJob.QUEUED
+            job.run_after = timezone.now() + _retry_delay(job.attempts)
+        else:
+            outcome = "failed"
+            job.status = AgentJob.FAILED
+            job.finished_at = timezone.now()
+    else:
+        outcome = "succeeded"
+        job.status = AgentJob.SUCCEEDED
+        job.result = result
+        job.error = ""
+        job.finished_at = timezone.now()
+
+    # Only while this attempt still holds the job; a requeued job belongs to its next attempt
+    owned = _owned(job)
+    job.locked_by = ""
+    job.locked_at = None
+    fields = ["status", "result", "error", "run_after", "finished_at", "locked_by", "locked_at"]
+    if not owned.update(**{field: getattr(job, field) for field in fields}):
+        logger.warning("Job %s attempt %s ended after it was requeued; its outcome is dropped", job.id, job.attempts)
+        outcome = "lost"
+        job.refresh_from_db()
+    JOB_DURATION.labels(job.kind).observe(time.perf_counter() - start)
+    JOB_RUNS.labels(job.kind, outcome).inc()
+    return job
+
+
+def requeue_stale(stale_after=None):
+    """
+    Give jobs whose worker stopped sending heartbeats another attempt (or fail
+    them when out of attempts).
+
+    Returns:
+        int: Jobs requeued or failed.
+    """
+    stale_after = stale_after or timedelta(seconds=settings.JOB_STALE_AFTER)
+    cutoff = timezone.now() - stale_after
+    # Jobs claimed before heartbeats existed have no locked_at
+    stale = AgentJob.objects.filter(
+        Q(locked_at__lt=cutoff) | Q(locked_at__isnull=True, started_at__lt=cutoff), status=AgentJob.RUNNING
+    )
+    error = "Worker stopped before the job finished"
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=AgentJob.FAILED, error=error, locked_by="", locked_at=None, finished_at=timezone.now()
+    )
+    requeued = stale.update(
+        status=AgentJob.QUEUED, error=error, locked_by="", locked_at=None, run_after=timezone.now()
+    )
+    return failed + requeued
+
+
+class Worker:
+    """
+    Polls the queue and runs jobs one at a time; run more processes to scale out.
+
+    Args:
+        name (str, optional): Stored on claimed jobs (default host:pid).
+        poll_interval (float, optional): Seconds to sleep when the queue is empty
+            (default JOB_POLL_INTERVAL).
+    """
+
+    def __init__(self, name=None, poll_interval=None):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.stopping = threading.Event()
+        self.processed = 0
+
+    def stop(self):
+        """Finish the running job, then return from run()."""
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """
+        Work until stop() is called.
+
+        Args:
+            burst (bool): Return as soon as no job is ready.
+        """
+        last_sweep = None
+        while not self.stopping.is_set():
+            close_old_connections()
+            if last_sweep is None or time.monotonic() - last_sweep > settings.JOB_STALE_AFTER / 2:
+                requeue_stale()
+                last_sweep = time.monotonic()
+
+            job = claim(self.name)
+            if job is None:
+                if burst:
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+            execute(job)
+            self.processed += 1
+
+
+# -----------------------------
+# Handlers
+# -----------------------------
+@job_handler("delete_all_documents")
+def delete_all_documents(job):
+    """
+    Delete the owner's active documents in short batches, reporting progress.
+
+    Only documents up to payload["max_id"] (the newest one when the job was
+    queued) are deleted, so ones created meanwhile survive and the job ends
+    even while writes keep arriving.
+    """
+    documents = Directory.objects.filter(owner_id=job.owner_id, active=True)
+    max_id = job.payload.get("max_id")
+    if max_id is None:
+        # Queued without a cutoff: the newest document now
+        max_id = documents.aggregate(max_id=Max("id"))["max_id"] or 0
+    documents = documents.filter(id__lte=max_id)
+
+    deleted = 0
+    while True:
+        ids = list(documents.values_list("id", flat=True)[:settings.JOB_DELETE_BATCH_SIZE])
+        if not ids:
+            break
+        with transaction.atomic():
+            count, _ = Directory.objects.filter(id__in=ids).delete()
+        deleted += count
+        report_progress(job, deleted_count=deleted)
+    pin_to_primary(job.owner_id)
+    memo.invalidate(job.owner_id, "directory")
+    return {"deleted_count": deleted}
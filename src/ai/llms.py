@@ -1,11 +1,141 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
 from langchain_openai import ChatOpenAI
 from django.conf import settings
 
+from ai.cache import get_llm_cache
+
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+_models = {}
+_http_clients = {}
+_lock = threading.Lock()
+
+
+# -----------------------------
+# Shared HTTP connection pools
+# -----------------------------
+def _http_limits() -> httpx.Limits:
+    # max_connections also caps concurrent outbound LLM requests per process
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
 
-def get_openai_model(model: str = "gpt-4o-mini") -> ChatOpenAI:
-    return ChatOpenAI(
-        model=model,
-        temperature=0,
-        max_retries=3,
-        api_key=settings.OPENAI_API_KEY,
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.LLM_HTTP_TIMEOUT,
+        connect=settings.LLM_HTTP_CONNECT_TIMEOUT,
     )
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport with a connection pool per event loop.
+
+    Pooled async connections belong to the loop that opened them, and each
+    async_to_sync call, asyncio.run and ASGI worker runs its own loop. Pools
+    are dropped along with their loop.
+    """
+
+    def __init__(self):
+        self._transports = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _transport(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(limits=_http_limits())
+                self._transports[loop] = transport
+        return transport
+
+    async def handle_async_request(self, request):
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self):
+        # Only the running loop's pool can be closed from here
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+        if transport is not None:
+            await transport.aclose()
+
+
+def _get_http_client(kind: str):
+    client = _http_clients.get(kind)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _http_clients.get(kind)
+        if client is None:
+            if kind == "async":
+                client = httpx.AsyncClient(transport=_PerLoopTransport(), timeout=_http_timeout())
+            else:
+                client = httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+            _http_clients[kind] = client
+    return client
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide sync HTTP client used by every LLM client."""
+    return _get_http_client("sync")
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide async HTTP client used by every LLM client.
+
+    Safe to share across event loops: each loop gets its own connection pool.
+    """
+    return _get_http_client("async")
+
+
+# -----------------------------
+# Memoized chat models
+# -----------------------------
+def get_openai_model(model: str = DEFAULT_MODEL, temperature: float = 0, max_retries: int = 3) -> ChatOpenAI:
+    """
+    Return a ChatOpenAI client shared by every caller with the same config.
+
+    Args:
+        model (str): OpenAI model name (default DEFAULT_MODEL).
+        temperature (float): Sampling temperature (default 0).
+        max_retries (int): Retries on transient API errors (default 3).
+
+    Returns:
+        ChatOpenAI: Client wired to the shared HTTP connection pools and,
+        when LLM_CACHE_ENABLED is set, the database response cache.
+    """
+    model = model or DEFAULT_MODEL
+    key = (model, temperature, max_retries)
+
+    llm = _models.get(key)
+    if llm is not None:
+        return llm
+
+    http_client = get_http_client()
+    http_async_client = get_async_http_client()
+
+    with _lock:
+        llm = _models.get(key)
+        if llm is None:
+            llm = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                max_retries=max_retries,
+                api_key=settings.OPENAI_API_KEY,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                cache=get_llm_cache(),
+            )
+            _models[key] = llm
+    return llm
@@ -0,0 +1,49 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai import registry
+from ai.llms import DEFAULT_MODEL
+from ai.supervisor import get_supervisor
+
+
+class Command(BaseCommand):
+    help = "Compare building the supervisor per request with the cached graph registry."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=DEFAULT_MODEL)
+        parser.add_argument("--requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        model = options["model"]
+        runs = max(options["requests"], 1)
+
+        uncached = self._measure(lambda: get_supervisor(model=model), runs)
+
+        registry.clear()
+        start = time.perf_counter()
+        registry.get_supervisor_graph(model=model)
+        first_build = time.perf_counter() - start
+        cached = self._measure(lambda: registry.get_supervisor_graph(model=model), runs)
+
+        self.stdout.write(f"Requests: {runs} (model={model})")
+        self._report("get_supervisor() per request", uncached)
+        self.stdout.write(f"{'registry first build':<32} {first_build * 1000:10.3f} ms")
+        self._report("registry cached lookup", cached)
+
+        saved = statistics.mean(uncached) - statistics.mean(cached)
+        self.stdout.write(self.style.SUCCESS(f"Saved per request: {saved * 1000:.3f} ms"))
+
+    def _measure(self, build, runs):
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            build()
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    def _report(self, label, samples):
+        mean_ms = statistics.mean(samples) * 1000
+        max_ms = max(samples) * 1000
+        self.stdout.write(f"{label:<32} {mean_ms:10.3f} ms (max {max_ms:.3f} ms)")
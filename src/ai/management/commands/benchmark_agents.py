@@ -0,0 +1,122 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+
+from ai.benchmark.harness import BASELINE, FIXTURE, compare, load_fixture, run_benchmark
+from ai.benchmark.standins import PermitPDPStandIn, TMDBStandIn
+from my_permit.client import reset_permit_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the supervisor graph end to end without OpenAI, Permit or TMDB, "
+        "using a scripted chat model and local stand-ins, in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixture", default=str(FIXTURE))
+        parser.add_argument("--baseline", default=str(BASELINE))
+        parser.add_argument("--repeat", type=int, default=10, help="Measured passes over the fixture.")
+        parser.add_argument("--llm-latency", type=float, default=0.0, help="Milliseconds per model call.")
+        parser.add_argument("--permit-latency", type=float, default=5.0, help="Milliseconds per Permit check.")
+        parser.add_argument("--tmdb-latency", type=float, default=20.0, help="Milliseconds per TMDB request.")
+        parser.add_argument("--checkpointer", choices=["memory", "django"], default="memory")
+        parser.add_argument(
+            "--warm-caches", action="store_true",
+            help="Keep the permission and TMDB caches on; by default every check and request reaches the stand-ins.",
+        )
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the test database between runs.")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95 increase.")
+        parser.add_argument("--min-delta", type=float, default=10.0, help="Ignore p95 increases below this many ms.")
+        parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        fixture = load_fixture(options["fixture"])
+        permit = PermitPDPStandIn(latency=options["permit_latency"] / 1000)
+        tmdb = TMDBStandIn(fixture["movies"], latency=options["tmdb_latency"] / 1000)
+        caches = {} if options["warm_caches"] else {"PERMIT_CACHE_TTL": 0, "TMDB_CACHE_TTL": 0}
+
+        # The benchmark creates and deletes its user and documents, so it never
+        # touches the configured databases
+        old_config = setup_databases(options["verbosity"], interactive=False, keepdb=options["keepdb"])
+        try:
+            checkpointer = None
+            if options["checkpointer"] == "django":
+                from ai.checkpointer import get_checkpointer
+
+                checkpointer = get_checkpointer()
+
+            with permit, tmdb, override_settings(
+                PERMIT_PDP_URL=permit.url,
+                PERMIT_API_KEY="benchmark",
+                TMDB_API_BASE_URL=tmdb.url,
+                TMDB_API_KEY="benchmark",
+                **caches,
+            ):
+                # The shared Permit client keeps the PDP URL it was created with
+                reset_permit_client()
+                try:
+                    results = run_benchmark(
+                        fixture,
+                        repeat=options["repeat"],
+                        llm_latency=options["llm_latency"] / 1000,
+                        checkpointer=checkpointer,
+                        stdout=self.stdout,
+                    )
+                finally:
+                    reset_permit_client()
+        finally:
+            teardown_databases(old_config, options["verbosity"], keepdb=options["keepdb"])
+
+        self._report(results, permit, tmdb, options["warm_caches"])
+
+        if options["save_baseline"]:
+            with open(options["baseline"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            return
+
+        try:
+            baseline = load_fixture(options["baseline"])
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING("No baseline found; run with --save-baseline to create one."))
+            return
+
+        if baseline.get("database") not in (None, results["database"]):
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded on {baseline['database']}, this run used {results['database']}; "
+                "query counts are not compared."
+            ))
+        regressions = compare(results, baseline, tolerance=options["tolerance"], min_delta_ms=options["min_delta"])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions versus baseline."))
+            return
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {regression}"))
+        if options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regression(s) versus baseline")
+
+    def _report(self, results, permit, tmdb, warm_caches):
+        self.stdout.write("")
+        self.stdout.write(f"{'turn':<36} {'p50 ms':>9} {'p95 ms':>9}")
+        for key, stats in results["turns"].items():
+            self.stdout.write(f"{key:<36} {stats['p50']:>9.1f} {stats['p95']:>9.1f}")
+        all_turns = results["all_turns"]
+        self.stdout.write(f"{'all turns':<36} {all_turns['p50']:>9.1f} {all_turns['p95']:>9.1f}")
+
+        self.stdout.write("")
+        self.stdout.write(f"{'tool':<24} {'calls':>5} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'errors':>6}")
+        for name, stats in results["tools"].items():
+            self.stdout.write(
+                f"{name:<24} {stats['calls']:>5} {stats['p50']:>9.1f} {stats['p95']:>9.1f} "
+                f"{stats['queries']:>8} {stats['errors']:>6}"
+            )
+        self.stdout.write("")
+        self.stdout.write(f"Database: {results['database']}")
+        self.stdout.write(f"Stand-in requests: Permit {permit.requests}, TMDB {tmdb.requests}")
+        if warm_caches:
+            self.stdout.write("Permission and TMDB caches were on, so tool latencies include cache hits.")
@@ -0,0 +1,112 @@
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Modules that pull in LangChain, the Permit SDK, OpenAI or requests
+HEAVY_MODULES = ("langchain", "langchain_core", "langgraph", "openai", "permit", "requests")
+
+# name -> (code run in a fresh interpreter, import budget in ms, modules it must not import)
+SCENARIOS = {
+    "django.setup": (
+        "import django; django.setup()",
+        600,
+        HEAVY_MODULES,
+    ),
+    "urlconf": (
+        "import django; django.setup(); import movies.urls",
+        700,
+        HEAVY_MODULES,
+    ),
+    "agent graphs": (
+        "import django; django.setup(); from ai.supervisor import get_supervisor",
+        3000,
+        (),
+    ),
+}
+
+REPORT_SCRIPT = """
+import sys
+{code}
+print("\\n".join(sorted(sys.modules)))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Read `python -X importtime` output.
+
+    Returns:
+        tuple: (total ms spent importing, [(cumulative ms, module), ...] for top-level imports)
+    """
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        # Nested imports are indented under the module that triggered them
+        if not name[1:].startswith(" "):
+            top_level.append((int(cumulative) / 1000, name.strip()))
+    return sum(ms for ms, _ in top_level), sorted(top_level, reverse=True)
+
+
+def measure(code):
+    """
+    Run `code` in a fresh interpreter under -X importtime.
+
+    Returns:
+        tuple: (total import ms, top-level imports, set of loaded module names)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", REPORT_SCRIPT.format(code=code)],
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise CommandError(f"{code!r} failed:\n{result.stderr[-2000:]}")
+    total, top_level = parse_importtime(result.stderr)
+    return total, top_level, set(result.stdout.split())
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure import time of Django startup, the URLconf and the agent graphs "
+        "with `python -X importtime`, and fail when a budget is exceeded or "
+        "startup loads LangChain, Permit, OpenAI or requests."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest counts.")
+        parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to show per scenario.")
+        parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget (e.g. for slow CI machines).")
+
+    def handle(self, *args, **options):
+        failures = []
+
+        for name, (code, budget, forbidden) in SCENARIOS.items():
+            runs = [measure(code) for _ in range(max(options["repeat"], 1))]
+            total, top_level, modules = min(runs, key=lambda run: run[0])
+            budget *= options["budget_scale"]
+
+            style = self.style.SUCCESS if total <= budget else self.style.ERROR
+            self.stdout.write(style(f"{name:<16} {total:>8.1f} ms  (budget {budget:.0f} ms)"))
+            for ms, module in top_level[:options["top"]]:
+                self.stdout.write(f"    {ms:>8.1f} ms  {module}")
+
+            if total > budget:
+                failures.append(f"{name}: {total:.1f} ms over budget of {budget:.0f} ms")
+            loaded = sorted(m for m in forbidden if m in modules)
+            if loaded:
+                failures.append(f"{name}: imports {', '.join(loaded)}")
+
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} import-time budget violation(s)")
+        self.stdout.write(self.style.SUCCESS("Import times within budget."))
@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ai.checkpointer import get_checkpointer, retention_policy
+from ai.models import AgentCheckpoint, AgentCheckpointWrite
+
+
+class Command(BaseCommand):
+    help = "Apply the checkpoint retention policy and compact the checkpoint tables."
+
+    def add_arguments(self, parser):
+        keep_last, idle_for = retention_policy()
+        parser.add_argument(
+            "--keep-last", type=int, default=keep_last,
+            help="Checkpoints kept per thread (default CHECKPOINT_KEEP_LAST).",
+        )
+        parser.add_argument(
+            "--idle-days", type=float, default=idle_for.days if idle_for else None,
+            help="Drop threads idle for longer than this (default CHECKPOINT_IDLE_DAYS).",
+        )
+        parser.add_argument(
+            "--vacuum", action="store_true",
+            help="Run VACUUM ANALYZE on the checkpoint tables afterwards (Postgres only).",
+        )
+
+    def handle(self, *args, **options):
+        checkpointer = get_checkpointer()
+        idle_days = options["idle_days"]
+
+        start = time.perf_counter()
+        result = checkpointer.prune(
+            keep_last=options["keep_last"],
+            idle_for=timedelta(days=idle_days) if idle_days else None,
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Deleted {result['threads']} idle threads, {result['checkpoints']} checkpoints "
+            f"and {result['writes']} writes in {elapsed:.2f}s"
+        )
+
+        if options["vacuum"]:
+            connection = connections[checkpointer.using]
+            if connection.vendor != "postgresql":
+                self.stdout.write(self.style.WARNING("VACUUM skipped: not a Postgres database"))
+            else:
+                with connection.cursor() as cursor:
+                    for model in (AgentCheckpoint, AgentCheckpointWrite):
+                        cursor.execute(f'VACUUM ANALYZE "{model._meta.db_table}"')
+                self.stdout.write("Vacuumed checkpoint tables")
+
+        self.stdout.write(self.style.SUCCESS("Checkpoint compaction finished"))
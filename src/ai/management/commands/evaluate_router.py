@@ -0,0 +1,58 @@
+import json
+import statistics
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from ai import router
+
+
+class Command(BaseCommand):
+    help = "Report accuracy and latency of the local intent router on a labeled fixture."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixture", default=str(router.DATA_DIR / "router_eval.json"))
+        parser.add_argument("--repeat", type=int, default=100, help="Timing repetitions per example.")
+
+    def handle(self, *args, **options):
+        with open(options["fixture"], encoding="utf-8") as f:
+            examples = json.load(f)
+
+        correct, dispatched, correct_dispatches = 0, 0, 0
+        sources = Counter()
+        latencies = []
+        mistakes = []
+
+        for example in examples:
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                decision = router.route(example["text"])
+            latencies.append((time.perf_counter() - start) / options["repeat"])
+
+            sources[decision.source] += 1
+            if decision.agent:
+                dispatched += 1
+                correct_dispatches += decision.label == example["label"]
+            if decision.label == example["label"]:
+                correct += 1
+            else:
+                mistakes.append((example["text"], example["label"], decision))
+
+        total = len(examples)
+        self.stdout.write(f"Examples:            {total}")
+        self.stdout.write(f"Accuracy:            {correct / total:.1%}")
+        self.stdout.write(f"Dispatched directly: {dispatched / total:.1%} ({dispatched})")
+        if dispatched:
+            self.stdout.write(f"Dispatch precision:  {correct_dispatches / dispatched:.1%}")
+        self.stdout.write(f"Decisions by source: {dict(sources)}")
+        self.stdout.write(
+            f"Latency:             mean {statistics.mean(latencies) * 1e6:.1f} µs, "
+            f"p95 {statistics.quantiles(latencies, n=20)[-1] * 1e6:.1f} µs"
+        )
+
+        for text, expected, decision in mistakes:
+            self.stdout.write(self.style.WARNING(
+                f"  {text!r}: expected {expected}, got {decision.label} "
+                f"({decision.source}, {decision.confidence:.2f})"
+            ))
@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+
+from ai.benchmark.standins import PermitPDPStandIn
+from directories.models import Directory
+from my_permit.client import reset_permit_client
+
+
+LOAD_TEST_USERNAME = "load-test"
+
+# Label -> DB_POOL value the run is started with
+MODES = {"direct": "False", "pooled": "True"}
+
+
+def _tool_calls(tools, document_ids, calls):
+    """The read-heavy mix one simulated request makes."""
+    mix = [
+        (tools["list_documents"], {"limit": 10}),
+        (tools["search_query_documents"], {"query": "load", "limit": 10}),
+        (tools["get_document"], {"document_id": document_ids[0]}),
+    ]
+    return [mix[i % len(mix)] for i in range(calls)]
+
+
+async def run_load(user_id, requests, concurrency, calls):
+    """
+    Run `requests` simulated ASGI requests, `concurrency` at a time, each making
+    `calls` document tool calls through the async tool path.
+
+    Returns:
+        dict: Latency percentiles (ms), throughput and connection counts.
+    """
+    from ai.tools import document_tools
+
+    tools = {tool.name: tool for tool in document_tools}
+    document_ids = [
+        pk async for pk in Directory.objects.filter(owner_id=user_id).values_list("id", flat=True)[:1]
+    ]
+    config = {"configurable": {"user_id": user_id}}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def request():
+        async with semaphore, ThreadSensitiveContext():
+            start = time.perf_counter()
+            for tool, args in _tool_calls(tools, document_ids, calls):
+                result = await tool.ainvoke(args, config=config)
+                if "error" in result:
+                    raise CommandError(f"{tool.name} failed: {result['error']}")
+            # What Django's request_finished handler does at the end of a request
+            await sync_to_async(close_old_connections)()
+            latencies.append(time.perf_counter() - start)
+
+    checkouts = [0]
+
+    def count_checkout(sender, **kwargs):
+        checkouts[0] += 1
+
+    connection_created.connect(count_checkout)
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        connection_created.disconnect(count_checkout)
+
+    # With a pool, connection_created fires on every checkout; the pool counts real connects
+    pool = connection.pool
+    p95 = statistics.quantiles(latencies, n=20, method="inclusive")[-1] if len(latencies) > 1 else latencies[0]
+    return {
+        "requests": requests,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": p95 * 1000,
+        "throughput": requests / elapsed,
+        "opened": pool.get_stats()["connections_num"] if pool else checkouts[0],
+        "checkouts": checkouts[0],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the document tools with concurrent simulated requests, once with "
+        "a connection per request (DB_POOL=False) and once with the psycopg pool, "
+        "and compare connections opened and p95 latency, in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--calls", type=int, default=3, help="Tool calls per request.")
+        parser.add_argument("--documents", type=int, default=200, help="Documents seeded for the load-test user.")
+        parser.add_argument("--mode", choices=sorted(MODES), action="append", help="Run only these modes.")
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the test database between runs.")
+        # Internal: run one mode in this process and print its results as JSON
+        parser.add_argument("--run", type=int, metavar="USER_ID", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["run"] is not None:
+            self.stdout.write(json.dumps(self._run(options["run"], options)))
+            return
+
+        # The run creates and deletes its user and documents, so it never
+        # touches the configured databases
+        old_config = setup_databases(options["verbosity"], interactive=False, keepdb=options["keepdb"])
+        try:
+            user = self._seed(options["documents"])
+            try:
+                results = {mode: self._spawn(mode, user.id, options) for mode in options["mode"] or MODES}
+            finally:
+                user.delete()
+        finally:
+            teardown_databases(old_config, options["verbosity"], keepdb=options["keepdb"])
+        self._report(results)
+
+    def _seed(self, documents):
+        user, _ = get_user_model().objects.get_or_create(username=LOAD_TEST_USERNAME)
+        Directory.objects.filter(owner=user).delete()
+        Directory.objects.bulk_create(
+            Directory(owner=user, title=f"Load test document {i}", content=f"load test body {i}")
+            for i in range(max(documents, 1))
+        )
+        return user
+
+    def _spawn(self, mode, user_id, options):
+        # Pooling is fixed when settings load, so each mode gets its own process,
+        # pointed at the test database (whose replica alias would only mirror it)
+        env = {key: value for key, value in os.environ.items() if not key.startswith("DB_REPLICA_")}
+        self.stdout.write(f"Running {mode} ({options['requests']} requests, concurrency {options['concurrency']})...")
+        result = subprocess.run(
+            [
+                sys.executable, "manage.py", "load_test_tools", "--run", str(user_id),
+                "--requests", str(options["requests"]),
+                "--concurrency", str(options["concurrency"]),
+                "--calls", str(options["calls"]),
+            ],
+            cwd=settings.BASE_DIR,
+            env={**env, "DB_NAME": connection.settings_dict["NAME"], "DB_POOL": MODES[mode]},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"{mode} run failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def _run(self, user_id, options):
+        permit = PermitPDPStandIn()
+        with permit, override_settings(PERMIT_PDP_URL=permit.url, PERMIT_API_KEY="load-test"):
+            reset_permit_client()
+            try:
+                return asyncio.run(run_load(
+                    user_id,
+                    requests=max(options["requests"], 1),
+                    concurrency=max(options["concurrency"], 1),
+                    calls=max(options["calls"], 1),
+                ))
+            finally:
+                reset_permit_client()
+
+    def _report(self, results):
+        self.stdout.write("")
+        self.stdout.write(f"{'mode':<8} {'requests':>8} {'opened':>7} {'checkouts':>9} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8}")
+        for mode, stats in results.items():
+            self.stdout.write(
+                f"{mode:<8} {stats['requests']:>8} {stats['opened']:>7} {stats['checkouts']:>9} "
+                f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['throughput']:>8.1f}"
+            )
+        if set(results) == set(MODES):
+            direct, pooled = results["direct"], results["pooled"]
+            self.stdout.write("")
+            self.stdout.write(self.style.SUCCESS(
+                f"Connections opened: {direct['opened']} -> {pooled['opened']}; "
+                f"p95: {direct['p95']:.1f} -> {pooled['p95']:.1f} ms"
+            ))
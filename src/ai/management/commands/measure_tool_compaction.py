@@ -0,0 +1,62 @@
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from langchain_core.messages import ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from ai.compaction import compact_for_tool
+from ai.router import DATA_DIR
+
+
+def _token_counter():
+    # Exact counts need the tokenizer files; fall back to the estimate used for history budgets
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return (lambda text: len(encoding.encode(text))), "o200k_base"
+    except Exception:
+        return (lambda text: count_tokens_approximately([ToolMessage(content=text, tool_call_id="x")])), "approximate"
+
+
+class Command(BaseCommand):
+    help = "Measure how many tokens tool-output compaction saves on a fixture conversation set."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixture", default=str(DATA_DIR / "tool_outputs.json"))
+
+    def handle(self, *args, **options):
+        with open(options["fixture"], encoding="utf-8") as f:
+            conversations = json.load(f)
+
+        count, counter_name = _token_counter()
+        per_tool = defaultdict(lambda: [0, 0, 0])
+
+        self.stdout.write(f"Token counter: {counter_name}")
+        for conversation in conversations:
+            before = after = 0
+            for result in conversation["tool_results"]:
+                # What the tool node would send without compaction
+                raw = json.dumps(result["output"], ensure_ascii=False)
+                raw_tokens = count(raw)
+                compact_tokens = count(compact_for_tool(result["tool"], raw))
+
+                stats = per_tool[result["tool"]]
+                stats[0] += 1
+                stats[1] += raw_tokens
+                stats[2] += compact_tokens
+                before += raw_tokens
+                after += compact_tokens
+            self.stdout.write(f"  {conversation['name']:<28} {before:>6} -> {after:>6} tokens ({1 - after / before:.0%} saved)")
+
+        self.stdout.write("")
+        self.stdout.write(f"{'tool':<24} {'calls':>5} {'before':>7} {'after':>7} {'saved':>6}")
+        total_before = total_after = 0
+        for tool, (calls, before, after) in sorted(per_tool.items()):
+            total_before += before
+            total_after += after
+            self.stdout.write(f"{tool:<24} {calls:>5} {before:>7} {after:>7} {1 - after / before:>6.0%}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'total':<24} {'':>5} {total_before:>7} {total_after:>7} {1 - total_after / total_before:>6.0%}"
+        ))
@@ -0,0 +1,31 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from ai.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (ai.jobs). Workers claim jobs with "
+        "SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can run side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is ready.")
+        parser.add_argument("--poll-interval", type=float, default=None, help="Seconds between polls of an empty queue (default JOB_POLL_INTERVAL).")
+        parser.add_argument("--name", default=None, help="Worker name stored on claimed jobs (default host:pid).")
+
+    def handle(self, *args, **options):
+        worker = Worker(name=options["name"], poll_interval=options["poll_interval"])
+
+        def stop(signum, frame):
+            self.stdout.write(f"Stopping after the current job ({signal.Signals(signum).name})")
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f"Worker {worker.name} started")
+        worker.run(burst=options["burst"])
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker.name} stopped after {worker.processed} job(s)"))
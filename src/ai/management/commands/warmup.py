@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.warmup import STEPS, report_lines, run_warmup
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile agent graphs, open connections and fill the TMDB cache, reporting "
+        "the time per step. Graphs and clients only live in this process, so this "
+        "measures a cold start; set AGENT_WARMUP_ON_START to warm each server "
+        "process before it accepts requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--step", action="append", choices=list(STEPS), help="Run only this step (repeatable).")
+
+    def handle(self, *args, **options):
+        results = run_warmup(options["step"])
+
+        for line, ok in report_lines(results):
+            self.stdout.write(line if ok else self.style.ERROR(line))
+
+        failed = sum(error is not None for _, _, _, error in results)
+        if failed:
+            raise CommandError(f"{failed} warm-up step(s) failed")
@@ -0,0 +1,266 @@
+"""
+Memoized results of read-only tool calls, per conversation thread.
+
+Agents often repeat a read in later turns of a conversation (the same
+get_document id, the same search_movies query). ToolMemoMiddleware keeps the
+results of secured_tool(memoize=True) tools in a `tool_memo` key of the graph
+state, so they are checkpointed with the thread and passed between the
+supervisor and its agents; a repeated call is answered from there without
+running the tool. Its permission checks still run, from the permission cache.
+
+Entries expire after TOOL_MEMO_TTL seconds. writes=True tools and background
+jobs invalidate a user's entries for their resource, in every thread, by
+recording the time of the write in TOOL_MEMO_CACHE_ALIAS. Every worker and the
+job runner must see those marks, so memoization stays off unless that cache is
+shared between processes (the ai.E002 system check reports it).
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import Annotated
+
+from django.conf import settings
+from django.core.cache import caches
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain_core.messages import ToolMessage
+from langgraph.prebuilt.chat_agent_executor import AgentState as SupervisorAgentState
+from langgraph.types import Command
+from typing_extensions import NotRequired
+
+from ai.checks import is_shared_cache
+from ai.metrics import TOOL_MEMO_LOOKUPS
+
+
+logger = logging.getLogger(__name__)
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def memo_key(tool, arguments):
+    """
+    Key of a tool call: sha256 of the tool name and its arguments.
+
+    Args:
+        tool (str): Tool name.
+        arguments (dict): Call arguments with defaults applied; strings are
+            stripped so incidental whitespace still matches.
+    """
+    payload = json.dumps([tool, _normalize(arguments)], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# Invalidation
+# -----------------------------
+def enabled():
+    """Whether memoization is on: a TOOL_MEMO_TTL and a shared cache for the write marks."""
+    return bool(settings.TOOL_MEMO_TTL) and is_shared_cache(settings.TOOL_MEMO_CACHE_ALIAS)
+
+
+def _marks():
+    return caches[settings.TOOL_MEMO_CACHE_ALIAS]
+
+
+def _written_key(user_id, resource):
+    return f"ai:memo:written:{user_id}:{resource}"
+
+
+def invalidate(user_id, resource):
+    """
+    Make the user's memoized results for `resource` stale in every thread.
+
+    Called after the write succeeded, so a cache failure is logged rather than
+    raised: the caller must not report (and maybe retry) a write that happened.
+    """
+    if not enabled():
+        return
+    try:
+        # Entries older than the TTL are stale anyway, so the mark can expire with them
+        _marks().set(_written_key(user_id, resource), time.time(), settings.TOOL_MEMO_TTL)
+    except Exception:
+        logger.exception("Could not invalidate memoized %s results of user %s", resource, user_id)
+
+
+async def ainvalidate(user_id, resource):
+    """invalidate() for async code; the shared cache may be the database."""
+    if not enabled():
+        return
+    try:
+        await _marks().aset(_written_key(user_id, resource), time.time(), settings.TOOL_MEMO_TTL)
+    except Exception:
+        logger.exception("Could not invalidate memoized %s results of user %s", resource, user_id)
+
+
+def _expired(entry):
+    return time.time() - entry["stored_at"] >= settings.TOOL_MEMO_TTL
+
+
+def _written_since(entry, written_at):
+    return written_at is not None and entry["stored_at"] <= written_at
+
+
+# An unreadable write mark counts as a write: the tool runs instead of failing
+def _is_fresh(entry, user_id):
+    if _expired(entry):
+        return False
+    try:
+        written_at = _marks().get(_written_key(user_id, entry["resource"]))
+    except Exception:
+        logger.warning("Could not read the memo write mark of user %s", user_id, exc_info=True)
+        return False
+    return not _written_since(entry, written_at)
+
+
+async def _ais_fresh(entry, user_id):
+    if _expired(entry):
+        return False
+    try:
+        written_at = await _marks().aget(_written_key(user_id, entry["resource"]))
+    except Exception:
+        logger.warning("Could not read the memo write mark of user %s", user_id, exc_info=True)
+        return False
+    return not _written_since(entry, written_at)
+
+
+# -----------------------------
+# State
+# -----------------------------
+def merge_memo(current, update):
+    """Reducer of the `tool_memo` state key: newest entries win, expired ones are dropped."""
+    merged = {**(current or {}), **(update or {})}
+    cutoff = time.time() - settings.TOOL_MEMO_TTL
+    entries = sorted(
+        ((key, entry) for key, entry in merged.items() if entry["stored_at"] > cutoff),
+        key=lambda item: item[1]["stored_at"],
+    )
+    return dict(entries[-settings.TOOL_MEMO_MAX_ENTRIES:])
+
+
+class ToolMemoState(AgentState):
+    tool_memo: NotRequired[Annotated[dict, merge_memo]]
+
+
+class SupervisorState(SupervisorAgentState):
+    """create_supervisor state; carries `tool_memo` between its agents and turns."""
+
+    tool_memo: NotRequired[Annotated[dict, merge_memo]]
+
+
+# -----------------------------
+# Middleware
+# -----------------------------
+def _allowed(user_id, checks):
+    from ai.tools.secured import check_permission
+
+    try:
+        return all(check_permission(user_id, resource, action) for resource, action in checks)
+    except Exception:
+        return False
+
+
+async def _aallowed(user_id, checks):
+    from ai.tools.secured import acheck_permission
+
+    try:
+        for resource, action in checks:
+            if not await acheck_permission(user_id, resource, action):
+                return False
+    except Exception:
+        return False
+    return True
+
+
+def _arguments(tool, args):
+    # Defaults filled in, so search_movies("x") and search_movies("x", limit=5) match
+    try:
+        return tool.tool_call_schema.model_validate(args).model_dump()
+    except Exception:
+        return args
+
+
+def _memoizable(result):
+    # Tools report handled failures as {"error": ...}, serialized with that key first
+    return (
+        isinstance(result, ToolMessage) and result.status != "error"
+        and isinstance(result.content, str) and not result.content.startswith('{"error"')
+    )
+
+
+class ToolMemoMiddleware(AgentMiddleware):
+    """
+    Answer repeated memoize=True tool calls from the thread's `tool_memo`.
+
+    Keep it before ToolOutputCompactionMiddleware so it stores and replays the
+    compacted output the model saw.
+    """
+
+    state_schema = ToolMemoState
+
+    def _find(self, request):
+        """(key, user_id, entry) of a memoizable call; key is None for other calls, entry unchecked."""
+        metadata = getattr(request.tool, "metadata", None) or {}
+        user_id = (request.runtime.config.get("configurable") or {}).get("user_id")
+        if not metadata.get("memoize") or not user_id or not enabled():
+            return None, None, None
+
+        key = memo_key(request.tool_call["name"], _arguments(request.tool, request.tool_call["args"]))
+        return key, int(user_id), (request.state.get("tool_memo") or {}).get(key)
+
+    def _count(self, request, key, entry):
+        if key is not None:
+            TOOL_MEMO_LOOKUPS.labels(request.tool_call["name"], "miss" if entry is None else "hit").inc()
+
+    def _lookup(self, request):
+        """(key, user_id, entry) of a memoizable call; key is None for other calls, entry on a hit."""
+        key, user_id, entry = self._find(request)
+        if entry is not None and not _is_fresh(entry, user_id):
+            entry = None
+        self._count(request, key, entry)
+        return key, user_id, entry
+
+    async def _alookup(self, request):
+        key, user_id, entry = self._find(request)
+        if entry is not None and not await _ais_fresh(entry, user_id):
+            entry = None
+        self._count(request, key, entry)
+        return key, user_id, entry
+
+    def _replay(self, request, entry):
+        return ToolMessage(
+            content=entry["content"], name=request.tool_call["name"], tool_call_id=request.tool_call["id"],
+        )
+
+    def _store(self, request, key, stored_at, result):
+        if not _memoizable(result):
+            return result
+        resource = request.tool.metadata["permit_checks"][0][0]
+        entry = {"content": result.content, "resource": resource, "stored_at": stored_at}
+        return Command(update={"messages": [result], "tool_memo": {key: entry}})
+
+    def wrap_tool_call(self, request, handler):
+        key, user_id, entry = self._lookup(request)
+        if key is None:
+            return handler(request)
+        # On a denied or failed check the tool runs and reports it
+        if entry is not None and _allowed(user_id, request.tool.metadata["permit_checks"]):
+            return self._replay(request, entry)
+        # Stamped before the call, so a write landing meanwhile invalidates the result
+        stored_at = time.time()
+        return self._store(request, key, stored_at, handler(request))
+
+    async def awrap_tool_call(self, request, handler):
+        key, user_id, entry = await self._alookup(request)
+        if key is None:
+            return await handler(request)
+        if entry is not None and await _aallowed(user_id, request.tool.metadata["permit_checks"]):
+            return self._replay(request, entry)
+        stored_at = time.time()
+        return self._store(request, key, stored_at, await handler(request))
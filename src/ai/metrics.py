@@ -0,0 +1,192 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from movies import tracing
+
+
+PERMISSION = "permission"
+DB = "db"
+HTTP = "http"
+
+TOOL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PHASE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+TOOL_CALLS = Counter(
+    "agent_tool_calls_total",
+    "Agent tool calls by outcome (success, error, permission_denied).",
+    ["tool", "outcome"],
+)
+TOOL_DURATION = Histogram(
+    "agent_tool_duration_seconds",
+    "Wall time of agent tool calls.",
+    ["tool"],
+    buckets=TOOL_BUCKETS,
+)
+TOOL_PHASE_DURATION = Histogram(
+    "agent_tool_phase_duration_seconds",
+    "Time a tool call spent in each phase (permission check, DB, external HTTP).",
+    ["tool", "phase"],
+    buckets=PHASE_BUCKETS,
+)
+JOB_RUNS = Counter(
+    "agent_job_runs_total",
+    "Background job attempts by kind and outcome (succeeded, retried, failed, lost).",
+    ["kind", "outcome"],
+)
+JOB_DURATION = Histogram(
+    "agent_job_duration_seconds",
+    "Run time of background job attempts.",
+    ["kind"],
+    buckets=TOOL_BUCKETS,
+)
+PERMISSION_LOOKUPS = Counter(
+    "agent_permission_lookups_total",
+    "Permit decisions for tool calls, served from the permission cache (hit) or the PDP (miss).",
+    ["result"],
+)
+CIRCUIT_STATE = Gauge(
+    "agent_circuit_state",
+    "Circuit breaker state per dependency: 0 closed, 1 half-open, 2 open.",
+    ["breaker"],
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "agent_circuit_transitions_total",
+    "Circuit breaker state changes by the state entered.",
+    ["breaker", "state"],
+)
+CIRCUIT_REJECTIONS = Counter(
+    "agent_circuit_rejections_total",
+    "Calls failed fast because the dependency's circuit was open.",
+    ["breaker"],
+)
+STALE_SERVED = Counter(
+    "agent_stale_served_total",
+    "Expired cache entries served because their dependency was failing.",
+    ["breaker"],
+)
+
+PREFETCHES = Counter(
+    "agent_prefetch_total",
+    "Speculative TMDB movie-detail prefetches by outcome (fetched, failed, cached, cancelled, dropped).",
+    ["outcome"],
+)
+PREFETCH_HITS = Counter(
+    "agent_prefetch_hits_total",
+    "Movie-detail lookups of a movie fetched by a prefetch.",
+)
+
+TOOL_MEMO_LOOKUPS = Counter(
+    "agent_tool_memo_lookups_total",
+    "Read-only tool calls answered from the thread's memoized results (hit) or run (miss).",
+    ["tool", "result"],
+)
+
+
+# -----------------------------
+# Per-call phase accounting
+# -----------------------------
+class ToolCall:
+    __slots__ = ("tool", "phases", "denied", "failed", "result")
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.phases = {}
+        self.denied = False
+        self.failed = False
+        self.result = None
+
+
+# Set for the duration of a tool call; tools run in a copy of the caller's
+# context (thread pool or async_to_sync), which still points at this object.
+_current_call = ContextVar("agent_tool_call", default=None)
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to `name` for the running tool call, if any."""
+    call = _current_call.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if call is not None:
+            call.phases[name] = call.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def record_permission(allowed):
+    """Note a denied permission check so the call is counted as permission_denied."""
+    call = _current_call.get()
+    if call is not None and not allowed:
+        call.denied = True
+
+
+def record_error():
+    """Note a handled failure (an {"error": ...} result) so the call is counted as error."""
+    call = _current_call.get()
+    if call is not None:
+        call.failed = True
+
+
+def time_queries(execute, sql, params, many, context):
+    """Django execute wrapper that books query time to the running tool call and trace."""
+    if _current_call.get() is None and tracing.current_span() is None:
+        return execute(sql, params, many, context)
+    with tracing.span("db.query", **{"db.statement": sql[:200], "db.alias": context["connection"].alias}), phase(DB):
+        return execute(sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # connection_created fires on every (re)connect of a per-thread connection object
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+# -----------------------------
+# Tool call tracking
+# -----------------------------
+def _outcome(call, failed):
+    if call.denied:
+        return "permission_denied"
+    # Raised, reported by the tool (record_error), or turned into an error ToolMessage
+    if failed or call.failed or getattr(call.result, "status", None) == "error":
+        return "error"
+    return "success"
+
+
+def _observe(call, elapsed, failed):
+    TOOL_DURATION.labels(call.tool).observe(elapsed)
+    TOOL_CALLS.labels(call.tool, _outcome(call, failed)).inc()
+    for name, seconds in call.phases.items():
+        TOOL_PHASE_DURATION.labels(call.tool, name).observe(seconds)
+
+
+@contextmanager
+def track_tool_call(tool):
+    """
+    Time a tool call and count its outcome when the block exits.
+
+    Yields:
+        ToolCall: Set `.result` to the tool's ToolMessage so handled errors are counted.
+    """
+    call = ToolCall(tool)
+    token = _current_call.set(call)
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield call
+        failed = False
+    finally:
+        _current_call.reset(token)
+        _observe(call, time.perf_counter() - start, failed)
+
+
+def __getattr__(name):
+    # The agent middleware needs LangChain; ai.instrumentation loads it on first use
+    if name == "ToolMetricsMiddleware":
+        from ai.instrumentation import ToolMetricsMiddleware
+
+        return ToolMetricsMiddleware
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('llm_hash', models.CharField(max_length=64)),
+                ('prefix_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('query_text', models.TextField(blank=True, default='')),
+                ('embedding', models.JSONField(blank=True, null=True)),
+                ('response', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['llm_hash', 'prefix_hash'], name='llm_cache_semantic_idx'), models.Index(fields=['last_used_at'], name='llm_cache_last_used_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0003_agent_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agentjob',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class LLMCacheEntry(models.Model):
+    # sha256 of (llm_string, normalized messages)
+    key = models.CharField(max_length=64, unique=True)
+    # sha256 of llm_string (model, params and bound tools)
+    llm_hash = models.CharField(max_length=64)
+    # sha256 of the messages before the final user turn; semantic lookups only
+    # compare entries that share it
+    prefix_hash = models.CharField(max_length=64, blank=True, default="")
+    query_text = models.TextField(blank=True, default="")
+    embedding = models.JSONField(null=True, blank=True)
+    response = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["llm_hash", "prefix_hash"], name="llm_cache_semantic_idx"),
+            models.Index(fields=["last_used_at"], name="llm_cache_last_used_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.hits} hits)"
+
+
+class AgentCheckpoint(models.Model):
+    thread_id = models.CharField(max_length=255)
+    checkpoint_ns = models.CharField(max_length=255, blank=True, default="")
+    # uuid6 ids sort by creation time, so the latest checkpoint is the max id
+    checkpoint_id = models.CharField(max_length=64)
+    parent_checkpoint_id = models.CharField(max_length=64, null=True, blank=True)
+    # Serialized with the saver's serde; channel values are stored inline
+    checkpoint_type = models.CharField(max_length=32)
+    checkpoint = models.BinaryField()
+    metadata_type = models.CharField(max_length=32)
+    metadata = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also serves "latest checkpoint of a thread" as a backward index scan
+            models.UniqueConstraint(
+                fields=["thread_id", "checkpoint_ns", "checkpoint_id"],
+                name="agent_checkpoint_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["thread_id", "created_at"], name="agent_checkpoint_activity_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.thread_id}:{self.checkpoint_ns}:{self.checkpoint_id}"
+
+
+class AgentCheckpointWrite(models.Model):
+    thread_id = models.CharField(max_length=255)
+    checkpoint_ns = models.CharField(max_length=255, blank=True, default="")
+    checkpoint_id = models.CharField(max_length=64)
+    task_id = models.CharField(max_length=64)
+    task_path = models.CharField(max_length=255, blank=True, default="")
+    idx = models.IntegerField()
+    channel = models.CharField(max_length=255)
+    value_type = models.CharField(max_length=32)
+    value = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx"],
+                name="agent_checkpoint_write_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.thread_id}:{self.checkpoint_id}:{self.task_id}:{self.idx}"
+
+
+class AgentJob(models.Model):
+    """Background work queued by agent tools and run by `manage.py run_jobs` (ai.jobs)."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=64)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="agent_jobs")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Earliest time a worker may pick the job up; pushed back between retries
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    # Heartbeat of the worker running the job; stale ones are requeued
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers only scan queued jobs, oldest first
+            models.Index(
+                fields=["run_after", "id"],
+                name="agent_job_ready_idx",
+                condition=models.Q(status="queued"),
+            ),
+            models.Index(fields=["owner", "-created_at"], name="agent_job_owner_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,125 @@
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+from django.db import close_old_connections
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field, create_model, field_validator
+
+
+PARALLEL_TOOL_NAME = "delegate_in_parallel"
+
+
+def _sub_config(config: RunnableConfig, agent_name: str) -> RunnableConfig:
+    """
+    Build the config for one fanned-out agent run.
+
+    Each agent keeps its own thread (derived from the parent thread) so parallel
+    runs never write to the supervisor's checkpoints; callbacks are passed on so
+    the runs still show up in streaming and tracing.
+    """
+    configurable = config.get("configurable") or {}
+    thread_id = configurable.get("thread_id") or uuid.uuid4().hex
+    return {
+        "callbacks": config.get("callbacks"),
+        "configurable": {
+            "user_id": configurable.get("user_id"),
+            "thread_id": f"{thread_id}:{agent_name}",
+        },
+    }
+
+
+def _format_results(tasks, results):
+    sections = []
+    for task, result in zip(tasks, results):
+        if isinstance(result, BaseException):
+            body = f"Error: {result}"
+        else:
+            body = result["messages"][-1].text
+        sections.append(f"[{task.agent}] {task.task}\n{body}")
+    return "\n\n".join(sections)
+
+
+def create_parallel_delegation_tool(agents):
+    """
+    Build a supervisor tool that runs independent sub-tasks on several agents at once.
+
+    Args:
+        agents (list): Compiled agent graphs; their names are the valid targets.
+
+    Returns:
+        StructuredTool: `delegate_in_parallel(tasks)` returning every agent's final answer.
+    """
+    agents_by_name = {agent.name: agent for agent in agents}
+
+    SubTask = create_model(
+        "SubTask",
+        agent=(Literal[tuple(agents_by_name)], Field(description="Agent that handles this sub-task.")),
+        task=(str, Field(description="Self-contained instruction for the agent.")),
+    )
+
+    class ParallelDelegation(BaseModel):
+        tasks: list[SubTask] = Field(description="Independent sub-tasks, at most one per agent.")
+
+        @field_validator("tasks")
+        @classmethod
+        def one_task_per_agent(cls, tasks):
+            # Each agent runs on one child thread (_sub_config), which two
+            # concurrent runs would overwrite
+            agents = [task.agent for task in tasks]
+            duplicates = sorted({agent for agent in agents if agents.count(agent) > 1})
+            if duplicates:
+                raise ValueError(
+                    f"more than one task for {', '.join(duplicates)}; "
+                    "combine them into one task per agent"
+                )
+            return tasks
+
+    def run_one(task, config):
+        try:
+            agent = agents_by_name[task.agent]
+            return agent.invoke(
+                {"messages": [HumanMessage(content=task.task)]},
+                _sub_config(config, agent.name),
+            )
+        finally:
+            # Worker threads open their own DB connections
+            close_old_connections()
+
+    def delegate(tasks, config: RunnableConfig):
+        with ThreadPoolExecutor(max_workers=len(tasks) or 1) as executor:
+            futures = [executor.submit(run_one, task, config) for task in tasks]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+        return _format_results(tasks, results)
+
+    async def adelegate(tasks, config: RunnableConfig):
+        results = await asyncio.gather(
+            *(
+                agents_by_name[task.agent].ainvoke(
+                    {"messages": [HumanMessage(content=task.task)]},
+                    _sub_config(config, task.agent),
+                )
+                for task in tasks
+            ),
+            return_exceptions=True,
+        )
+        return _format_results(tasks, results)
+
+    return StructuredTool.from_function(
+        func=delegate,
+        coroutine=adelegate,
+        name=PARALLEL_TOOL_NAME,
+        description=(
+            "Run independent sub-tasks on several agents at the same time and get all their answers. "
+            "Only use it when no sub-task needs another one's result."
+        ),
+        args_schema=ParallelDelegation,
+    )
@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.conf import settings
+
+from ai import agents
+from ai.checkpointer import get_checkpointer
+from ai.llms import DEFAULT_MODEL, get_openai_model
+from ai.supervisor import get_supervisor
+
+
+# -----------------------------
+# Process-wide compiled graphs
+# -----------------------------
+# Compiled graphs hold no per-run state, so one instance per
+# (model, checkpointer) can be shared by every request in the process.
+_graphs = {}
+_lock = threading.Lock()
+
+
+def _checkpointer_key(checkpointer):
+    if checkpointer is None:
+        return None
+    # The cached graph keeps a reference to the checkpointer, so its id stays unique
+    return (type(checkpointer).__name__, id(checkpointer))
+
+
+def get_supervisor_graph(model=None, checkpointer=None, parallel=None):
+    """
+    Return the compiled supervisor graph for this model and checkpointer,
+    building it on first use.
+
+    Args:
+        model (str, optional): OpenAI model name (default DEFAULT_MODEL).
+        checkpointer: LangGraph checkpointer shared by the supervisor and agents
+            (default: the durable project checkpointer).
+        parallel (bool, optional): Build the fan-out supervisor
+            (default SUPERVISOR_PARALLEL).
+
+    Returns:
+        CompiledStateGraph: Cached supervisor graph.
+    """
+    model = model or DEFAULT_MODEL
+    if checkpointer is None:
+        checkpointer = get_checkpointer()
+    if parallel is None:
+        parallel = settings.SUPERVISOR_PARALLEL
+    key = (model, _checkpointer_key(checkpointer), parallel)
+
+    graph = _graphs.get(key)
+    if graph is not None:
+        return graph
+
+    with _lock:
+        # Another thread may have built it while we waited for the lock
+        graph = _graphs.get(key)
+        if graph is None:
+            graph = get_supervisor(model=model, checkpointer=checkpointer, parallel=parallel)
+            _graphs[key] = graph
+    return graph
+
+
+AGENT_BUILDERS = {
+    "document_agent": agents.get_document_agent,
+    "movie_agent": agents.get_movie_agent,
+}
+
+
+def get_agent_graph(name, model=None, checkpointer=None):
+    """
+    Return a compiled sub-agent graph (used when a request skips the supervisor).
+
+    Args:
+        name (str): "document_agent" or "movie_agent".
+        model (str, optional): OpenAI model name (default DEFAULT_MODEL).
+        checkpointer: LangGraph checkpointer (default: the durable project checkpointer).
+
+    Returns:
+        CompiledStateGraph: Cached agent graph.
+    """
+    model = model or DEFAULT_MODEL
+    if checkpointer is None:
+        checkpointer = get_checkpointer()
+    key = ("agent", name, model, _checkpointer_key(checkpointer))
+
+    graph = _graphs.get(key)
+    if graph is not None:
+        return graph
+
+    with _lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            graph = AGENT_BUILDERS[name](get_openai_model(model=model), checkpointer)
+            _graphs[key] = graph
+    return graph
+
+
+def warm_up(models=None, checkpointer=None):
+    """
+    Build and compile the supervisor graphs ahead of the first request.
+
+    Args:
+        models (list[str], optional): Models to compile for (default [DEFAULT_MODEL]).
+        checkpointer: Checkpointer the graphs will be used with
+            (default: the durable project checkpointer).
+
+    Returns:
+        dict: Seconds spent per model.
+    """
+    timings = {}
+    for model in models or [DEFAULT_MODEL]:
+        start = time.perf_counter()
+        get_supervisor_graph(model=model, checkpointer=checkpointer)
+        timings[model] = time.perf_counter() - start
+    return timings
+
+
+def clear():
+    """Drop every cached graph (e.g. after settings change in tests)."""
+    with _lock:
+        _graphs.clear()
@@ -0,0 +1,177 @@
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage
+
+from ai import instrumentation, registry
+
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+SUPERVISOR = "supervisor"
+
+# -----------------------------
+# Keyword rules
+# -----------------------------
+RULES = {
+    "document_agent": [
+        re.compile(r"\bdoc(ument)?s?\b"),
+        re.compile(r"\bnotes?\b"),
+        re.compile(r"\bfiles?\b"),
+    ],
+    "movie_agent": [
+        re.compile(r"\b(movies?|films?|tmdb|cinema)\b"),
+        re.compile(r"\bwatch\b"),
+        re.compile(r"\b(sci-fi|comed(y|ies)|horror|thrillers?|heist|romantic|animated|documentar(y|ies))\b"),
+        re.compile(r"\b(runtime|genres?|released|sequel|plot|overview)\b"),
+    ],
+}
+
+# Requests that chain steps ("... and then ...") need the supervisor
+MULTI_STEP = re.compile(r"\b(then|after that|and (also )?(save|create|write|make|list|delete|find|search|show))\b")
+
+@dataclass(frozen=True)
+class Route:
+    agent: str | None  # None means "ask the LLM supervisor"
+    confidence: float
+    source: str  # "rules", "fallback" or "history"
+
+    @property
+    def label(self):
+        return self.agent or SUPERVISOR
+
+
+# -----------------------------
+# Routing
+# -----------------------------
+def route(text):
+    """
+    Decide which agent should handle a request without calling an LLM.
+
+    Only requests a keyword rule places in exactly one domain are dispatched;
+    everything else falls back to the supervisor.
+
+    Args:
+        text (str): The user's message.
+
+    Returns:
+        Route: The chosen agent, or agent=None to fall back to the supervisor.
+    """
+    text = text.lower()
+
+    if MULTI_STEP.search(text):
+        return Route(None, 0.0, "rules")
+
+    matched = [agent for agent, patterns in RULES.items() if any(p.search(text) for p in patterns)]
+    if len(matched) == 1:
+        return Route(matched[0], 1.0, "rules")
+    if len(matched) > 1:
+        # Touches both domains: the supervisor has to sequence it
+        return Route(None, 0.0, "rules")
+
+    return Route(None, 0.0, "fallback")
+
+
+# -----------------------------
+# Threads
+# -----------------------------
+# The router only reads the latest message, so it dispatches directly only on
+# the first turn of a conversation: a follow-up like "delete it" needs the
+# supervisor and the history. A dispatched turn is then copied into the
+# supervisor's thread (share_exchange), where every later turn runs.
+def _thread_id(config):
+    return (config.get("configurable") or {}).get("thread_id")
+
+
+def _agent_config(config, agent_name):
+    # Directly dispatched agents keep their own thread, like fanned-out runs
+    configurable = dict(config.get("configurable") or {})
+    if configurable.get("thread_id"):
+        configurable["thread_id"] = f"{configurable['thread_id']}:{agent_name}"
+    return {**config, "configurable": configurable}
+
+
+def _exchange(text, agent_name, output):
+    # What the supervisor keeps of a delegated turn: the request and the agent's answer
+    answer = output["messages"][-1].model_copy(update={"name": agent_name})
+    return {"messages": [HumanMessage(content=text), answer], "tool_memo": output.get("tool_memo") or {}}
+
+
+def _dispatch(decision, config, model, checkpointer):
+    if decision.agent:
+        graph = registry.get_agent_graph(decision.agent, model=model, checkpointer=checkpointer)
+        config = _agent_config(config, decision.agent)
+    else:
+        graph = registry.get_supervisor_graph(model=model, checkpointer=checkpointer)
+    config = instrumentation.traced_config(config, agent_names=(SUPERVISOR, *registry.AGENT_BUILDERS))
+    return decision, graph, config
+
+
+def select_graph(text, config, model=None, checkpointer=None):
+    """
+    Pick the graph for one user message.
+
+    Returns:
+        tuple: (Route, compiled graph, config to run it with)
+    """
+    decision = route(text)
+    if decision.agent and _thread_id(config):
+        supervisor = registry.get_supervisor_graph(model=model, checkpointer=checkpointer)
+        if supervisor.get_state(config).values.get("messages"):
+            decision = Route(None, decision.confidence, "history")
+    return _dispatch(decision, config, model, checkpointer)
+
+
+async def aselect_graph(text, config, model=None, checkpointer=None):
+    """Async version of select_graph()."""
+    decision = route(text)
+    if decision.agent and _thread_id(config):
+        supervisor = registry.get_supervisor_graph(model=model, checkpointer=checkpointer)
+        if (await supervisor.aget_state(config)).values.get("messages"):
+            decision = Route(None, decision.confidence, "history")
+    return _dispatch(decision, config, model, checkpointer)
+
+
+def share_exchange(text, decision, output, config, model=None, checkpointer=None):
+    """
+    Copy a directly dispatched turn into the supervisor's thread.
+
+    Args:
+        text (str): The user's message.
+        decision (Route): The route the turn took; supervisor turns are left alone.
+        output (dict): Final state of the agent run.
+        config (dict): The turn's config (the supervisor's thread).
+    """
+    if decision.agent and _thread_id(config):
+        supervisor = registry.get_supervisor_graph(model=model, checkpointer=checkpointer)
+        supervisor.update_state(config, _exchange(text, decision.agent, output), as_node=SUPERVISOR)
+
+
+async def ashare_exchange(text, decision, output, config, model=None, checkpointer=None):
+    """Async version of share_exchange()."""
+    if decision.agent and _thread_id(config):
+        supervisor = registry.get_supervisor_graph(model=model, checkpointer=checkpointer)
+        await supervisor.aupdate_state(config, _exchange(text, decision.agent, output), as_node=SUPERVISOR)
+
+
+def run(text, config, model=None, checkpointer=None):
+    """
+    Handle one user message: dispatch straight to an agent when the router is
+    confident and the conversation is new, otherwise run the LLM supervisor.
+
+    Returns:
+        tuple: (graph output, Route)
+    """
+    decision, graph, run_config = select_graph(text, config, model, checkpointer)
+    output = graph.invoke({"messages": [HumanMessage(content=text)]}, run_config)
+    share_exchange(text, decision, output, config, model, checkpointer)
+    return output, decision
+
+
+async def arun(text, config, model=None, checkpointer=None):
+    """Async version of run()."""
+    decision, graph, run_config = await aselect_graph(text, config, model, checkpointer)
+    output = await graph.ainvoke({"messages": [HumanMessage(content=text)]}, run_config)
+    await ashare_exchange(text, decision, output, config, model, checkpointer)
+    return output, decision
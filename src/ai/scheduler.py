@@ -0,0 +1,243 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+
+class QueueFull(Exception):
+    """Raised when a run can't be queued; request handlers answer with 429."""
+
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+class Reservation:
+    """
+    A place in the run queue.
+
+    Use it as a context manager (`async with` or `with`): entering waits for a
+    run slot, leaving frees it. Leaving while still queued (e.g. the request
+    was cancelled because the client went away) just drops the place in line.
+    """
+
+    def __init__(self, scheduler, user_key):
+        self.scheduler = scheduler
+        self.user_key = user_key
+        self.granted = False
+        self.done = False
+        self._future = None
+        self._event = None
+
+    def _notify(self):
+        # Called by the scheduler, possibly from another thread or event loop
+        if self._future is not None:
+            self._future.get_loop().call_soon_threadsafe(self._wake)
+        elif self._event is not None:
+            self._event.set()
+
+    def _wake(self):
+        if not self._future.done():
+            self._future.set_result(None)
+
+    def cancel(self):
+        """Give back the slot or the place in line; safe to call more than once."""
+        self.scheduler._finish(self)
+
+    async def __aenter__(self):
+        with self.scheduler._lock:
+            if not self.granted:
+                self._future = asyncio.get_running_loop().create_future()
+        try:
+            if self._future is not None:
+                await self._future
+        except BaseException:
+            self.cancel()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.cancel()
+
+    def __enter__(self):
+        with self.scheduler._lock:
+            if not self.granted:
+                self._event = threading.Event()
+        try:
+            if self._event is not None:
+                self._event.wait()
+        except BaseException:
+            self.cancel()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+
+class RunScheduler:
+    """
+    Admission control for agent runs.
+
+    At most `max_concurrent` runs execute at once. Extra runs wait in per-user
+    queues that are served round-robin, so one busy user can't starve the rest.
+    Once `max_queued` runs are waiting (or `max_queued_per_user` for one user)
+    new runs are rejected right away with QueueFull instead of piling up.
+    """
+
+    def __init__(self, max_concurrent, max_queued, max_queued_per_user=None):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queued = 0
+        # user -> waiting reservations; dict order is the round-robin order
+        self._queues = OrderedDict()
+
+    def reserve(self, user_id):
+        """
+        Take a place in line for one run, failing fast when the queue is full.
+
+        Raises:
+            QueueFull: The global or per-user queue limit is reached.
+        """
+        reservation = Reservation(self, user_id)
+        with self._lock:
+            if self._running < self.max_concurrent and not self._queued:
+                self._running += 1
+                reservation.granted = True
+                return reservation
+
+            if self._queued >= self.max_queued:
+                raise QueueFull("Too many agent runs are waiting, try again shortly")
+            queue = self._queues.get(user_id)
+            if self.max_queued_per_user and queue and len(queue) >= self.max_queued_per_user:
+                raise QueueFull("You already have too many requests waiting")
+
+            self._queues.setdefault(user_id, deque()).append(reservation)
+            self._queued += 1
+        return reservation
+
+    def _finish(self, reservation):
+        with self._lock:
+            if reservation.done:
+                return
+            reservation.done = True
+
+            if reservation.granted:
+                self._running -= 1
+            else:
+                queue = self._queues[reservation.user_key]
+                queue.remove(reservation)
+                self._queued -= 1
+                if not queue:
+                    del self._queues[reservation.user_key]
+
+            granted = self._dispatch()
+
+        for waiter in granted:
+            waiter._notify()
+
+    def _dispatch(self):
+        # Must hold the lock; hands free slots to the next user in turn
+        granted = []
+        while self._running < self.max_concurrent and self._queues:
+            user_key, queue = next(iter(self._queues.items()))
+            reservation = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(user_key)
+            else:
+                del self._queues[user_key]
+
+            reservation.granted = True
+            self._running += 1
+            granted.append(reservation)
+        return granted
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._queued,
+                "waiting_users": len(self._queues),
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler configured from settings."""
+    global _scheduler
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RunScheduler(
+                    max_concurrent=settings.AGENT_RUN_MAX_CONCURRENT,
+                    max_queued=settings.AGENT_RUN_MAX_QUEUED,
+                    max_queued_per_user=settings.AGENT_RUN_MAX_QUEUED_PER_USER,
+                )
+    return _scheduler
+
+
+# -----------------------------
+# Entry points
+# -----------------------------
+def _user_id(config):
+    return (config.get("configurable") or {}).get("user_id")
+
+
+def run(text, config, model=None, checkpointer=None):
+    """
+    Run one user message through the router once a run slot is free.
+
+    Raises:
+        QueueFull: The run queue is full.
+
+    Returns:
+        tuple: (graph output, Route)
+    """
+    # ai.router loads every agent graph; importing it here keeps the views cheap to import
+    from ai import router
+
+    with get_scheduler().reserve(_user_id(config)):
+        return router.run(text, config, model, checkpointer)
+
+
+async def arun(text, config, model=None, checkpointer=None):
+    """Async version of run(); cancelling it frees the slot or place in line."""
+    from ai import router
+
+    async with get_scheduler().reserve(_user_id(config)):
+        return await router.arun(text, config, model, checkpointer)
+
+
+async def astream(reservation, text, config, model=None, checkpointer=None):
+    """
+    Stream one user message (see ai.streaming) once `reservation` gets a slot.
+
+    The reservation is taken up front by the caller so a full queue can still be
+    answered with a 429 before the stream starts.
+
+    Yields:
+        tuple: (event, data), starting with a "route" event.
+    """
+    from ai import router
+    from ai.streaming import stream_turn
+
+    async with reservation:
+        decision, graph, run_config = await router.aselect_graph(text, config, model, checkpointer)
+        yield "route", {"agent": decision.label, "source": decision.source}
+        async for event, data in stream_turn(graph, text, run_config):
+            if event == "done" and decision.agent:
+                # Before "done", so a client leaving right after it can't skip it
+                output = (await graph.aget_state(run_config)).values
+                await router.ashare_exchange(text, decision, output, config, model, checkpointer)
+            yield event, data
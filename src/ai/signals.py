@@ -0,0 +1,43 @@
+"""
+Keep agent state in step with document writes made outside the agent tools
+(the admin, imports, any ORM save).
+
+Tools with writes=True invalidate memoized results themselves, once the
+write succeeded, so saves made inside them are skipped; these cover the other
+paths. Deletes aren't received: a post_delete receiver would turn
+off Django's fast delete for every bulk delete of documents, so the delete
+paths (admin, delete_all_documents jobs) call invalidate_documents() instead.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+DOCUMENT_RESOURCE = "directory"
+
+# Resource whose saves the running secured write tool invalidates itself
+_tool_invalidates = ContextVar("ai_tool_invalidates", default=None)
+
+
+@contextmanager
+def tool_invalidates(resource):
+    """Skip save receivers for `resource` in the block; the caller invalidates after it."""
+    token = _tool_invalidates.set(resource)
+    try:
+        yield
+    finally:
+        _tool_invalidates.reset(token)
+
+
+def invalidate_documents(owner_ids):
+    """Make memoized document tool results (ai.memo) of these owners stale."""
+    # ai.memo loads LangChain; only pay for it once something is written
+    from ai import memo
+
+    for owner_id in set(owner_ids):
+        memo.invalidate(owner_id, DOCUMENT_RESOURCE)
+
+
+def document_saved(sender, instance, **kwargs):
+    if _tool_invalidates.get() == DOCUMENT_RESOURCE:
+        return
+    invalidate_documents([instance.owner_id])
@@ -0,0 +1,57 @@
+import json
+
+
+HANDOFF_PREFIX = "transfer_to_"
+HANDOFF_BACK_PREFIX = "transfer_back_to_"
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _agent_name(namespace):
+    # Subgraph namespaces look like ("document_agent:<task id>",)
+    if not namespace:
+        return "supervisor"
+    return namespace[-1].split(":", 1)[0]
+
+
+async def stream_turn(graph, text, config):
+    """
+    Run one user turn with `astream` and yield (event, data) pairs as they happen.
+
+    Events:
+        token: a chunk of model output ({"agent", "content"})
+        handoff: the supervisor delegated to an agent ({"agent"})
+        tool_call: an agent called a tool ({"agent", "name"})
+        tool_result: a tool finished ({"agent", "name", "status"})
+        done: the run finished ({"thread_id"})
+    """
+    # Imported here so views can use format_sse without loading LangChain
+    from langchain_core.messages import AIMessageChunk, HumanMessage, ToolMessage
+
+    async for namespace, (message, metadata) in graph.astream(
+        {"messages": [HumanMessage(content=text)]},
+        config,
+        stream_mode="messages",
+        subgraphs=True,
+    ):
+        agent = _agent_name(namespace)
+
+        if isinstance(message, AIMessageChunk):
+            for chunk in message.tool_call_chunks:
+                name = chunk.get("name")
+                if not name or name.startswith(HANDOFF_BACK_PREFIX):
+                    continue
+                if name.startswith(HANDOFF_PREFIX):
+                    yield "handoff", {"agent": name[len(HANDOFF_PREFIX):]}
+                else:
+                    yield "tool_call", {"agent": agent, "name": name}
+            if message.text:
+                yield "token", {"agent": agent, "content": message.text}
+
+        elif isinstance(message, ToolMessage) and metadata.get("langgraph_node") == "tools":
+            yield "tool_result", {"agent": agent, "name": message.name, "status": message.status}
+
+    yield "done", {"thread_id": (config.get("configurable") or {}).get("thread_id")}
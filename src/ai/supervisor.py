@@ -1,26 +1,85 @@
-from langgraph_supervisor import create_supervisor
+from typing import Annotated
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.tools import InjectedToolCallId, tool
+from langgraph.prebuilt import InjectedState
+from langgraph_supervisor import create_handoff_tool, create_supervisor
+from ai.history import history_pre_model_hook
+from ai.instrumentation import metered_tool_node
 from ai.llms import get_openai_model
+from ai.memo import SupervisorState
+from ai.parallel import PARALLEL_TOOL_NAME, create_parallel_delegation_tool
+from ai.tools.workflows import workflow_tools
 from ai import agents
 
+
+SUPERVISOR_PROMPT = (
+    "You manage the document management assistant and a "
+    "movie discovery assistant. Delegate user requests to the "
+    "appropriate agent based on the user's needs. "
+    "If the user wants a movie (or its details) saved as a document, call save_movie_as_document "
+    "yourself instead of delegating; it searches, fetches the details and creates the document in one step. "
+    "If any other request requires multiple steps or both agents, handle one step at a time, "
+    "delegating to one agent, then using its output to delegate to the other if needed."
+)
+
+PARALLEL_SUPERVISOR_PROMPT = (
+    "You manage the document management assistant and a "
+    "movie discovery assistant. Delegate user requests to the "
+    "appropriate agent based on the user's needs. "
+    f"If a request has independent parts for both agents, call {PARALLEL_TOOL_NAME} once "
+    "with one self-contained sub-task per agent and answer from the combined results. "
+    "For example, 'find three heist movies and list my documents' is two independent sub-tasks. "
+    "If the user wants a movie (or its details) saved as a document, call save_movie_as_document "
+    "yourself instead of delegating; it searches, fetches the details and creates the document in one step. "
+    "Only when another step needs a previous step's output, handle one step at a time, "
+    "delegating to one agent, then using its output to delegate to the other."
+)
+
+
+def _handoff_tool(agent_name):
+    """
+    create_handoff_tool() for `agent_name`, minus the supervisor's step counter.
+
+    A handoff passes the supervisor's whole state on to the workflow. With
+    SupervisorState that includes the managed `remaining_steps`, which the
+    workflow can't store and would warn about on every handoff.
+    """
+    handoff = create_handoff_tool(agent_name=agent_name)
+
+    @tool(handoff.name, description=handoff.description)
+    def transfer(state: Annotated[dict, InjectedState], tool_call_id: Annotated[str, InjectedToolCallId]):
+        state = {key: value for key, value in state.items() if key != "remaining_steps"}
+        return handoff.func(state, tool_call_id)
+
+    transfer.metadata = handoff.metadata
+    return transfer
+
+
 # Step 1: Supervisor
-def get_supervisor(model=None, checkpointer=None):
-    llm_model = get_openai_model(model=model)
+def get_supervisor(model=None, checkpointer=None, parallel=False):
+    # `model` is a model name, or a ready chat model (e.g. the benchmark's scripted fake)
+    llm_model = model if isinstance(model, BaseChatModel) else get_openai_model(model=model)
+
+    agent_graphs = [
+        agents.get_document_agent(llm_model, checkpointer),
+        agents.get_movie_agent(llm_model, checkpointer),
+    ]
 
     supervisor = create_supervisor(
-        agents=[
-            agents.get_document_agent(llm_model, checkpointer),
-            agents.get_movie_agent(llm_model, checkpointer),
-        ],
+        agents=agent_graphs,
         model=llm_model,
-        prompt=(
-            "You manage the document management assistant and a "
-            "movie discovery assistant. Delegate user requests to the "
-            "appropriate agent based on the user's needs. "
-            "If a request requires multiple steps or both agents, handle one step at a time, "
-            "delegating to one agent, then using its output to delegate to the other if needed. "
-            "For example, if the user wants to search for a movie and create a document from the results, "
-            "first delegate the search to the movie agent, then delegate document creation to the document agent."
+        # Common multi-agent flows as single tools, plus opt-in fan-out of
+        # independent sub-tasks in one tool call
+        tools=metered_tool_node(
+            workflow_tools
+            + [_handoff_tool(agent.name) for agent in agent_graphs]
+            + ([create_parallel_delegation_tool(agent_graphs)] if parallel else [])
         ),
+        pre_model_hook=history_pre_model_hook(llm_model, "supervisor"),
+        prompt=PARALLEL_SUPERVISOR_PROMPT if parallel else SUPERVISOR_PROMPT,
+        # Carries the agents' memoized tool results between turns
+        state_schema=SupervisorState,
     ).compile(checkpointer=checkpointer)
 
-    return supervisor
\ No newline at end of file
+    return supervisor
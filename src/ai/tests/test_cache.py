@@ -0,0 +1,110 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from ai.cache import DatabaseLLMCache
+from ai.models import LLMCacheEntry
+
+
+class VectorEmbeddings(Embeddings):
+    """Embeds known texts as fixed vectors, so tests pick the cosine similarity."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+    def embed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+
+def fake_model(cache):
+    # Answers "first", then "second", ... on every call that misses the cache
+    return FakeListChatModel(responses=["first", "second", "third", "fourth", "fifth"], cache=cache)
+
+
+def ask(model, text):
+    return model.invoke([HumanMessage(text)]).content
+
+
+class ExactCacheTests(TestCase):
+    def test_repeated_prompt_is_served_from_the_cache(self):
+        model = fake_model(DatabaseLLMCache())
+
+        self.assertEqual(ask(model, "hello"), "first")
+        self.assertEqual(ask(model, "hello"), "first")
+        self.assertEqual(ask(model, "goodbye"), "second")
+
+        self.assertEqual(LLMCacheEntry.objects.get(query_text="hello").hits, 1)
+
+    def test_stats(self):
+        cache = DatabaseLLMCache()
+        model = fake_model(cache)
+        for _ in range(3):
+            ask(model, "hello")
+
+        self.assertEqual(cache.stats(), {"hits": 2, "semantic_hits": 0, "misses": 1, "hit_rate": 2 / 3})
+
+    def test_expired_entries_miss(self):
+        cache = DatabaseLLMCache(ttl=60)
+        model = fake_model(cache)
+        ask(model, "hello")
+        LLMCacheEntry.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+
+        self.assertEqual(ask(model, "hello"), "second")
+        self.assertEqual(cache.misses, 2)
+
+    async def test_async_calls_release_their_connection(self):
+        # alookup/aupdate run on executor threads Django's request cleanup never sees
+        cache = DatabaseLLMCache()
+        with (
+            mock.patch.object(cache, "_lookup", return_value=None) as lookup,
+            mock.patch.object(cache, "_update") as update,
+            mock.patch("ai.cache.release_connections") as release,
+        ):
+            await fake_model(cache).ainvoke([HumanMessage("hello")])
+
+        lookup.assert_called_once()
+        update.assert_called_once()
+        self.assertEqual(release.call_count, 2)
+
+    def test_evict_drops_expired_and_least_recently_used(self):
+        cache = DatabaseLLMCache(ttl=60, max_entries=2)
+        model = fake_model(cache)
+        for text in ("a", "b", "c", "d"):
+            ask(model, text)
+        LLMCacheEntry.objects.filter(query_text="a").update(created_at=timezone.now() - timedelta(seconds=61))
+        # "b" becomes the most recently used entry
+        ask(model, "b")
+
+        self.assertEqual(cache.evict(), 2)
+        self.assertEqual(set(LLMCacheEntry.objects.values_list("query_text", flat=True)), {"b", "d"})
+
+
+class SemanticCacheTests(TestCase):
+    def setUp(self):
+        self.cache = DatabaseLLMCache(
+            similarity_threshold=0.9,
+            embeddings=VectorEmbeddings({
+                "recommend a heist movie": [1.0, 0.0],
+                # cosine 0.995 and 0.6 with the prompt above
+                "suggest a heist film": [1.0, 0.1],
+                "list my documents": [0.6, 0.8],
+            }),
+        )
+        self.model = fake_model(self.cache)
+        ask(self.model, "recommend a heist movie")
+
+    def test_similar_prompt_above_threshold_hits(self):
+        self.assertEqual(ask(self.model, "suggest a heist film"), "first")
+        self.assertEqual(self.cache.stats()["semantic_hits"], 1)
+
+    def test_prompt_below_threshold_misses(self):
+        self.assertEqual(ask(self.model, "list my documents"), "second")
+        self.assertEqual(self.cache.stats()["semantic_hits"], 0)
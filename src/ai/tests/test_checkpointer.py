@@ -0,0 +1,104 @@
+from django.test import TestCase
+from langgraph.checkpoint.base import empty_checkpoint
+
+from ai.checkpointer import DjangoCheckpointSaver
+
+
+def config(thread_id):
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+class CheckpointSaverTests(TestCase):
+    def setUp(self):
+        self.saver = DjangoCheckpointSaver()
+
+    def save(self, parent, step, **values):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = values
+        return self.saver.put(parent, checkpoint, {"source": "loop", "step": step}, {})
+
+    def test_put_and_get_tuple_round_trip(self):
+        saved = self.save(config("t1"), 0, messages=["hi"])
+
+        loaded = self.saver.get_tuple(config("t1"))
+
+        self.assertEqual(loaded.config, saved)
+        self.assertEqual(loaded.checkpoint["channel_values"], {"messages": ["hi"]})
+        self.assertEqual(loaded.metadata, {"source": "loop", "step": 0})
+        self.assertIsNone(loaded.parent_config)
+        self.assertEqual(loaded.pending_writes, [])
+
+    def test_get_tuple_returns_none_for_an_unknown_thread(self):
+        self.assertIsNone(self.saver.get_tuple(config("missing")))
+
+    def test_checkpoints_chain_to_their_parent(self):
+        first = self.save(config("t1"), 0)
+        second = self.save(first, 1)
+
+        latest = self.saver.get_tuple(config("t1"))
+        parent = self.saver.get_tuple(latest.parent_config)
+
+        self.assertEqual(latest.config, second)
+        self.assertEqual(latest.parent_config, first)
+        self.assertEqual(parent.config, first)
+        self.assertIsNone(parent.parent_config)
+
+    def test_get_tuple_loads_a_specific_checkpoint(self):
+        first = self.save(config("t1"), 0, label="first")
+        self.save(first, 1, label="second")
+
+        loaded = self.saver.get_tuple(first)
+
+        self.assertEqual(loaded.checkpoint["channel_values"], {"label": "first"})
+
+    def test_put_writes_round_trip(self):
+        saved = self.save(config("t1"), 0)
+
+        self.saver.put_writes(saved, [("messages", "a"), ("route", {"to": "docs"})], task_id="task-1")
+
+        self.assertEqual(
+            self.saver.get_tuple(saved).pending_writes,
+            [("task-1", "messages", "a"), ("task-1", "route", {"to": "docs"})],
+        )
+
+    def test_repeated_writes_keep_the_first_value(self):
+        saved = self.save(config("t1"), 0)
+
+        self.saver.put_writes(saved, [("messages", "a")], task_id="task-1")
+        self.saver.put_writes(saved, [("messages", "b")], task_id="task-1")
+
+        self.assertEqual(self.saver.get_tuple(saved).pending_writes, [("task-1", "messages", "a")])
+
+    def test_list_returns_newest_first_and_honours_filters(self):
+        first = self.save(config("t1"), 0)
+        second = self.save(first, 1)
+        third = self.save(second, 2)
+
+        self.assertEqual([t.config for t in self.saver.list(config("t1"))], [third, second, first])
+        self.assertEqual([t.config for t in self.saver.list(config("t1"), limit=1)], [third])
+        self.assertEqual([t.config for t in self.saver.list(config("t1"), before=second)], [first])
+        self.assertEqual([t.config for t in self.saver.list(config("t1"), filter={"step": 1})], [second])
+
+    def test_threads_are_isolated(self):
+        one = self.save(config("t1"), 0, owner="one")
+        two = self.save(config("t2"), 0, owner="two")
+        self.saver.put_writes(one, [("messages", "a")], task_id="task-1")
+
+        self.assertEqual(self.saver.get_tuple(config("t2")).checkpoint["channel_values"], {"owner": "two"})
+        self.assertEqual(self.saver.get_tuple(config("t2")).pending_writes, [])
+        self.assertEqual([t.config for t in self.saver.list(config("t1"))], [one])
+
+        self.saver.delete_thread("t1")
+
+        self.assertIsNone(self.saver.get_tuple(config("t1")))
+        self.assertEqual(self.saver.get_tuple(config("t2")).config, two)
+
+    async def test_async_interface_round_trip(self):
+        saved = await self.saver.aput(config("t1"), empty_checkpoint(), {"step": 0}, {})
+        await self.saver.aput_writes(saved, [("messages", "a")], task_id="task-1")
+
+        loaded = await self.saver.aget_tuple(config("t1"))
+        listed = [t.config async for t in self.saver.alist(config("t1"))]
+
+        self.assertEqual(loaded.pending_writes, [("task-1", "messages", "a")])
+        self.assertEqual(listed, [saved])
@@ -0,0 +1,80 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.checks import run_checks
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from directories.models import Directory
+from movies.db_routers import (
+    REPLICA, apin_to_primary, areplica_reads, pin_to_primary, replica_configured, replica_reads,
+)
+
+
+class ReplicaCacheCheckTests(SimpleTestCase):
+    def errors(self):
+        with mock.patch("ai.checks.replica_configured", return_value=True):
+            return [error.id for error in run_checks(tags=["caches"])]
+
+    @override_settings(REPLICA_CACHE_ALIAS="default")
+    def test_per_process_pin_cache_is_an_error(self):
+        self.assertIn("ai.E001", self.errors())
+
+    @override_settings(REPLICA_CACHE_ALIAS="shared")
+    def test_shared_pin_cache_passes(self):
+        self.assertNotIn("ai.E001", self.errors())
+
+
+# Needs the replica alias (DB_REPLICA_NAME or DB_REPLICA_HOST); its test
+# database mirrors the default one
+@skipUnless(replica_configured(), "no read replica configured")
+class ReplicaReadTests(TestCase):
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Only the primary's pool is closed with the test database, which
+        # can't be dropped while the mirror still holds connections to it
+        cls.addClassCleanup(connections[REPLICA].close_pool)
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="reader")
+
+    def read(self):
+        """Count the user's documents in replica_reads(); returns the alias each query went to."""
+        with replica_reads(self.user.id) as alias:
+            with CaptureQueriesContext(connections["default"]) as primary, \
+                    CaptureQueriesContext(connections[REPLICA]) as replica:
+                Directory.objects.filter(owner=self.user).count()
+        return alias, len(primary), len(replica)
+
+    def test_unpinned_reads_go_to_the_replica(self):
+        self.assertEqual(self.read(), (REPLICA, 0, 1))
+
+    def test_pinned_reads_go_to_the_primary(self):
+        pin_to_primary(self.user.id)
+
+        self.assertEqual(self.read(), ("default", 1, 0))
+
+    async def test_async_reads_honour_the_pin(self):
+        async with areplica_reads(self.user.id) as alias:
+            self.assertEqual(alias, REPLICA)
+
+        await apin_to_primary(self.user.id)
+
+        async with areplica_reads(self.user.id) as alias:
+            self.assertEqual(alias, "default")
+
+    def test_pin_expires(self):
+        with override_settings(REPLICA_STICKY_SECONDS=-1):
+            pin_to_primary(self.user.id)
+
+        self.assertEqual(self.read(), (REPLICA, 0, 1))
+
+    def test_writes_always_use_the_primary(self):
+        with replica_reads(self.user.id), CaptureQueriesContext(connections[REPLICA]) as replica:
+            Directory.objects.create(owner=self.user, title="Notes", content="")
+
+        self.assertEqual(len(replica), 0)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TransactionTestCase
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from ai.history import SUMMARY_PREFIX, TRUNCATED_MARKER, HistoryBudget
+
+
+def tool_turn(question, call_id, output):
+    return [
+        HumanMessage(question),
+        AIMessage("", tool_calls=[{"name": "get_document", "args": {"document_id": 7}, "id": call_id}]),
+        ToolMessage(output, tool_call_id=call_id),
+        AIMessage("Here it is."),
+    ]
+
+
+class HistoryBudgetTests(SimpleTestCase):
+    def setUp(self):
+        self.llm = FakeListChatModel(responses=["the user read document 7"])
+        self.budget = HistoryBudget(self.llm, "test_agent", max_tokens=400, tool_output_chars=100)
+
+    def test_history_within_budget_is_unchanged(self):
+        messages = tool_turn("Show document 7", "call-1", "short")
+        self.assertEqual(self.budget.prepare(messages), messages)
+
+    def test_older_turns_are_summarized_from_a_user_turn(self):
+        older = tool_turn("Show document 7", "call-1", "x" * 2000) + [HumanMessage("y " * 600), AIMessage("ok")]
+        current = tool_turn("Show document 8", "call-2", "short")
+
+        prepared = self.budget.prepare(older + current)
+
+        self.assertEqual(prepared[0].content, SUMMARY_PREFIX + "the user read document 7")
+        self.assertEqual(prepared[1:], current)
+
+    def test_large_tool_result_in_current_turn(self):
+        older = tool_turn("Show document 7", "call-1", "short")
+        current = tool_turn("Show document 8", "call-2", "x" * 5000)
+
+        prepared = self.budget.prepare(older + current)
+
+        # The current question and the tool call stay next to the trimmed result
+        kept = prepared[-4:]
+        self.assertEqual(kept[0].content, "Show document 8")
+        self.assertEqual(kept[1].tool_calls[0]["id"], "call-2")
+        self.assertEqual(kept[2].tool_call_id, "call-2")
+        self.assertEqual(kept[2].content, "x" * 100 + TRUNCATED_MARKER)
+        for index, message in enumerate(prepared):
+            if isinstance(message, ToolMessage):
+                self.assertEqual(prepared[index - 1].tool_calls[0]["id"], message.tool_call_id)
+
+    def test_oversized_current_turn_without_earlier_turns(self):
+        messages = tool_turn("Show document 8", "call-2", "x" * 5000)
+
+        prepared = self.budget.prepare(messages)
+
+        self.assertEqual([type(message) for message in prepared], [type(message) for message in messages])
+        self.assertEqual(prepared[2].content, "x" * 100 + TRUNCATED_MARKER)
+
+
+# The summaries live in the database cache, which async code reaches from other threads
+class SharedSummaryTests(TransactionTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.addCleanup(caches["shared"].clear)
+        patcher = mock.patch.object(HistoryBudget, "_cache_key", return_value="ai:history-summary:test_agent:t1")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        older = tool_turn("Show document 7", "call-1", "x" * 2000) + [HumanMessage("y " * 600), AIMessage("ok")]
+        self.messages = older + tool_turn("Show document 8", "call-2", "short")
+
+    def worker(self):
+        # Each worker process builds its own budget and model; `i` counts its calls
+        llm = FakeListChatModel(responses=["the user read document 7", "a second summary"])
+        return llm, HistoryBudget(llm, "test_agent", max_tokens=400, tool_output_chars=100)
+
+    def test_summary_is_reused_by_another_worker(self):
+        first_llm, first = self.worker()
+        second_llm, second = self.worker()
+
+        first.prepare(self.messages)
+        prepared = second.prepare(self.messages)
+
+        self.assertEqual(prepared[0].content, SUMMARY_PREFIX + "the user read document 7")
+        self.assertEqual((first_llm.i, second_llm.i), (1, 0))
+        self.assertIsNotNone(caches["shared"].get("ai:history-summary:test_agent:t1"))
+
+    async def test_async_summary_is_reused_by_another_worker(self):
+        first_llm, first = self.worker()
+        second_llm, second = self.worker()
+
+        await first.aprepare(self.messages)
+        prepared = await second.aprepare(self.messages)
+
+        self.assertEqual(prepared[0].content, SUMMARY_PREFIX + "the user read document 7")
+        self.assertEqual((first_llm.i, second_llm.i), (1, 0))
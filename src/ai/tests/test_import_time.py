@@ -0,0 +1,45 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from ai.management.commands.check_import_time import SCENARIOS, measure, parse_importtime
+
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       150 |        150 | _io
+import time:       300 |        300 |   encodings.aliases
+import time:       900 |       1200 | encodings
+import time:      2000 |       5000 | django
+"""
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_parse_counts_top_level_imports_only(self):
+        total, top_level = parse_importtime(IMPORTTIME_OUTPUT)
+
+        self.assertEqual(top_level, [(5.0, "django"), (1.2, "encodings"), (0.15, "_io")])
+        self.assertAlmostEqual(total, 6.35)
+
+    def test_startup_does_not_import_heavy_modules(self):
+        # Timing budgets are left to the command; these only depend on what gets imported
+        for name, (code, _, forbidden) in SCENARIOS.items():
+            if not forbidden:
+                continue
+            with self.subTest(name):
+                _, _, modules = measure(code)
+                self.assertEqual(sorted(m for m in forbidden if m in modules), [])
+
+    def test_heavy_import_fails(self):
+        measured = (1.0, [(1.0, "django")], {"django", "langchain"})
+        with mock.patch("ai.management.commands.check_import_time.measure", return_value=measured):
+            with self.assertRaisesMessage(CommandError, "import-time budget violation"):
+                call_command("check_import_time", repeat=1, stdout=StringIO())
+
+    def test_over_budget_fails(self):
+        measured = (10_000.0, [(10_000.0, "django")], {"django"})
+        with mock.patch("ai.management.commands.check_import_time.measure", return_value=measured):
+            with self.assertRaisesMessage(CommandError, "import-time budget violation"):
+                call_command("check_import_time", repeat=1, stdout=StringIO())
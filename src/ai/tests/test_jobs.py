@@ -0,0 +1,120 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from ai import jobs
+from ai.models import AgentJob
+from directories.models import Directory
+
+
+# The heartbeat runs on its own thread and connection
+@override_settings(JOB_HEARTBEAT_INTERVAL=0.05, JOB_RETRY_DELAY=0)
+class JobOwnershipTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="jobs")
+
+    def register(self, kind, handler):
+        jobs.JOB_HANDLERS[kind] = handler
+        self.addCleanup(jobs.JOB_HANDLERS.pop, kind)
+
+    def enqueue(self, kind):
+        return AgentJob.objects.create(kind=kind, owner=self.user)
+
+    def test_heartbeat_keeps_a_long_job_with_its_worker(self):
+        swept = []
+
+        def slow(job):
+            time.sleep(0.3)
+            swept.append(jobs.requeue_stale(stale_after=timedelta(seconds=0.2)))
+            return {"ok": True}
+
+        self.register("slow", slow)
+        job = self.enqueue("slow")
+
+        jobs.execute(jobs.claim("w1"))
+
+        job.refresh_from_db()
+        self.assertEqual(swept, [0])
+        self.assertEqual((job.status, job.attempts, job.result), (AgentJob.SUCCEEDED, 1, {"ok": True}))
+        self.assertIsNone(job.locked_at)
+
+    def test_job_without_heartbeat_is_requeued(self):
+        job = self.enqueue("slow")
+        jobs.claim("w1")
+        AgentJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=10))
+
+        self.assertEqual(jobs.requeue_stale(stale_after=timedelta(minutes=5)), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (AgentJob.QUEUED, ""))
+
+    def test_requeued_attempt_cannot_finish_the_job(self):
+        def requeued(job):
+            # The sweep gives the job to another worker while this one is still busy
+            AgentJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=10))
+            jobs.requeue_stale(stale_after=timedelta(minutes=5))
+            jobs.claim("w2")
+            jobs.report_progress(job, step="late")
+            return {"by": "w1"}
+
+        self.register("requeued", requeued)
+        job = self.enqueue("requeued")
+
+        with self.assertLogs("ai.jobs", "WARNING"):
+            jobs.execute(jobs.claim("w1"))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (AgentJob.RUNNING, 2, "w2"))
+        self.assertIsNone(job.result)
+
+    def test_requeued_attempt_cannot_fail_the_job(self):
+        def failing(job):
+            AgentJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=10))
+            jobs.requeue_stale(stale_after=timedelta(minutes=5))
+            jobs.claim("w2")
+            raise RuntimeError("boom")
+
+        self.register("failing", failing)
+        job = self.enqueue("failing")
+
+        with self.assertLogs("ai.jobs", "WARNING"):
+            jobs.execute(jobs.claim("w1"))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (AgentJob.RUNNING, 2, "w2"))
+
+
+@override_settings(JOB_DELETE_BATCH_SIZE=2)
+class DeleteAllDocumentsTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="deleter")
+        Directory.objects.bulk_create(Directory(owner=self.user, title=f"old {i}") for i in range(3))
+
+    def test_documents_created_after_enqueue_survive(self):
+        newest = Directory.objects.latest("id").id
+        job = jobs.enqueue("delete_all_documents", self.user.id, payload={"max_id": newest})
+        created = Directory.objects.create(owner=self.user, title="new")
+
+        jobs.execute(jobs.claim("w1"))
+
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"deleted_count": 3})
+        self.assertQuerySetEqual(Directory.objects.all(), [created])
+
+    def test_documents_created_while_running_survive(self):
+        real = jobs.report_progress
+
+        def writing(job, **progress):
+            Directory.objects.create(owner=self.user, title="during")
+            real(job, **progress)
+
+        jobs.enqueue("delete_all_documents", self.user.id)
+        with mock.patch("ai.jobs.report_progress", writing):
+            jobs.execute(jobs.claim("w1"))
+
+        self.assertEqual(set(Directory.objects.values_list("title", flat=True)), {"during"})
+        self.assertEqual(Directory.objects.count(), 2)
@@ -0,0 +1,38 @@
+import asyncio
+
+from django.test import SimpleTestCase
+from langchain_openai import ChatOpenAI
+
+from ai.benchmark.standins import StandInServer
+from ai.llms import get_async_http_client, get_http_client
+
+
+class OpenAIStandIn(StandInServer):
+    """Chat completions endpoint that keeps connections alive, like the real API."""
+
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.server.RequestHandlerClass.protocol_version = "HTTP/1.1"
+
+    def respond(self, method, path, query, body):
+        return 200, {
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "test",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "hi"}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+
+class SharedHTTPClientTests(SimpleTestCase):
+    def test_async_calls_from_separate_event_loops(self):
+        # Each asyncio.run (or async_to_sync call) runs a new loop; pooled
+        # connections from an earlier, closed loop must not be reused
+        with OpenAIStandIn() as openai:
+            llm = ChatOpenAI(
+                model="test", api_key="test", base_url=openai.url, max_retries=0,
+                http_client=get_http_client(), http_async_client=get_async_http_client(),
+            )
+            first = asyncio.run(llm.ainvoke("hello"))
+            second = asyncio.run(llm.ainvoke("hello again"))
+
+        self.assertEqual((first.content, second.content), ("hi", "hi"))
+        self.assertEqual(openai.requests, 2)
@@ -0,0 +1,220 @@
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from langchain.agents import create_agent
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ai.benchmark.fakes import ScriptedChatModel
+from ai.memo import ToolMemoMiddleware
+from ai.signals import tool_invalidates
+from ai.tools.secured import secured_tool
+from directories.models import Directory
+
+
+USER_ID = 7
+runs = []
+
+
+@secured_tool("directory", "get_document", memoize=True)
+def read_note(note_id: int, *, user_id: int):
+    """Read a note."""
+    runs.append(note_id)
+    return {"id": note_id, "version": len(runs)}
+
+
+@secured_tool("directory", "update_document", writes=True)
+def write_note(note_id: int, *, user_id: int):
+    """Update a note."""
+    return {"id": note_id}
+
+
+@secured_tool("directory", "update_document", writes=True)
+async def awrite_note(note_id: int, *, user_id: int):
+    """Update a note (async body)."""
+    return {"id": note_id}
+
+
+def call(name, **args):
+    return [{"tool_calls": [{"name": name, "args": args}]}, {"content": "ok"}]
+
+
+# Tools run on worker threads and the write marks live in the database cache
+class ToolMemoTests(TransactionTestCase):
+    def setUp(self):
+        runs.clear()
+        caches[settings.TOOL_MEMO_CACHE_ALIAS].clear()
+        for target in ("ai.tools.secured.check_permission", "ai.tools.secured.acheck_permission"):
+            patcher = mock.patch(target, return_value=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.model = ScriptedChatModel()
+        self.agent = create_agent(
+            self.model,
+            tools=[read_note, write_note, awrite_note],
+            middleware=[ToolMemoMiddleware()],
+            checkpointer=InMemorySaver(),
+        )
+        self.config = {"configurable": {"user_id": USER_ID, "thread_id": uuid.uuid4().hex}}
+
+    def turn(self, script):
+        self.model.load(script)
+        self.agent.invoke({"messages": [HumanMessage(content="go")]}, self.config)
+
+    async def aturn(self, script):
+        self.model.load(script)
+        await self.agent.ainvoke({"messages": [HumanMessage(content="go")]}, self.config)
+
+    def test_repeated_read_is_answered_from_the_memo(self):
+        self.turn(call("read_note", note_id=1))
+        self.turn(call("read_note", note_id=1))
+        self.turn(call("read_note", note_id=2))
+
+        self.assertEqual(runs, [1, 2])
+
+    def test_write_invalidates_the_memo(self):
+        self.turn(call("read_note", note_id=1))
+        self.turn(call("read_note", note_id=1))
+        self.assertEqual(runs, [1])
+
+        self.turn(call("write_note", note_id=1))
+        self.turn(call("read_note", note_id=1))
+
+        self.assertEqual(runs, [1, 1])
+
+    def test_write_in_another_process_invalidates_the_memo(self):
+        self.turn(call("read_note", note_id=1))
+        self.turn(call("read_note", note_id=1))
+        self.assertEqual(runs, [1])
+
+        # What run_jobs does after deleting documents, in its own process
+        subprocess.run(
+            [sys.executable, "manage.py", "shell", "-c", f"from ai import memo; memo.invalidate({USER_ID}, 'directory')"],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DB_NAME": connection.settings_dict["NAME"]},
+            check=True,
+            capture_output=True,
+        )
+        self.turn(call("read_note", note_id=1))
+
+        self.assertEqual(runs, [1, 1])
+
+    async def test_async_runs_use_the_memo_and_its_invalidation(self):
+        await self.aturn(call("read_note", note_id=1))
+        await self.aturn(call("read_note", note_id=1))
+        self.assertEqual(runs, [1])
+
+        await self.aturn(call("awrite_note", note_id=1))
+        await self.aturn(call("read_note", note_id=1))
+        self.assertEqual(runs, [1, 1])
+
+    def test_failed_invalidation_does_not_fail_the_write(self):
+        broken = mock.Mock(**{"set.side_effect": ConnectionError("cache down")})
+        with mock.patch("ai.memo._marks", return_value=broken), self.assertLogs("ai.memo", "ERROR"):
+            result = write_note.invoke({"note_id": 1}, config=self.config)
+
+        self.assertEqual(result, {"id": 1})
+
+    async def test_failed_async_invalidation_does_not_fail_the_write(self):
+        broken = mock.Mock(**{"aset.side_effect": ConnectionError("cache down")})
+        with mock.patch("ai.memo._marks", return_value=broken), self.assertLogs("ai.memo", "ERROR"):
+            result = await awrite_note.ainvoke({"note_id": 1}, config=self.config)
+
+        self.assertEqual(result, {"id": 1})
+
+    def test_unreadable_write_mark_runs_the_tool(self):
+        self.turn(call("read_note", note_id=1))
+
+        broken = mock.Mock(**{"get.side_effect": ConnectionError("cache down")})
+        with mock.patch("ai.memo._marks", return_value=broken), self.assertLogs("ai.memo", "WARNING"):
+            self.turn(call("read_note", note_id=1))
+
+        self.assertEqual(runs, [1, 1])
+
+    async def test_unreadable_write_mark_runs_the_tool_async(self):
+        await self.aturn(call("read_note", note_id=1))
+
+        broken = mock.Mock(**{"aget.side_effect": ConnectionError("cache down")})
+        with mock.patch("ai.memo._marks", return_value=broken), self.assertLogs("ai.memo", "WARNING"):
+            await self.aturn(call("read_note", note_id=1))
+
+        self.assertEqual(runs, [1, 1])
+
+    @override_settings(TOOL_MEMO_CACHE_ALIAS="default")
+    def test_memoization_is_off_without_a_shared_cache(self):
+        self.assertIn("ai.E002", [error.id for error in run_checks(tags=["caches"])])
+
+        self.turn(call("read_note", note_id=1))
+        self.turn(call("read_note", note_id=1))
+
+        self.assertEqual(runs, [1, 1])
+
+
+class SharedCacheTableTests(TransactionTestCase):
+    def test_migration_creates_the_cache_table(self):
+        migration = importlib.import_module("ai.migrations.0005_shared_cache_table")
+        table = settings.CACHES["shared"]["LOCATION"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {connection.ops.quote_name(table)}")
+
+        with connection.schema_editor() as schema_editor:
+            migration.create_cache_tables(None, schema_editor)
+
+        self.assertIn(table, connection.introspection.table_names())
+        caches["shared"].set("ai:test", 1)
+        self.assertEqual(caches["shared"].get("ai:test"), 1)
+
+
+class DocumentWriteInvalidationTests(TestCase):
+    """Document writes outside the agent tools invalidate the owner's memoized results."""
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username="owner")
+        patcher = mock.patch("ai.memo.invalidate")
+        self.invalidate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_orm_save(self):
+        Directory.objects.create(owner=self.owner, title="Saved")
+
+        self.invalidate.assert_called_once_with(self.owner.id, "directory")
+
+    def test_saves_inside_a_write_tool_are_left_to_the_tool(self):
+        with tool_invalidates("directory"):
+            Directory.objects.create(owner=self.owner, title="Saved")
+
+        self.invalidate.assert_not_called()
+
+    def test_admin_delete(self):
+        document = Directory.objects.create(owner=self.owner, title="Deleted")
+        admin = get_user_model().objects.create_superuser(username="admin", password="x")
+        self.client.force_login(admin)
+        self.invalidate.reset_mock()
+
+        response = self.client.post(f"/admin/directories/directory/{document.id}/delete/", {"post": "yes"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Directory.objects.filter(id=document.id).exists())
+        self.invalidate.assert_called_once_with(self.owner.id, "directory")
+
+    def test_import(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as f:
+            f.write('{"title": "Imported", "owner": "owner"}\n')
+            f.flush()
+            call_command("import_documents", f.name, "--method", "bulk", stdout=StringIO())
+
+        self.assertEqual(Directory.objects.filter(owner=self.owner).count(), 1)
+        self.invalidate.assert_called_once_with(self.owner.id, "directory")
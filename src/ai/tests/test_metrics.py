@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from prometheus_client import REGISTRY
+
+from ai.benchmark.fakes import ScriptedChatModel
+from ai.benchmark.standins import PermitPDPStandIn
+from ai.metrics import PERMISSION, track_tool_call
+from ai.supervisor import get_supervisor
+from ai.tools.secured import acheck_permission, check_permission
+from my_permit.client import reset_permit_client
+
+
+def tool_calls(tool, outcome):
+    return REGISTRY.get_sample_value("agent_tool_calls_total", {"tool": tool, "outcome": outcome}) or 0
+
+
+@override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"], METRICS_TOKEN="s3cret")
+class MetricsViewTests(SimpleTestCase):
+    def test_allowed_address(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"agent_tool_calls_total", response.content)
+
+    def test_other_addresses_get_a_404(self):
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.0.0.8").status_code, 404)
+        response = self.client.get("/metrics", REMOTE_ADDR="10.0.0.8", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 404)
+
+    def test_token(self):
+        response = self.client.get("/metrics", REMOTE_ADDR="10.0.0.8", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+
+
+class SupervisorToolMetricsTests(SimpleTestCase):
+    def setUp(self):
+        self.model = ScriptedChatModel()
+        self.graph = get_supervisor(model=self.model, checkpointer=InMemorySaver())
+
+    def run_turn(self, configurable):
+        self.model.load([
+            {"tool_calls": [{"name": "save_movie_as_document", "args": {"movie_id": 27205}}]},
+            {"content": "Done."},
+        ])
+        self.graph.invoke(
+            {"messages": [HumanMessage(content="save Inception to my documents")]},
+            {"configurable": {"thread_id": "metrics-test", **configurable}},
+        )
+
+    def test_handled_error_is_counted_as_error(self):
+        before = tool_calls("save_movie_as_document", "error")
+
+        # No user_id: the tool answers {"error": ...} without raising
+        self.run_turn({})
+
+        self.assertEqual(tool_calls("save_movie_as_document", "error"), before + 1)
+
+    def test_denied_call_is_counted_as_permission_denied(self):
+        before = tool_calls("save_movie_as_document", "permission_denied")
+
+        with mock.patch("ai.tools.secured.check_permission", return_value=False):
+            self.run_turn({"user_id": 1})
+
+        self.assertEqual(tool_calls("save_movie_as_document", "permission_denied"), before + 1)
+
+
+class PermissionPhaseTests(SimpleTestCase):
+    """A Permit check is booked to the permission phase once, not per layer."""
+
+    def setUp(self):
+        self.permit = PermitPDPStandIn(latency=0.1).start()
+        self.addCleanup(self.permit.stop)
+        overrides = override_settings(PERMIT_PDP_URL=self.permit.url, PERMIT_API_KEY="test", PERMIT_CACHE_TTL=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        reset_permit_client()
+        self.addCleanup(reset_permit_client)
+
+    def assertOneInterval(self, call):
+        # Timed twice, a 0.1 s check would be booked as at least 0.2 s
+        self.assertGreaterEqual(call.phases[PERMISSION], 0.1)
+        self.assertLess(call.phases[PERMISSION], 0.2)
+
+    def test_sync_check(self):
+        with track_tool_call("list_documents") as call:
+            self.assertTrue(check_permission(1, "directory", "read"))
+        self.assertOneInterval(call)
+
+    async def test_async_check(self):
+        with track_tool_call("list_documents") as call:
+            self.assertTrue(await acheck_permission(1, "directory", "read"))
+        self.assertOneInterval(call)
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+
+from django.test import SimpleTestCase
+from langchain_core.messages import AIMessage
+from pydantic import ValidationError
+
+from ai.parallel import create_parallel_delegation_tool
+
+
+class FakeAgent:
+    """Compiled-agent stand-in that answers after `delay` seconds, noting its runs in `calls`."""
+
+    def __init__(self, name, delay, calls):
+        self.name = name
+        self.delay = delay
+        self.calls = calls
+
+    def _answer(self, state, config):
+        return {"messages": [AIMessage(content=f"{self.name} did: {state['messages'][-1].content}")]}
+
+    def invoke(self, state, config):
+        with self.calls.running():
+            self.calls.thread_ids.append(config["configurable"]["thread_id"])
+            time.sleep(self.delay)
+        return self._answer(state, config)
+
+    async def ainvoke(self, state, config):
+        with self.calls.running():
+            self.calls.thread_ids.append(config["configurable"]["thread_id"])
+            await asyncio.sleep(self.delay)
+        return self._answer(state, config)
+
+
+class Calls:
+    """Child thread ids of the agent runs, and how many ran at once at most."""
+
+    def __init__(self):
+        self.thread_ids = []
+        self.peak = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def running(self):
+        with self._lock:
+            self._running += 1
+            self.peak = max(self.peak, self._running)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+class ParallelDelegationTests(SimpleTestCase):
+    def setUp(self):
+        self.calls = Calls()
+        # The first task finishes last, so ordering can't come from completion order
+        self.tool = create_parallel_delegation_tool([
+            FakeAgent("movie_agent", 0.2, self.calls),
+            FakeAgent("document_agent", 0.05, self.calls),
+        ])
+        self.config = {"configurable": {"user_id": 1, "thread_id": "t1"}}
+        self.tasks = [
+            {"agent": "movie_agent", "task": "find heist movies"},
+            {"agent": "document_agent", "task": "list my documents"},
+        ]
+
+    def assertFannedOut(self, output):
+        self.assertEqual(
+            output,
+            "[movie_agent] find heist movies\nmovie_agent did: find heist movies\n\n"
+            "[document_agent] list my documents\ndocument_agent did: list my documents",
+        )
+        self.assertEqual(self.calls.peak, 2)
+        self.assertEqual(sorted(self.calls.thread_ids), ["t1:document_agent", "t1:movie_agent"])
+
+    def test_runs_tasks_at_once_and_answers_in_task_order(self):
+        self.assertFannedOut(self.tool.invoke({"tasks": self.tasks}, config=self.config))
+
+    async def test_async_runs_tasks_at_once_and_answers_in_task_order(self):
+        self.assertFannedOut(await self.tool.ainvoke({"tasks": self.tasks}, config=self.config))
+
+    def test_rejects_two_tasks_for_the_same_agent(self):
+        tasks = [{"agent": "movie_agent", "task": "find heist movies"}, {"agent": "movie_agent", "task": "find Dune"}]
+
+        with self.assertRaisesMessage(ValidationError, "more than one task for movie_agent"):
+            self.tool.invoke({"tasks": tasks}, config=self.config)
+        self.assertEqual(self.calls.thread_ids, [])
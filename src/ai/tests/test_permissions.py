@@ -0,0 +1,51 @@
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from permit import PermitError
+
+from ai.tools.secured import _permission_cache_key, acheck_permission, check_permission
+
+
+class FailingPermit:
+    async def check(self, user, action, resource):
+        raise PermitError("PDP unreachable")
+
+
+@override_settings(PERMIT_CACHE_ALIAS="default", PERMIT_CACHE_TTL=60, PERMIT_STALE_TTL=300)
+class StalePermissionTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        patcher = mock.patch("ai.tools.secured.get_permit_client", return_value=FailingPermit())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def expired_decision(self, action, allowed):
+        # Past PERMIT_CACHE_TTL but within PERMIT_STALE_TTL
+        key = _permission_cache_key(1, "directory", action)
+        caches["default"].set(key, (time.time() - 120, allowed), 360)
+
+    def test_stale_denial_is_served_while_the_pdp_is_down(self):
+        self.expired_decision("read", False)
+
+        self.assertIs(check_permission(1, "directory", "read"), False)
+
+    def test_stale_grant_fails_closed_by_default(self):
+        self.expired_decision("read", True)
+
+        with self.assertRaises(PermitError):
+            check_permission(1, "directory", "read")
+
+    async def test_stale_grant_fails_closed_on_the_async_path(self):
+        self.expired_decision("read", True)
+
+        with self.assertRaises(PermitError):
+            await acheck_permission(1, "directory", "read")
+
+    @override_settings(PERMIT_STALE_GRANTS=True)
+    def test_stale_grants_are_served_when_opted_in(self):
+        self.expired_decision("read", True)
+
+        self.assertIs(check_permission(1, "directory", "read"), True)
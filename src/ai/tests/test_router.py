@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ai import registry, router
+from ai.benchmark.fakes import ScriptedChatModel
+
+
+class RouteTests(SimpleTestCase):
+    def test_single_domain_requests_are_dispatched(self):
+        self.assertEqual(router.route("list my documents").agent, "document_agent")
+        self.assertEqual(router.route("find three heist movies").agent, "movie_agent")
+
+    def test_multi_step_requests_go_to_the_supervisor(self):
+        self.assertIsNone(router.route("find three heist movies and list my documents").agent)
+        self.assertIsNone(router.route("look up Dune and then write a summary doc").agent)
+
+    def test_requests_no_rule_places_go_to_the_supervisor(self):
+        decision = router.route("when did Jurassic Park come out")
+
+        self.assertIsNone(decision.agent)
+        self.assertEqual(decision.source, "fallback")
+
+
+class RouterThreadTests(SimpleTestCase):
+    def setUp(self):
+        self.model = ScriptedChatModel()
+        self.checkpointer = InMemorySaver()
+        self.config = {"configurable": {"user_id": 1, "thread_id": "router-test"}}
+        for target in ("ai.registry.get_openai_model", "ai.supervisor.get_openai_model"):
+            patcher = mock.patch(target, return_value=self.model)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    def run_turn(self, text, script):
+        self.model.load(script)
+        output, decision = router.run(text, self.config, checkpointer=self.checkpointer)
+        self.assertEqual(self.model.position, len(script))
+        return output, decision
+
+    def supervisor_messages(self):
+        graph = registry.get_supervisor_graph(checkpointer=self.checkpointer)
+        return graph.get_state(self.config).values["messages"]
+
+    def test_dispatched_turn_is_shared_with_the_supervisor(self):
+        _, decision = self.run_turn("find three heist movies", [{"content": "Heat, Inside Man and Rififi."}])
+
+        self.assertEqual(decision.agent, "movie_agent")
+        messages = self.supervisor_messages()
+        self.assertEqual([message.type for message in messages], ["human", "ai"])
+        self.assertEqual(messages[1].content, "Heat, Inside Man and Rififi.")
+        self.assertEqual(messages[1].name, "movie_agent")
+
+    def test_follow_up_goes_to_the_supervisor(self):
+        self.run_turn("find three heist movies", [{"content": "Heat, Inside Man and Rififi."}])
+
+        # Would be dispatched on a new conversation, but "it" needs the history
+        _, decision = self.run_turn("save it to my documents", [{"content": "Which movie should I save?"}])
+
+        self.assertIsNone(decision.agent)
+        self.assertEqual(decision.source, "history")
+        self.assertEqual(
+            [message.content for message in self.supervisor_messages()],
+            [
+                "find three heist movies",
+                "Heat, Inside Man and Rififi.",
+                "save it to my documents",
+                "Which movie should I save?",
+            ],
+        )
@@ -0,0 +1,173 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ai import registry, scheduler
+from ai.benchmark.fakes import ScriptedChatModel
+from ai.streaming import format_sse
+
+
+class SlowScriptedChatModel(ScriptedChatModel):
+    """Streams one word every 50 ms, so a run is still going when the client leaves."""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in self._stream(messages, stop, run_manager, **kwargs):
+            await asyncio.sleep(0.05)
+            yield chunk
+
+
+def parse_sse(body):
+    """[(event, data)] of a text/event-stream body."""
+    events = []
+    for frame in body.split("\n\n"):
+        if not frame:
+            continue
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: "), frame
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+class ScriptedRunMixin:
+    """Serve chat_stream from a ScriptedChatModel, an in-memory checkpointer and a small scheduler."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="streamer")
+        self.model = ScriptedChatModel()
+        self.scheduler = scheduler.RunScheduler(max_concurrent=1, max_queued=1, max_queued_per_user=1)
+        patches = [
+            mock.patch("ai.supervisor.get_openai_model", side_effect=lambda **kwargs: self.model),
+            mock.patch("ai.registry.get_openai_model", side_effect=lambda **kwargs: self.model),
+            mock.patch("ai.registry.get_checkpointer", return_value=InMemorySaver()),
+            mock.patch.object(scheduler, "_scheduler", self.scheduler),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    async def post(self, message, **body):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.post(
+            "/ai/chat/stream/", {"message": message, **body}, content_type="application/json"
+        )
+        content = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        return response, content
+
+
+class ChatStreamTests(ScriptedRunMixin, TestCase):
+    def test_format_sse(self):
+        self.assertEqual(format_sse("done", {"thread_id": "t1"}), 'event: done\ndata: {"thread_id": "t1"}\n\n')
+
+    async def test_streams_tokens_and_ends_with_done(self):
+        self.model.load([{"content": "Hello, how can I help?"}])
+
+        response, content = await self.post("hello", thread_id="t1")
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        events = parse_sse(content)
+        self.assertEqual(events[0], ("route", {"agent": "supervisor", "source": "fallback"}))
+        self.assertEqual(events[-1], ("done", {"thread_id": "t1"}))
+        tokens = [data for event, data in events if event == "token"]
+        self.assertEqual("".join(data["content"] for data in tokens), "Hello, how can I help?")
+        self.assertTrue(all(data["agent"] == "supervisor" for data in tokens))
+
+    async def test_reports_handoffs(self):
+        self.model.load([
+            {"tool_calls": [{"name": "transfer_to_movie_agent"}]},
+            {"content": "Nothing found."},
+            {"content": "Sorry, nothing matched."},
+        ])
+
+        _, content = await self.post("hmm, surprise me with something")
+
+        events = parse_sse(content)
+        self.assertIn(("handoff", {"agent": "movie_agent"}), events)
+        self.assertIn(("token", {"agent": "movie_agent", "content": "Nothing"}), events)
+        self.assertEqual(events[-1][0], "done")
+
+    async def test_failed_run_ends_with_an_error_event(self):
+        # An empty script makes the model raise on its first call
+        self.model.load([])
+
+        with self.assertLogs("ai.views", "ERROR"):
+            _, content = await self.post("hello")
+
+        event, data = parse_sse(content)[-1]
+        self.assertEqual(event, "error")
+        self.assertIn("An unexpected error occurred", data["error"])
+        self.assertEqual(self.scheduler.stats()["running"], 0)
+
+    async def test_rejects_when_the_queue_is_full(self):
+        self.scheduler.reserve("someone")
+        self.scheduler.reserve("someone else")
+
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.post("/ai/chat/stream/", {"message": "hello"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "5")
+
+    async def test_requires_login(self):
+        response = await AsyncClient().post("/ai/chat/stream/", {"message": "hello"}, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+
+# The raw ASGI request closes the DB connection when it ends, which a
+# TestCase transaction can't survive
+class ChatStreamDisconnectTests(ScriptedRunMixin, TransactionTestCase):
+    async def test_client_disconnect_frees_the_run_slot(self):
+        self.model = SlowScriptedChatModel()
+        self.model.load([{"content": " ".join(["word"] * 100)}])
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        session_cookie = client.cookies["sessionid"].value
+
+        disconnected = asyncio.Event()
+        received = []
+
+        async def receive():
+            if not received:
+                received.append(True)
+                return {"type": "http.request", "body": json.dumps({"message": "hello"}).encode()}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "method": "POST", "path": "/ai/chat/stream/", "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"cookie", f"sessionid={session_cookie}; csrftoken={'a' * 32}".encode()),
+                (b"x-csrftoken", b"a" * 32),
+            ],
+            "http_version": "1.1", "scheme": "http", "server": ("testserver", 80), "client": ("127.0.0.1", 1),
+            "asgi": {"version": "3.0"},
+        }
+        request = asyncio.create_task(get_asgi_application()(scope, receive, send))
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if any(b"event: token" in message.get("body", b"") for message in sent):
+                break
+        self.assertEqual(self.scheduler.stats()["running"], 1)
+
+        disconnected.set()
+        await asyncio.wait_for(request, timeout=5)
+
+        self.assertEqual(self.scheduler.stats()["running"], 0)
+        bodies = b"".join(message.get("body", b"") for message in sent).decode()
+        self.assertNotIn("event: done", bodies)
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ai import registry
+from ai.benchmark.fakes import ScriptedChatModel
+from ai.benchmark.harness import FIXTURE, load_fixture
+from ai.benchmark.standins import PermitPDPStandIn, TMDBStandIn
+from ai.instrumentation import traced_config
+from ai.router import SUPERVISOR
+from ai.supervisor import get_supervisor
+from directories.models import Directory
+from movies import tracing
+from my_permit.client import reset_permit_client
+
+
+# Tools run on worker threads with their own connections, which can't see a
+# TestCase transaction
+class TurnSpanTreeTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="traced")
+        self.permit = PermitPDPStandIn()
+        self.tmdb = TMDBStandIn(load_fixture(FIXTURE)["movies"])
+        for server in (self.permit, self.tmdb):
+            server.start()
+            self.addCleanup(server.stop)
+
+        settings = override_settings(
+            TRACING_ENABLED=True,
+            PERMIT_PDP_URL=self.permit.url,
+            PERMIT_API_KEY="test",
+            PERMIT_CACHE_TTL=0,
+            TMDB_API_BASE_URL=self.tmdb.url,
+            TMDB_API_KEY="test",
+            TMDB_CACHE_TTL=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # The shared Permit client keeps the PDP URL it was created with
+        reset_permit_client()
+        self.addCleanup(reset_permit_client)
+        tracing.memory_exporter.clear()
+
+    def test_tool_spans_nest_permit_tmdb_and_orm_spans(self):
+        model = ScriptedChatModel()
+        model.load([
+            {"tool_calls": [{"name": "save_movie_as_document", "args": {"movie_id": 27205}}]},
+            {"content": "Saved."},
+        ])
+        graph = get_supervisor(model=model, checkpointer=InMemorySaver())
+        config = {"configurable": {"user_id": self.user.id, "thread_id": "traced"}}
+
+        graph.invoke(
+            {"messages": [HumanMessage(content="save Inception to my documents")]},
+            traced_config(config, agent_names=(SUPERVISOR, *registry.AGENT_BUILDERS)),
+        )
+
+        self.assertTrue(Directory.objects.filter(owner=self.user).exists())
+        spans = tracing.memory_exporter.get_finished_spans()
+        turn = next(span for span in spans if span.name == "agent.turn")
+        tool = next(span for span in spans if span.name == "tool save_movie_as_document")
+        self.assertIn(turn, self.ancestors(tool))
+        self.assertEqual(tool.attributes["user_id"], self.user.id)
+
+        children = [span.name for span in spans if span.parent is tool]
+        self.assertEqual(children.count("permit.check"), 3)
+        self.assertIn("tmdb.movie_details", children)
+        self.assertIn("db.query", children)
+        self.assertEqual({span.trace_id for span in spans}, {turn.trace_id})
+
+    def ancestors(self, span):
+        chain = []
+        while span.parent is not None:
+            span = span.parent
+            chain.append(span)
+        return chain
@@ -0,0 +1,89 @@
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.core.signals import request_started
+from django.test import SimpleTestCase, override_settings
+
+from ai import warmup
+
+
+class FakeSteps:
+    """Stand-in warm-up steps that note the thread they ran on."""
+
+    def __init__(self):
+        self.threads = []
+
+    def ok(self):
+        self.threads.append(threading.current_thread())
+        return "warmed"
+
+    def broken(self):
+        raise RuntimeError("no TMDB")
+
+    def patch(self, **steps):
+        return mock.patch.dict(warmup.STEPS, steps, clear=True)
+
+
+class WarmupCommandTests(SimpleTestCase):
+    def test_reports_each_step(self):
+        steps = FakeSteps()
+        out = StringIO()
+        with steps.patch(graphs=steps.ok, connections=steps.ok):
+            call_command("warmup", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines], ["graphs", "connections", "total"])
+        self.assertTrue(lines[0].endswith("ms  warmed"))
+
+    def test_failed_step_fails_the_command(self):
+        steps = FakeSteps()
+        out = StringIO()
+        with steps.patch(graphs=steps.ok, tmdb=steps.broken), self.assertLogs("ai.warmup", "ERROR"):
+            with self.assertRaisesMessage(CommandError, "1 warm-up step(s) failed"):
+                call_command("warmup", stdout=out)
+
+        self.assertIn("failed: no TMDB", out.getvalue())
+        self.assertEqual(len(steps.threads), 1)
+
+
+class WarmupOnStartTests(SimpleTestCase):
+    @override_settings(AGENT_WARMUP_ON_START=True)
+    def test_warms_up_before_returning(self):
+        steps = FakeSteps()
+        out = StringIO()
+        with steps.patch(graphs=steps.ok):
+            results = warmup.warm_up_on_start(stream=out)
+
+        self.assertEqual([name for name, _, _, _ in results], ["graphs"])
+        # On its own thread, so an ASGI server's running event loop doesn't matter
+        self.assertNotEqual(steps.threads, [threading.current_thread()])
+        self.assertIn("graphs", out.getvalue())
+
+    @override_settings(AGENT_WARMUP_ON_START=False)
+    def test_off_by_default(self):
+        steps = FakeSteps()
+        with steps.patch(graphs=steps.ok):
+            self.assertEqual(warmup.warm_up_on_start(stream=StringIO()), [])
+        self.assertEqual(steps.threads, [])
+
+
+class WarmupHookTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("ai.warmup.start_background_warmup")
+        self.start = patcher.start()
+        self.addCleanup(patcher.stop)
+        warmup.install_warmup_hook()
+        self.addCleanup(request_started.disconnect, dispatch_uid=warmup.WARMUP_HOOK_UID)
+
+    def test_warms_up_once_on_the_first_request(self):
+        self.client.get("/metrics")
+        self.client.get("/metrics")
+
+        self.start.assert_called_once_with()
+
+    def test_management_commands_do_not_warm_up(self):
+        call_command("check", stdout=StringIO())
+
+        self.start.assert_not_called()
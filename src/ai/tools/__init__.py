@@ -1,6 +1,27 @@
-from .documents import document_tools
-from .movie_discovery import movie_tools
+from importlib import import_module
+
+# Tool modules import the Permit SDK, TMDB and LangChain; they are loaded on
+# first access so importing `ai.tools` (or Django startup) stays cheap
+_EXPORTS = {
+    "check_permission": "secured",
+    "document_tools": "documents",
+    "job_tools": "jobs",
+    "movie_tools": "movie_discovery",
+    "secured_tool": "secured",
+    "workflow_tools": "workflows",
+}
+
 __all__ = [
+    "check_permission",
     "document_tools",
-    "movie_tools"
-]
\ No newline at end of file
+    "job_tools",
+    "movie_tools",
+    "secured_tool",
+    "workflow_tools",
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,207 +1,77 @@
-
-from asgiref.sync import async_to_sync
-from my_permit import permit_client as permit
+from ai import jobs
+from asgiref.sync import sync_to_async
 from directories.models import Directory
-from langchain_core.tools import tool
-from langchain_core.runnables import RunnableConfig
-from django.core.exceptions import ValidationError
-from django.db import transaction
-from django.db.models import Q
-from permit import PermitApiError
-
-@tool
-def list_documents(*, config: RunnableConfig, limit: int = 10):
+from django.db.models import Max, Q
+
+from .secured import secured_tool
+
+
+@secured_tool("directory", "list_documents", read_replica=True, memoize=True)
+async def list_documents(limit: int = 10, *, user_id: int):
     """
     List the most recent documents for the current user.
 
     Args:
-        config (RunnableConfig): Configuration containing 'user_id'.
         limit (int): Maximum number of documents to return (default 10).
 
     Returns:
         dict: List of documents or an error message.
     """
-
-    # -----------------------------
-    # Get user_id from config
-    # -----------------------------
-    configurable = config.get("configurable") or {}
-    user_id = configurable.get("user_id")
-
-    if not user_id:
-        return {"error": "user_id missing in config"}
-
-    try:
-        user_id = int(user_id)
-    except (ValueError, TypeError):
-        return {"error": "user_id must be an integer"}
-
-    # -----------------------------
-    # Permission check
-    # -----------------------------
-    try:
-        has_perm = async_to_sync(permit.check)(
-            str(user_id),         # subject
-            "list_documents",       # action
-            "directory",          # resource
-)
-
-    except PermitApiError as e:
-        return {"error": f"Permit API error: {str(e)}"}
-
-    if not has_perm:
-        raise PermissionError("User does not have permission to list documents.")
-
-    # -----------------------------
-    # Validate limit
-    # -----------------------------
-    try:
-        limit = int(limit)
-        if limit <= 0:
-            limit = 10
-    except (ValueError, TypeError):
+    if limit <= 0:
         limit = 10
 
-    # -----------------------------
-    # Query documents
-    # -----------------------------
-    try:
-        queryset = Directory.objects.filter(owner_id=user_id, active=True).order_by("-created_at")[:limit]
-
-        if not queryset.exists():
-            return {"success": True, "documents": [], "message": "No documents found"}
-
-        documents = [{"id": obj.id, "title": obj.title} for obj in queryset]
-
-        return {"success": True, "documents": documents}
-
-    except ValidationError as e:
-        return {"error": str(e)}
+    documents = [
+        {"id": obj.id, "title": obj.title}
+        async for obj in Directory.objects.filter(owner_id=user_id, active=True).order_by("-created_at")[:limit]
+    ]
+    if not documents:
+        return {"success": True, "documents": [], "message": "No documents found"}
 
-    except Exception as e:
-        return {"error": f"An unexpected error occurred: {str(e)}"}
+    return {"success": True, "documents": documents}
 
 
-
-
-@tool
-def get_document(document_id: int, *, config: RunnableConfig):
+@secured_tool(
+    "directory", "get_document",
+    denied_message="User does not have permission to view this document.",
+    not_found="Document not found",
+    read_replica=True,
+    memoize=True,
+)
+async def get_document(document_id: int, *, user_id: int):
     """
     Get a single document for the current user.
 
     Args:
         document_id (int): ID of the document to retrieve.
-        config (RunnableConfig): Configuration containing 'user_id'.
 
     Returns:
         dict: Document info or error message.
     """
-
-    # -----------------------------
-    # Get user_id from config
-    # -----------------------------
-    configurable = config.get("configurable") or {}
-    user_id = configurable.get("user_id")
-
-    if not user_id:
-        return {"error": "user_id missing in config"}
-
-    try:
-        user_id = int(user_id)
-    except (ValueError, TypeError):
-        return {"error": "user_id must be an integer"}
-
-    # -----------------------------
-    # Validate document_id
-    # -----------------------------
-    try:
-        document_id = int(document_id)
-    except (ValueError, TypeError):
-        return {"error": "document_id must be an integer"}
-
-    # -----------------------------
-    # Permission check
-    # -----------------------------
-    try:
-        has_perm = async_to_sync(permit.check)(
-            str(user_id),
-            resource="directory",
-            action="get_document",  # <-- Permit action key
-            
-        )
-    except PermitApiError as e:
-        return {"error": f"Permit API error: {str(e)}"}
-
-    if not has_perm:
-        raise PermissionError("User does not have permission to view this document.")
-
-    # -----------------------------
-    # Fetch the document
-    # -----------------------------
-    try:
-        obj = Directory.objects.get(id=document_id, owner_id=user_id, active=True)
-        return {
-            "success": True,
-            "id": obj.id,
-            "title": obj.title,
-            "content": obj.content,
-        }
-
-    except Directory.DoesNotExist:
-        return {"error": "Document not found"}
-
-    except ValidationError as e:
-        return {"error": str(e)}
-
-    except Exception as e:
-        return {"error": f"An unexpected error occurred: {str(e)}"}
-
-
-
-@tool
-def create_document(title: str, content: str, *, config: RunnableConfig):
+    obj = await Directory.objects.aget(id=document_id, owner_id=user_id, active=True)
+    return {
+        "success": True,
+        "id": obj.id,
+        "title": obj.title,
+        "content": obj.content,
+    }
+
+
+@secured_tool(
+    "directory", "create_document",
+    denied_message="User does not have permission to create a document.",
+    writes=True,
+)
+async def create_document(title: str, content: str, *, user_id: int):
     """
     Create a new document for the current user.
 
     Args:
         title (str): Title of the document (max 120 characters).
         content (str): Content of the document (long-form text).
-        config (RunnableConfig): Configuration containing 'user_id'.
 
     Returns:
         dict: Created document info or error message.
     """
-
-    # -----------------------------
-    # Get user_id from config
-    # -----------------------------
-    configurable = config.get("configurable") or {}
-    user_id = configurable.get("user_id")
-
-    if not user_id:
-        return {"error": "user_id missing in config"}
-
-    try:
-        user_id = int(user_id)
-    except (ValueError, TypeError):
-        return {"error": "user_id must be an integer"}
-
-    # -----------------------------
-    # Permission check
-    # -----------------------------
-    try:
-        has_perm = async_to_sync(permit.check)(
-            str(user_id),
-            resource="directory",
-            action="create_document",  # <-- Permit action key
-            
-        )
-    except PermitApiError as e:
-        return {"error": f"Permit API error: {str(e)}"}
-
-    if not has_perm:
-        raise PermissionError("User does not have permission to create a document.")
-
     # -----------------------------
     # Validate title and content
     # -----------------------------
@@ -214,37 +84,29 @@ def create_document(title: str, content: str, *, config: RunnableConfig):
     if not content or not content.strip():
         return {"error": "Content cannot be empty"}
 
-    # -----------------------------
-    # Create document safely
-    # -----------------------------
-    try:
-        with transaction.atomic():
-            obj = Directory.objects.create(
-                title=title.strip(),
-                content=content.strip(),
-                owner_id=user_id,
-                active=True
-            )
-
-            return {
-                "success": True,
-                "id": obj.id,
-                "title": obj.title,
-                "content": obj.content,
-                "created_at": obj.created_at
-            }
-
-    except ValidationError as e:
-        return {"error": str(e)}
-
-    except Exception as e:
-        return {"error": f"An unexpected error occurred: {str(e)}"}
-
-
-
-
-@tool
-def update_document(document_id: int, title: str = None, content: str = None, *, config: RunnableConfig):
+    obj = await Directory.objects.acreate(
+        title=title.strip(),
+        content=content.strip(),
+        owner_id=user_id,
+        active=True
+    )
+
+    return {
+        "success": True,
+        "id": obj.id,
+        "title": obj.title,
+        "content": obj.content,
+        "created_at": obj.created_at.isoformat()
+    }
+
+
+@secured_tool(
+    "directory", "update_document",
+    denied_message="User does not have permission to update this document.",
+    not_found="Document not found",
+    writes=True,
+)
+async def update_document(document_id: int, title: str = None, content: str = None, *, user_id: int):
     """
     Update a document's title and/or content for the current user.
 
@@ -252,286 +114,109 @@ def update_document(document_id: int, title: str = None, content: str = None, *,
         document_id (int): ID of the document to update.
         title (str, optional): New title for the document.
         content (str, optional): New content for the document.
-        config (RunnableConfig): Configuration containing 'user_id'.
 
     Returns:
         dict: Updated document info or error message.
     """
-
-    # -----------------------------
-    # Get user_id from config
-    # -----------------------------
-    configurable = config.get("configurable") or {}
-    user_id = configurable.get("user_id")
-
-    if not user_id:
-        return {"error": "user_id missing in config"}
-
-    try:
-        user_id = int(user_id)
-    except (ValueError, TypeError):
-        return {"error": "user_id must be an integer"}
-
-    # -----------------------------
-    # Validate document_id
-    # -----------------------------
-    try:
-        document_id = int(document_id)
-    except (ValueError, TypeError):
-        return {"error": "document_id must be an integer"}
-
     if not title and not content:
         return {"error": "At least one of 'title' or 'content' must be provided"}
 
-    # -----------------------------
-    # Permission check
-    # -----------------------------
-    try:
-        has_perm = async_to_sync(permit.check)(
-            str(user_id),
-            resource="directory",
-            action="update_document",  # <-- Permit action key
-            
-        )
-    except PermitApiError as e:
-        return {"error": f"Permit API error: {str(e)}"}
-
-    if not has_perm:
-        raise PermissionError("User does not have permission to update this document.")
-
-    # -----------------------------
-    # Update safely using transaction
-    # -----------------------------
-    try:
-        with transaction.atomic():
-            obj = Directory.objects.get(id=document_id, owner_id=user_id, active=True)
-
-            if title:
-                obj.title = title
-            if content:
-                obj.content = content
-
-            obj.save()
-
-            return {
-                "success": True,
-                "id": obj.id,
-                "title": obj.title,
-                "content": obj.content,
-            }
+    obj = await Directory.objects.aget(id=document_id, owner_id=user_id, active=True)
 
-    except Directory.DoesNotExist:
-        return {"error": "Document not found"}
+    if title:
+        obj.title = title
+    if content:
+        obj.content = content
 
-    except ValidationError as e:
-        return {"error": str(e)}
+    await obj.asave()
 
-    except Exception as e:
-        return {"error": f"An unexpected error occurred: {str(e)}"}
+    return {
+        "success": True,
+        "id": obj.id,
+        "title": obj.title,
+        "content": obj.content,
+    }
 
 
-
-
-@tool
-def delete_document(document_id: int, *, config: RunnableConfig):
+@secured_tool(
+    "directory", "delete_document",
+    denied_message="User does not have permission to delete this document.",
+    not_found="Document not found",
+    writes=True,
+)
+async def delete_document(document_id: int, *, user_id: int):
     """
     Delete a single document for the current user.
 
     Args:
         document_id (int): The ID of the document to delete.
-        config (RunnableConfig): Configuration containing 'user_id'.
 
     Returns:
         dict: Success or error message.
     """
+    obj = await Directory.objects.aget(id=document_id, owner_id=user_id, active=True)
+    await obj.adelete()
 
-    # -----------------------------
-    # Get user_id from config
-    # -----------------------------
-    configurable = config.get("configurable") or {}
-    user_id = configurable.get("user_id")
+    return {"success": True, "message": f"Document {document_id} deleted successfully."}
 
-    if not user_id:
-        return {"error": "user_id missing in config"}
-
-    try:
-        user_id = int(user_id)
-    except (ValueError, TypeError):
-        return {"error": "user_id must be an integer"}
-
-    # -----------------------------
-    # Validate document_id
-    # -----------------------------
-    try:
-        document_id = int(document_id)
-    except (ValueError, TypeError):
-        return {"error": "document_id must be an integer"}
 
-    # -----------------------------
-    # Permission check
-    # -----------------------------
-    try:
-        has_perm = async_to_sync(permit.check)(str(user_id),resource="directory",action="delete_document")
-    except PermitApiError as e:
-        return {"error": f"Permit API error: {str(e)}"}
-
-    if not has_perm:
-        raise PermissionError("User does not have permission to delete this document.")
-
-    # -----------------------------
-    # Delete document safely
-    # -----------------------------
-    try:
-        with transaction.atomic():
-            obj = Directory.objects.get(id=document_id, owner_id=user_id, active=True)
-            obj.delete()
-            return {"success": True, "message": f"Document {document_id} deleted successfully."}
-
-    except Directory.DoesNotExist:
-        return {"error": "Document not found"}
-
-    except ValidationError as e:
-        return {"error": str(e)}
-
-    except Exception as e:
-        return {"error": f"An unexpected error occurred: {str(e)}"}
-
-
-@tool
-def delete_all_documents(*, config: RunnableConfig):
+@secured_tool("directory", "delete_all_documents")
+async def delete_all_documents(*, user_id: int):
     """
-    Delete all documents for the current user.
-
-    Args:
-        config (RunnableConfig): Configuration containing 'user_id'.
+    Delete all documents for the current user in the background.
 
     Returns:
-        dict: Success message and number of deleted documents, or error.
+        dict: The background job (poll it with get_job_status), or error.
     """
-
-    # -----------------------------
-    # Get user_id from config
-    # -----------------------------
-    configurable = config.get("configurable") or {}
-    user_id = configurable.get("user_id")
-
-    if not user_id:
-        return {"error": "user_id missing in config"}
-
-    try:
-        user_id = int(user_id)
-    except (ValueError, TypeError):
-        return {"error": "user_id must be an integer"}
-
-    # -----------------------------
-    # Permission check
-    # -----------------------------
-    try:
-        has_perm = async_to_sync(permit.check)(
-            str(user_id),
-            resource="directory",
-            action="delete_all_documents",  # <-- your action key
-            
-        )
-    except PermitApiError as e:
-        return {"error": f"Permit API error: {str(e)}"}
-
-    if not has_perm:
-        raise PermissionError("User does not have permission to delete all documents.")
-
-    # -----------------------------
-    # Delete safely using transaction
-    # -----------------------------
-    try:
-        with transaction.atomic():
-            deleted_count, _ = Directory.objects.filter(owner_id=user_id, active=True).delete()
-            
-            if deleted_count == 0:
-                return {"success": True, "deleted_count": 0, "message": "No documents to delete"}
-            
-            return {"success": True, "deleted_count": deleted_count, "message": "All documents deleted successfully"}
-
-    except Exception as e:
-        return {"error": f"An unexpected error occurred: {str(e)}"}
-
-
-
-@tool
-def search_query_documents(query: str, *, config: RunnableConfig, limit: int = 10):
+    max_id = (await Directory.objects.filter(owner_id=user_id, active=True).aaggregate(max_id=Max("id")))["max_id"]
+    if max_id is None:
+        return {"success": True, "deleted_count": 0, "message": "No documents to delete"}
+
+    # Large accounts take too long to delete inside a tool call; a worker does
+    # it, up to the newest document existing now
+    job = await sync_to_async(jobs.enqueue)("delete_all_documents", user_id, payload={"max_id": max_id}, dedupe=True)
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "message": "Deleting all documents in the background; check progress with get_job_status",
+    }
+
+
+@secured_tool(
+    "directory", "search_query_documents",
+    denied_message="User does not have permission to search documents.",
+    read_replica=True,
+    memoize=True,
+)
+async def search_query_documents(query: str, limit: int = 10, *, user_id: int):
     """
     Search documents for the current user by a query string in title or content.
-    """
 
-    # -----------------------------
-    # Get user_id from config
-    # -----------------------------
-    configurable = config.get("configurable") or {}
-    user_id = configurable.get("user_id")
-
-    if not user_id:
-        return {"error": "user_id missing in config"}
-
-    try:
-        user_id = int(user_id)
-    except (ValueError, TypeError):
-        return {"error": "user_id must be an integer"}
-
-    # -----------------------------
-    # Permission check
-    # -----------------------------
-    try:
-        has_perm = async_to_sync(permit.check)(
-            str(user_id),
-            resource="directory",
-            action="search_query_documents",  # <-- your action key
-            
-        )
-    except PermitApiError as e:
-        return {"error": f"Permit API error: {str(e)}"}
-
-    if not has_perm:
-        raise PermissionError("User does not have permission to search documents.")
+    Args:
+        query (str): Text to look for in document titles and content.
+        limit (int): Maximum number of documents to return (default 10).
 
-    # -----------------------------
-    # Validate query
-    # -----------------------------
+    Returns:
+        dict: Matching documents or an error message.
+    """
     if not query or not query.strip():
         return {"error": "Search query cannot be empty"}
 
     query = query.strip()
-
-    # -----------------------------
-    # Validate limit
-    # -----------------------------
-    try:
-        limit = int(limit)
-        if limit <= 0:
-            limit = 10
-    except (ValueError, TypeError):
+    if limit <= 0:
         limit = 10
 
-    # -----------------------------
-    # Perform search
-    # -----------------------------
-    try:
-        queryset = Directory.objects.filter(active=True).filter(
+    documents = [
+        {"id": obj.id, "title": obj.title, "content": obj.content}
+        async for obj in Directory.objects.filter(owner_id=user_id, active=True).filter(
             Q(title__icontains=query) | Q(content__icontains=query)
         ).order_by("-created_at")[:limit]
+    ]
+    if not documents:
+        return {"success": True, "documents": [], "message": "No documents matched your query"}
 
-        if not queryset.exists():
-            return {"success": True, "documents": [], "message": "No documents matched your query"}
-
-        documents = [{"id": obj.id, "title": obj.title, "content": obj.content} for obj in queryset]
-
-        return {"success": True, "documents": documents}
-
-    except ValidationError as e:
-        return {"error": str(e)}
-
-    except Exception as e:
-        return {"error": f"An unexpected error occurred: {str(e)}"}
-
-
+    return {"success": True, "documents": documents}
 
 
 # -----------------------------
@@ -545,4 +230,4 @@ document_tools = [
     delete_document,
     delete_all_documents,
     search_query_documents,
-]
\ No newline at end of file
+]
@@ -0,0 +1,49 @@
+from ai.jobs import job_status
+from ai.models import AgentJob
+
+from .secured import secured_tool
+
+
+@secured_tool("directory", "get_job_status", not_found="Job not found")
+def get_job_status(job_id: int, *, user_id: int):
+    """
+    Check on a background job started by another tool (e.g. delete_all_documents).
+
+    Args:
+        job_id (int): ID returned when the job was started.
+
+    Returns:
+        dict: Job status (queued, running, succeeded, failed), result or error.
+    """
+    job = AgentJob.objects.get(id=job_id, owner_id=user_id)
+    return {"success": True, **job_status(job)}
+
+
+@secured_tool("directory", "get_job_status")
+def list_jobs(limit: int = 5, *, user_id: int):
+    """
+    List the current user's most recent background jobs.
+
+    Args:
+        limit (int): Maximum number of jobs to return (default 5).
+
+    Returns:
+        dict: Jobs, newest first, or an error message.
+    """
+    if limit <= 0:
+        limit = 5
+
+    jobs = [job_status(job) for job in AgentJob.objects.filter(owner_id=user_id).order_by("-created_at")[:limit]]
+    if not jobs:
+        return {"success": True, "jobs": [], "message": "No background jobs found"}
+
+    return {"success": True, "jobs": jobs}
+
+
+# -----------------------------
+# TOOL LIST
+# -----------------------------
+job_tools = [
+    get_job_status,
+    list_jobs,
+]
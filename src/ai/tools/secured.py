@@ -0,0 +1,279 @@
+import functools
+import inspect
+import logging
+from contextlib import nullcontext
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from permit import PermitError
+
+from ai import memo
+from ai.circuit import ServiceUnavailable, StaleCache
+from ai.db import release_connections
+from ai.metrics import PERMISSION_LOOKUPS, STALE_SERVED, record_error, record_permission
+from ai.signals import tool_invalidates
+from movies.db_routers import apin_to_primary, areplica_reads, pin_to_primary, replica_reads
+from my_permit import get_permit_client
+
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Permission lookup
+# -----------------------------
+def _permission_cache_key(user_id, resource, action):
+    return f"ai:permit:{user_id}:{resource}:{action}"
+
+
+def get_permission_cache():
+    """StaleCache used for Permit decisions, or None when PERMIT_CACHE_TTL is 0."""
+    if not settings.PERMIT_CACHE_TTL:
+        return None
+    return StaleCache(caches[settings.PERMIT_CACHE_ALIAS], settings.PERMIT_CACHE_TTL, settings.PERMIT_STALE_TTL)
+
+
+def _cached_decision(cache, key):
+    allowed = cache.get(key) if cache is not None else None
+    PERMISSION_LOOKUPS.labels("miss" if allowed is None else "hit").inc()
+    return allowed
+
+
+def _stale_decision(cache, key, error):
+    # While the PDP is failing, a decision it made in the last PERMIT_STALE_TTL
+    # seconds is a better answer than failing every tool call. Stale grants could
+    # let a revoked user act, so only denials are served unless PERMIT_STALE_GRANTS.
+    allowed = cache.get_stale(key) if cache is not None else None
+    if allowed is None or (allowed and not settings.PERMIT_STALE_GRANTS):
+        raise error
+    STALE_SERVED.labels("permit").inc()
+    logger.warning("Permit unavailable (%s); using a stale decision for %s", error, key)
+    return allowed
+
+
+def check_permission(user_id, resource, action):
+    """
+    Ask Permit whether `user_id` may perform `action` on `resource`.
+
+    Decisions are kept in the permission cache (PERMIT_CACHE_ALIAS) for
+    PERMIT_CACHE_TTL seconds, so repeated tool calls skip the PDP round trip.
+    When the PDP is down, denials are served for PERMIT_STALE_TTL seconds
+    longer, and grants too with PERMIT_STALE_GRANTS.
+
+    Raises:
+        PermitError: The PDP could not be reached or rejected the request.
+        ServiceUnavailable: The PDP's circuit is open (see ai.circuit).
+    """
+    cache = get_permission_cache()
+    key = _permission_cache_key(user_id, resource, action)
+    allowed = _cached_decision(cache, key)
+    if allowed is not None:
+        return allowed
+
+    try:
+        allowed = async_to_sync(get_permit_client().check)(str(user_id), action, resource)
+    except (PermitError, ServiceUnavailable) as e:
+        return _stale_decision(cache, key, e)
+    if cache is not None:
+        cache.set(key, allowed)
+    return allowed
+
+
+async def acheck_permission(user_id, resource, action):
+    """check_permission() for tools running on the event loop."""
+    # Cache lookups are quick enough to make inline rather than on a thread
+    cache = get_permission_cache()
+    key = _permission_cache_key(user_id, resource, action)
+    allowed = _cached_decision(cache, key)
+    if allowed is not None:
+        return allowed
+
+    try:
+        allowed = await get_permit_client().check(str(user_id), action, resource)
+    except (PermitError, ServiceUnavailable) as e:
+        return _stale_decision(cache, key, e)
+    if cache is not None:
+        cache.set(key, allowed)
+    return allowed
+
+
+def _get_user_id(config):
+    configurable = config.get("configurable") or {}
+    user_id = configurable.get("user_id")
+    if not user_id:
+        return None, "user_id missing in config"
+    try:
+        return int(user_id), None
+    except (ValueError, TypeError):
+        return None, "user_id must be an integer"
+
+
+def _error_result(func, not_found, e):
+    if isinstance(e, ServiceUnavailable):
+        return e.as_result()
+    if isinstance(e, ObjectDoesNotExist):
+        return {"error": not_found}
+    if isinstance(e, ValidationError):
+        return {"error": str(e)}
+    logger.exception("Tool %s failed", func.__name__)
+    return {"error": f"An unexpected error occurred: {str(e)}"}
+
+
+def _reported(result):
+    # Count handled failures as errors in the tool metrics; the agent sees them as results
+    if isinstance(result, dict) and "error" in result:
+        record_error()
+    return result
+
+
+# -----------------------------
+# Decorator
+# -----------------------------
+def _denied_message(action):
+    return f"User does not have permission to {action.replace('_', ' ')}."
+
+
+def secured_tool(
+    resource, action, *, denied_message=None, not_found="Not found", read_replica=False, writes=False, requires=(),
+    memoize=False,
+):
+    """
+    Turn `func(..., *, user_id)` into a LangChain tool guarded by a Permit check.
+
+    The wrapper reads user_id from the run config, checks `action` on `resource`
+    (through the permission cache) and maps failures to {"error": ...} results
+    the agent can explain, so the tool body only holds its own logic:
+
+        @secured_tool("directory", "get_document", not_found="Document not found")
+        async def get_document(document_id: int, *, user_id: int):
+            ...
+
+    The body may be sync or async. Async bodies (using the async ORM) run on the
+    event loop when the graph is streamed, and through async_to_sync for sync
+    callers; sync bodies run on LangChain's executor threads either way.
+
+    Args:
+        resource (str): Permit resource key.
+        action (str): Permit action key.
+        denied_message (str, optional): Error returned when the check fails.
+        not_found (str): Error returned when the body raises ObjectDoesNotExist.
+        read_replica (bool): The body only reads; run its queries on the read
+            replica (see movies.db_routers) unless the user just wrote.
+        writes (bool): The body writes documents; keep the user's replica
+            reads on the primary for a while afterwards, and drop the user's
+            memoized results for `resource`.
+        requires (tuple): Further (resource, action) checks the user must pass,
+            for tools that do the work of several others.
+        memoize (bool): The body only reads; ToolMemoMiddleware answers a
+            repeat of the same call in a thread without running it (ai.memo).
+    """
+    checks = [(resource, action, denied_message or _denied_message(action))]
+    checks += [
+        (extra_resource, extra_action, _denied_message(extra_action)) for extra_resource, extra_action in requires
+    ]
+
+    def decorator(func):
+        # The model sees the body's arguments without user_id; LangChain injects `config`
+        signature = inspect.signature(func)
+        parameters = [p for name, p in signature.parameters.items() if name != "user_id"]
+        parameters.append(inspect.Parameter("config", inspect.Parameter.KEYWORD_ONLY, annotation=RunnableConfig))
+
+        if inspect.iscoroutinefunction(func):
+            async def acall(*args, config, **kwargs):
+                user_id, error = _get_user_id(config)
+                if error:
+                    return {"error": error}
+
+                for check_resource, check_action, denied in checks:
+                    try:
+                        allowed = await acheck_permission(user_id, check_resource, check_action)
+                    except PermitError as e:
+                        return {"error": f"Permit API error: {str(e)}"}
+                    except ServiceUnavailable as e:
+                        return e.as_result()
+
+                    record_permission(allowed)
+                    if not allowed:
+                        return {"error": denied}
+
+                try:
+                    # The async ORM copies this context to its thread, so the router sees it
+                    async with areplica_reads(user_id) if read_replica else nullcontext():
+                        with tool_invalidates(resource) if writes else nullcontext():
+                            result = await func(*args, user_id=user_id, **kwargs)
+                    if writes:
+                        await apin_to_primary(user_id)
+                except Exception as e:
+                    return _error_result(func, not_found, e)
+                else:
+                    # The write is done: this never raises, so it can't be reported as failed
+                    if writes:
+                        await memo.ainvalidate(user_id, resource)
+                    return result
+                finally:
+                    # Async ORM queries run on the thread-sensitive thread; release them there
+                    await sync_to_async(release_connections)()
+
+            @functools.wraps(func)
+            async def coroutine(*args, config: RunnableConfig, **kwargs):
+                return _reported(await acall(*args, config=config, **kwargs))
+
+            # Sync callers (graph.invoke) run the same coroutine to completion
+            @functools.wraps(func)
+            def wrapper(*args, config: RunnableConfig, **kwargs):
+                return async_to_sync(coroutine)(*args, config=config, **kwargs)
+        else:
+            # Async callers get LangChain's default: the body on an executor thread
+            coroutine = None
+
+            def call(*args, config, **kwargs):
+                user_id, error = _get_user_id(config)
+                if error:
+                    return {"error": error}
+
+                for check_resource, check_action, denied in checks:
+                    try:
+                        allowed = check_permission(user_id, check_resource, check_action)
+                    except PermitError as e:
+                        return {"error": f"Permit API error: {str(e)}"}
+                    except ServiceUnavailable as e:
+                        return e.as_result()
+
+                    record_permission(allowed)
+                    if not allowed:
+                        return {"error": denied}
+
+                try:
+                    with replica_reads(user_id) if read_replica else nullcontext():
+                        with tool_invalidates(resource) if writes else nullcontext():
+                            result = func(*args, user_id=user_id, **kwargs)
+                    if writes:
+                        pin_to_primary(user_id)
+                except Exception as e:
+                    return _error_result(func, not_found, e)
+                else:
+                    if writes:
+                        memo.invalidate(user_id, resource)
+                    return result
+                finally:
+                    release_connections()
+
+            @functools.wraps(func)
+            def wrapper(*args, config: RunnableConfig, **kwargs):
+                return _reported(call(*args, config=config, **kwargs))
+
+        for function in filter(None, (wrapper, coroutine)):
+            function.__signature__ = signature.replace(parameters=parameters)
+            function.__annotations__ = {
+                **{name: value for name, value in func.__annotations__.items() if name != "user_id"},
+                "config": RunnableConfig,
+            }
+        secured = StructuredTool.from_function(func=wrapper, coroutine=coroutine)
+        secured.metadata = {"permit_checks": [(check[0], check[1]) for check in checks], "memoize": memoize}
+        return secured
+
+    return decorator
@@ -0,0 +1,80 @@
+from directories.models import Directory
+from tmdb.client import movies_details, search_movie
+
+from .secured import secured_tool
+
+
+TITLE_MAX_LENGTH = Directory._meta.get_field("title").max_length
+
+
+def format_movie_document(movie):
+    """Render TMDB movie details as the title and content of a document."""
+    year = (movie.get("release_date") or "")[:4]
+    title = f"{movie.get('title', 'Untitled')} ({year})" if year else movie.get("title", "Untitled")
+    lines = [
+        title,
+        f"Release date: {movie.get('release_date') or 'N/A'}",
+        f"Runtime: {movie['runtime']} min" if movie.get("runtime") else "Runtime: N/A",
+        f"Genres: {', '.join(g['name'] for g in movie.get('genres', [])) or 'N/A'}",
+        f"TMDB ID: {movie.get('id')}",
+        "",
+        "Overview:",
+        movie.get("overview") or "No overview available.",
+    ]
+    return title, "\n".join(lines)
+
+
+@secured_tool(
+    "directory", "create_document",
+    denied_message="User does not have permission to create a document.",
+    writes=True,
+    requires=(("movie_discovery", "search_movies"), ("movie_discovery", "get_movie_details")),
+)
+def save_movie_as_document(query: str = None, movie_id: int = None, title: str = None, *, user_id: int):
+    """
+    Find a movie on TMDB and save its details as a new document, in one step.
+    Use it whenever the user wants a movie (or its details) saved to a document.
+
+    Args:
+        query (str, optional): Movie title to search for; the top match is saved.
+        movie_id (int, optional): TMDB ID of the movie, when already known.
+        title (str, optional): Document title (default "<movie title> (<year>)").
+
+    Returns:
+        dict: The created document and the movie it describes, or an error.
+    """
+    if not movie_id:
+        if not query or not query.strip():
+            return {"error": "Provide a movie title to search for or a movie_id"}
+        results = search_movie(query=query.strip(), page=1, raw=False).get("results", [])
+        if not results:
+            return {"success": True, "message": "No movies found matching your query."}
+        movie_id = results[0]["id"]
+
+    movie = movies_details(movie_id=movie_id, raw=False)
+    if not movie or not movie.get("id"):
+        return {"error": "Movie not found"}
+
+    default_title, content = format_movie_document(movie)
+    obj = Directory.objects.create(
+        title=((title or "").strip() or default_title)[:TITLE_MAX_LENGTH],
+        content=content,
+        owner_id=user_id,
+        active=True
+    )
+
+    return {
+        "success": True,
+        "id": obj.id,
+        "title": obj.title,
+        "movie": {"id": movie["id"], "title": movie.get("title"), "release_date": movie.get("release_date")},
+        "created_at": obj.created_at.isoformat(),
+    }
+
+
+# -----------------------------
+# TOOL LIST
+# -----------------------------
+workflow_tools = [
+    save_movie_as_document,
+]
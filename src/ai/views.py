@@ -0,0 +1,101 @@
+import hmac
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET, require_POST
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from ai import scheduler
+from ai.streaming import format_sse
+
+
+logger = logging.getLogger(__name__)
+
+
+class RunStreamResponse(StreamingHttpResponse):
+    """Streaming response that gives back its run slot however the request ends."""
+
+    def __init__(self, streaming_content, reservation, **kwargs):
+        super().__init__(streaming_content, **kwargs)
+        self.reservation = reservation
+
+    def close(self):
+        # Covers clients that disconnect before the stream is ever started
+        self.reservation.cancel()
+        super().close()
+
+
+@require_POST
+async def chat_stream(request):
+    """
+    Run one chat turn and stream tokens and tool events as server-sent events.
+
+    Body (JSON):
+        message (str): The user's message.
+        thread_id (str, optional): Conversation to continue; a new one is started if omitted.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Request body must be JSON"}, status=400)
+
+    message = (body.get("message") or "").strip()
+    if not message:
+        return JsonResponse({"error": "message cannot be empty"}, status=400)
+
+    # Threads are scoped to the user so one user can't resume another's conversation
+    thread_id = str(body.get("thread_id") or uuid.uuid4().hex)
+    config = {"configurable": {"user_id": user.id, "thread_id": f"user-{user.id}:{thread_id}"}}
+
+    try:
+        reservation = scheduler.get_scheduler().reserve(user.id)
+    except scheduler.QueueFull as e:
+        response = JsonResponse({"error": str(e)}, status=429)
+        response["Retry-After"] = "5"
+        return response
+
+    async def events():
+        # A client disconnect cancels this generator, which frees the slot or
+        # drops the queued run and stops the graph mid-run.
+        try:
+            async for event, data in scheduler.astream(reservation, message, config):
+                if event == "done":
+                    data = {"thread_id": thread_id}
+                yield format_sse(event, data)
+        except Exception as e:
+            logger.exception("Chat stream failed")
+            yield format_sse("error", {"error": f"An unexpected error occurred: {str(e)}"})
+
+    response = RunStreamResponse(events(), reservation, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _may_scrape(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        header = request.headers.get("Authorization", "")
+        if hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            return True
+    return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+@require_GET
+def metrics(request):
+    """
+    Expose process metrics (tool latency, outcomes, phases) in Prometheus text format.
+
+    Only to METRICS_ALLOWED_IPS or a bearer METRICS_TOKEN; anyone else gets a 404.
+    """
+    if not _may_scrape(request):
+        raise Http404
+    return HttpResponse(generate_latest(), content_type=CONTENT_TYPE_LATEST)
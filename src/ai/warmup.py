@@ -0,0 +1,184 @@
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Steps
+# -----------------------------
+# Each step returns a short description of what it warmed: graphs and clients
+# of the worker's own process, and its TMDB cache. Heavy modules are imported
+# inside the steps so the AppConfig hook stays cheap to import.
+def warm_graphs():
+    """Compile the supervisor graph and every sub-agent graph the router can pick."""
+    from ai import registry
+
+    registry.warm_up()
+    for name in registry.AGENT_BUILDERS:
+        registry.get_agent_graph(name)
+    return f"supervisor + {len(registry.AGENT_BUILDERS)} agents"
+
+
+def open_connections():
+    """Connect every database alias and create the shared LLM and Permit clients."""
+    from ai.llms import get_async_http_client, get_http_client
+    from my_permit import get_permit_client
+
+    for alias in connections:
+        connections[alias].ensure_connection()
+    get_http_client()
+    get_async_http_client()
+    get_permit_client()
+    return f"databases: {', '.join(connections)}"
+
+
+def warm_tmdb(movies=None):
+    """Cache details of TMDB's currently popular movies."""
+    from tmdb.client import movies_details, popular_movies
+
+    movies = settings.AGENT_WARMUP_TMDB_MOVIES if movies is None else movies
+    if not movies:
+        return "0 movies"
+    movie_ids = [movie["id"] for movie in popular_movies().get("results", [])[:movies]]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(movies_details, movie_ids))
+    return f"{len(movie_ids)} movies"
+
+
+STEPS = {
+    "graphs": warm_graphs,
+    "connections": open_connections,
+    "tmdb": warm_tmdb,
+}
+
+
+# -----------------------------
+# Running
+# -----------------------------
+def run_warmup(steps=None):
+    """
+    Run warm-up steps in order; a failing step is logged and the rest still run.
+
+    Args:
+        steps (list, optional): Step names from STEPS (default: all).
+
+    Returns:
+        list[tuple]: (step, seconds, detail, error) per step; error is None on success.
+    """
+    results = []
+    for name in steps or STEPS:
+        start = time.perf_counter()
+        detail, error = None, None
+        try:
+            detail = STEPS[name]()
+        except Exception as e:
+            logger.exception("Warm-up step %s failed", name)
+            error = e
+        elapsed = time.perf_counter() - start
+        logger.info("Warm-up %s: %.1f ms %s", name, elapsed * 1000, detail or f"failed: {error}")
+        results.append((name, elapsed, detail, error))
+    return results
+
+
+def report_lines(results):
+    """
+    Yield (line, ok) for each step of run_warmup() results, then the total.
+    """
+    for name, seconds, detail, error in results:
+        if error is None:
+            yield f"{name:<12} {seconds * 1000:>9.1f} ms  {detail}", True
+        else:
+            yield f"{name:<12} {seconds * 1000:>9.1f} ms  failed: {error}", False
+    total = sum(seconds for _, seconds, _, _ in results)
+    yield f"{'total':<12} {total * 1000:>9.1f} ms", True
+
+
+def _run_and_close(results):
+    try:
+        results.extend(run_warmup())
+    finally:
+        # This thread's DB connections would otherwise stay open until exit
+        connections.close_all()
+
+
+# -----------------------------
+# Before serving
+# -----------------------------
+def warm_up_on_start(stream=None):
+    """
+    With AGENT_WARMUP_ON_START, warm up before this process serves anything.
+
+    Called from movies.wsgi and movies.asgi once the application is built, so
+    the server only hands the worker requests after warm-up has finished.
+    The steps run on their own thread, since an ASGI server may import the
+    application from inside its event loop, and the per-step timings are
+    written to `stream` (default: stderr, where the server logs go).
+
+    Returns:
+        list[tuple]: run_warmup() results; empty when the setting is off.
+    """
+    if not settings.AGENT_WARMUP_ON_START:
+        return []
+
+    results = []
+    thread = threading.Thread(target=_run_and_close, args=(results,), name="ai-warmup")
+    thread.start()
+    thread.join()
+
+    stream = stream or sys.stderr
+    stream.write("Warm-up:\n")
+    for line, _ in report_lines(results):
+        stream.write(f"  {line}\n")
+    return results
+
+
+# -----------------------------
+# Lazy fallback
+# -----------------------------
+def start_background_warmup():
+    """Warm up in a daemon thread so the worker can start serving right away."""
+    thread = threading.Thread(target=_run_and_close, args=([],), name="ai-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+WARMUP_HOOK_UID = "ai.warmup.first_request"
+
+_hook_lock = threading.Lock()
+_hook_fired = False
+
+
+def _warm_on_first_request(sender, **kwargs):
+    global _hook_fired
+
+    with _hook_lock:
+        if _hook_fired:
+            return
+        _hook_fired = True
+    request_started.disconnect(dispatch_uid=WARMUP_HOOK_UID)
+    start_background_warmup()
+
+
+def install_warmup_hook():
+    """
+    Warm up in the background when this process serves its first request
+    (AGENT_WARMUP_ON_FIRST_REQUEST).
+
+    For servers that can't warm up before serving; that first request still
+    pays the cold start. Management commands, the job runner and shells never
+    serve one, so they never warm up.
+    """
+    global _hook_fired
+
+    with _hook_lock:
+        _hook_fired = False
+    request_started.connect(_warm_on_first_request, dispatch_uid=WARMUP_HOOK_UID)
@@ -1,13 +1,102 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from ai.signals import invalidate_documents
+from movies.db_routers import pin_to_primary, replica_reads
 
 # Register your models here.
-from .models import Directory
+from .models import SEARCH_CONFIG, SEARCH_VECTOR, Directory
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the row count from the Postgres planner statistics
+    instead of running a full COUNT(*) on large, unfiltered tables.
+    """
+
+    # Below this many rows an exact COUNT(*) is cheap enough
+    exact_count_threshold = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+
+        if connection.vendor != "postgresql" or queryset.query.where:
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 until the table has been vacuumed/analyzed once
+        estimate = row[0] if row else -1
+        if estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+
+@admin.register(Directory)
+class DirectoryAdmin(admin.ModelAdmin):
+    list_display = ("id", "title", "owner", "active", "active_at", "created_at")
+    list_filter = ("active",)
+    list_select_related = ("owner",)
+    # Used as is (icontains) off Postgres; Postgres searches SEARCH_VECTOR instead
+    search_fields = ("title", "content")
+    search_help_text = "Full-text search over title and content."
+    ordering = ("-created_at",)
+    raw_id_fields = ("owner",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != "GET":
+            # POSTs run bulk actions and list_editable saves
+            return super().changelist_view(request, extra_context)
+        with replica_reads(request.user.pk):
+            response = super().changelist_view(request, extra_context)
+            # TemplateResponse runs its queries while rendering
+            if hasattr(response, "render"):
+                response.render()
+        return response
+
+    # The editor should see their own edits on the (replica-backed) changelist.
+    # Saves invalidate the owner's memoized tool results through post_save;
+    # deletes do it here (see ai.signals)
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        pin_to_primary(request.user.pk)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        pin_to_primary(request.user.pk)
+        invalidate_documents([obj.owner_id])
+
+    def delete_queryset(self, request, queryset):
+        owner_ids = list(queryset.values_list("owner_id", flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        pin_to_primary(request.user.pk)
+        invalidate_documents(owner_ids)
+
+    def get_queryset(self, request):
+        # content can be large and is never shown on the changelist
+        return super().get_queryset(request).defer("content")
 
-admin.site.register(Directory)
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
 
+        if connections[queryset.db].vendor != "postgresql":
+            return super().get_search_results(request, queryset, search_term)
 
-# @admin.register(Directory)
-# class DirectoryAdmin(admin.ModelAdmin):
-#     list_display = ("id", "title", "owner", "active", "active_at", "created_at")
-#     list_filter = ("active", "created_at")
-#     search_fields = ("title", "content")
\ No newline at end of file
+        queryset = queryset.annotate(search=SEARCH_VECTOR).filter(
+            search=SearchQuery(search_term, config=SEARCH_CONFIG, search_type="websearch")
+        )
+        return queryset, False
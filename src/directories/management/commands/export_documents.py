@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from directories.models import Directory
+from directories.transfer import FORMATS, RowWriter, export_rows, guess_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream documents to an NDJSON or CSV file (or stdout) through a server-side "
+        "cursor, so memory stays flat however many rows are exported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to write, or - for stdout.")
+        parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension, else ndjson.")
+        parser.add_argument("--owner", help="Only export this user's documents (username).")
+        parser.add_argument("--active-only", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched from the cursor at a time.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+
+        queryset = Directory.objects.using(options["database"])
+        if options["owner"]:
+            queryset = queryset.filter(owner__username=options["owner"])
+        if options["active_only"]:
+            queryset = queryset.filter(active=True)
+
+        to_stdout = path == "-"
+        stream = sys.stdout if to_stdout else open(path, "w", encoding="utf-8", newline="")
+        # The report goes to stderr when the rows themselves go to stdout
+        report = self.stderr if to_stdout else self.stdout
+
+        start = time.perf_counter()
+        exported = 0
+        try:
+            writer = RowWriter(stream, fmt)
+            for row in export_rows(queryset, max(options["chunk_size"], 1)):
+                writer.write(row)
+                exported += 1
+        finally:
+            if not to_stdout:
+                stream.close()
+
+        elapsed = time.perf_counter() - start
+        size = "" if to_stdout else f", {os.path.getsize(path) / 1e6:,.1f} MB"
+        report.write(self.style.SUCCESS(
+            f"Exported {exported:,} documents in {elapsed:.2f} s "
+            f"({exported / elapsed if elapsed else 0:,.0f} rows/s, {fmt}{size})"
+        ))
@@ -0,0 +1,64 @@
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ai.signals import invalidate_documents
+from directories.transfer import FORMATS, RowCleaner, bulk_create_rows, copy_rows, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream documents from an NDJSON or CSV file (or stdin) into Directory with "
+        "constant memory, using Postgres COPY or batched bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension, else ndjson.")
+        parser.add_argument("--owner", help="Username for rows without an owner/owner_id column.")
+        parser.add_argument("--method", choices=["copy", "bulk"], help="Default: copy on Postgres, bulk elsewhere.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+        using = options["database"]
+        method = options["method"] or ("copy" if connections[using].vendor == "postgresql" else "bulk")
+        if method == "copy" and connections[using].vendor != "postgresql":
+            raise CommandError("--method copy needs a Postgres database")
+
+        default_owner_id = None
+        if options["owner"]:
+            default_owner_id = get_user_model().objects.filter(username=options["owner"]).values_list("id", flat=True).first()
+            if default_owner_id is None:
+                raise CommandError(f"Unknown user: {options['owner']}")
+
+        cleaner = RowCleaner(default_owner_id)
+        load = copy_rows if method == "copy" else bulk_create_rows
+
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        start = time.perf_counter()
+        imported = 0
+        try:
+            rows = (row for row in map(cleaner.clean, read_rows(stream, fmt)) if row is not None)
+            for count in load(rows, max(options["batch_size"], 1), using=using):
+                imported += count
+                if options["verbosity"] > 1:
+                    elapsed = time.perf_counter() - start
+                    self.stdout.write(f"  {imported:,} rows ({imported / elapsed:,.0f} rows/s)")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            # COPY and bulk_create send no post_save; rows of a failed run may be in too
+            invalidate_documents(cleaner.owners)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported:,} documents in {elapsed:.2f} s "
+            f"({imported / elapsed if elapsed else 0:,.0f} rows/s, {method}, {fmt}); "
+            f"skipped {cleaner.skipped:,} rows without a title or known owner"
+        ))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:03
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY on Postgres, so the table stays writable while a
+    large one is indexed. Elsewhere a plain CREATE INDEX, or nothing for
+    Postgres-only indexes (postgres_only=True).
+    """
+
+    def __init__(self, model_name, index, postgres_only=False):
+        super().__init__(model_name, index)
+        self.postgres_only = postgres_only
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.postgres_only:
+            kwargs["postgres_only"] = True
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        elif not self.postgres_only:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        elif not self.postgres_only:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('directories', '0004_alter_directory_active_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='directory',
+            index=models.Index(fields=['-created_at'], name='directory_created_at_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='directory',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', 'content', config='english'), name='directory_search_idx'),
+            postgres_only=True,
+        ),
+    ]
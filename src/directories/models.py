@@ -1,10 +1,16 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.utils import timezone
 
 
 User = settings.AUTH_USER_MODEL
 
+# Full-text search expression; queries must use it verbatim to hit the GIN index
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR = SearchVector("title", "content", config=SEARCH_CONFIG)
+
 
 class Directory(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -15,6 +21,12 @@ class Directory(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="directory_created_at_idx"),
+            GinIndex(SEARCH_VECTOR, name="directory_search_idx"),
+        ]
+
     # def save(self, *args, **kwargs):
     #     if self.active and self.active_at is None:
     #         self.active_at = timezone.now()
@@ -0,0 +1,196 @@
+import csv
+import json
+import sys
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Directory
+
+
+# Column order of exported files; import accepts the same columns (id is ignored)
+EXPORT_FIELDS = ("id", "owner", "title", "content", "active", "created_at", "updated_at")
+FORMATS = ("ndjson", "csv")
+
+COPY_COLUMNS = ("owner_id", "title", "content", "active", "active_at", "created_at", "updated_at")
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+
+# Document content can be far longer than csv's default 128 KB field limit
+csv.field_size_limit(sys.maxsize)
+
+
+def guess_format(path, default="ndjson"):
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return default
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def read_rows(stream, fmt):
+    """Yield one dict per NDJSON line or CSV record, without loading the whole file."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _to_bool(value, default=True):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _to_datetime(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    parsed = parse_datetime(str(value))
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class RowCleaner:
+    """
+    Turn file rows into COPY_COLUMNS tuples, resolving `owner` (username) or
+    `owner_id` and applying the same defaults as Directory.save().
+
+    Args:
+        default_owner_id (int, optional): Used for rows without an owner.
+    """
+
+    def __init__(self, default_owner_id=None):
+        self.default_owner_id = default_owner_id
+        self.title_length = Directory._meta.get_field("title").max_length
+        self._owner_ids = {}
+        self.skipped = 0
+        # Owners of the rows returned so far
+        self.owners = set()
+
+    def owner_id(self, row):
+        # Looked up once per distinct owner; unknown owners resolve to None
+        if row.get("owner_id") not in (None, ""):
+            lookup = {"id": int(row["owner_id"])}
+        elif row.get("owner"):
+            lookup = {"username": row["owner"]}
+        else:
+            return self.default_owner_id
+
+        key = tuple(lookup.items())
+        if key not in self._owner_ids:
+            self._owner_ids[key] = get_user_model().objects.filter(**lookup).values_list("id", flat=True).first()
+        return self._owner_ids[key]
+
+    def clean(self, row):
+        """Return the row as a COPY_COLUMNS tuple, or None (counted in `skipped`) if unusable."""
+        owner_id = self.owner_id(row)
+        title = (row.get("title") or "").strip()
+        if owner_id is None or not title:
+            self.skipped += 1
+            return None
+
+        self.owners.add(owner_id)
+        now = timezone.now()
+        active = _to_bool(row.get("active"))
+        created_at = _to_datetime(row.get("created_at")) or now
+        return (
+            owner_id,
+            title[:self.title_length],
+            row.get("content") or "",
+            active,
+            created_at if active else None,
+            created_at,
+            _to_datetime(row.get("updated_at")) or now,
+        )
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# -----------------------------
+# Ingest
+# -----------------------------
+def copy_rows(rows, batch_size, using="default"):
+    """
+    Load cleaned rows with Postgres COPY, one transaction per batch.
+
+    Yields:
+        int: Rows written by each batch.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(Directory._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(column) for column in COPY_COLUMNS)
+    for batch in _batches(rows, batch_size):
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            # CursorWrapper.cursor is the psycopg cursor, which streams COPY rows
+            with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for row in batch:
+                    copy.write_row(row)
+        yield len(batch)
+
+
+def bulk_create_rows(rows, batch_size, using="default"):
+    """
+    Load cleaned rows with bulk_create (any database). created_at is always
+    the import time here, because the field is auto_now_add.
+
+    Yields:
+        int: Rows written by each batch.
+    """
+    for batch in _batches(rows, batch_size):
+        Directory.objects.using(using).bulk_create(
+            [Directory(**dict(zip(COPY_COLUMNS, row))) for row in batch],
+            batch_size=batch_size,
+        )
+        yield len(batch)
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def export_rows(queryset, chunk_size):
+    """Yield EXPORT_FIELDS dicts from a server-side cursor, `chunk_size` rows per fetch."""
+    values = queryset.order_by("id").values_list(
+        "id", "owner__username", "title", "content", "active", "created_at", "updated_at"
+    )
+    for row in values.iterator(chunk_size=chunk_size):
+        yield dict(zip(EXPORT_FIELDS, row))
+
+
+class RowWriter:
+    """Write export dicts as NDJSON lines or CSV records."""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self._csv = csv.writer(stream)
+            self._csv.writerow(EXPORT_FIELDS)
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self._csv.writerow(
+                row[field].isoformat() if isinstance(row[field], datetime) else row[field] for field in EXPORT_FIELDS
+            )
+            return
+        self.stream.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
@@ -0,0 +1,97 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+REPLICA = "replica"
+
+# Alias that reads in the current context go to; None means the primary
+_read_alias = ContextVar("db_read_alias", default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f"db:pin-primary:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """
+    Send `user_id`'s replica reads to the primary for REPLICA_STICKY_SECONDS,
+    so a user who just wrote reads their own write despite replication lag.
+    The pin is visible to other workers only if REPLICA_CACHE_ALIAS is a
+    shared cache, which the ai.E001 system check requires.
+    """
+    if replica_configured() and user_id is not None:
+        caches[settings.REPLICA_CACHE_ALIAS].set(_pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+async def apin_to_primary(user_id):
+    """pin_to_primary() for async code; the shared cache may be the database."""
+    if replica_configured() and user_id is not None:
+        await caches[settings.REPLICA_CACHE_ALIAS].aset(_pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user_id):
+    return user_id is not None and bool(caches[settings.REPLICA_CACHE_ALIAS].get(_pin_key(user_id)))
+
+
+async def ais_pinned(user_id):
+    return user_id is not None and bool(await caches[settings.REPLICA_CACHE_ALIAS].aget(_pin_key(user_id)))
+
+
+@contextmanager
+def _reads_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield alias or "default"
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def replica_reads(user_id=None):
+    """
+    Route reads in the block to the replica, unless there is none or `user_id`
+    is pinned to the primary. Only use it around code that doesn't write, or
+    whose reads may be slightly stale.
+
+    Yields:
+        str: The database alias reads will use.
+    """
+    with _reads_from(REPLICA if replica_configured() and not is_pinned(user_id) else None) as alias:
+        yield alias
+
+
+@asynccontextmanager
+async def areplica_reads(user_id=None):
+    """replica_reads() for async code."""
+    with _reads_from(REPLICA if replica_configured() and not await ais_pinned(user_id) else None) as alias:
+        yield alias
+
+
+class ReplicaRouter:
+    """
+    Reads go to the primary unless the caller opted in with replica_reads();
+    writes always use the primary.
+
+    Migrations are left to `migrate --database`: a real replica gets its schema
+    through replication, a second local database can be migrated directly.
+    """
+
+    def db_for_read(self, model, **hints):
+        # The database cache holds replica pins; it must read its own writes
+        if model._meta.app_label == "django_cache":
+            return "default"
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
@@ -13,7 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
-from decouple import config
+from decouple import Csv, config
 
 load_dotenv()
 
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'directories',
+    'ai',
 ]
 
 MIDDLEWARE = [
@@ -92,6 +93,64 @@ DATABASES = {
     }
 }
 
+# Optional read replica (movies.db_routers); only code wrapped in replica_reads()
+# uses it. Unset DB_REPLICA_* values fall back to the primary's.
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('DB_REPLICA_NAME', os.getenv('DB_NAME')),
+        'USER': os.getenv('DB_REPLICA_USER', os.getenv('DB_USER')),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', os.getenv('DB_PASSWORD')),
+        'HOST': os.getenv('DB_REPLICA_HOST', os.getenv('DB_HOST')),
+        'PORT': os.getenv('DB_REPLICA_PORT', os.getenv('DB_PORT')),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['movies.db_routers.ReplicaRouter']
+
+# Connection pooling: each process keeps a psycopg pool per alias and requests,
+# tool calls and job runs borrow from it instead of connecting every time.
+# Connections are health-checked before use and replaced after
+# DB_POOL_MAX_LIFETIME seconds. Off by default: the pool needs psycopg-pool and
+# a psycopg that can load libpq (the system library, or `psycopg[binary]`).
+# Without it there is a connection per request (or per DB_CONN_MAX_AGE seconds).
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+for database in DATABASES.values():
+    database['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL:
+        database['OPTIONS'] = {
+            'pool': {
+                'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+                'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800.0, cast=float),
+                'max_idle': config('DB_POOL_MAX_IDLE', default=300.0, cast=float),
+            },
+        }
+    else:
+        database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=0, cast=int)
+
+# Caches: 'default' is per process, for data each worker may keep its own copy
+# of. 'shared' holds state every worker and the job runner must see (replica
+# pins, tool memo invalidation); it needs a cross-process backend: the
+# database (run `manage.py createcachetable`) or e.g. Redis through
+# SHARED_CACHE_BACKEND/LOCATION
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': config('SHARED_CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('SHARED_CACHE_LOCATION', default='django_cache'),
+    },
+}
+
+# After a write, a user's replica reads go to the primary for this long
+# (read-your-writes). The pin is kept in REPLICA_CACHE_ALIAS, which must be a
+# shared cache so a write in one worker pins reads in all of them (ai.checks)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+REPLICA_CACHE_ALIAS = config('REPLICA_CACHE_ALIAS', default='shared')
+
 
 
 # Password validation
@@ -140,7 +199,126 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 OPENAI_API_KEY = config('OPENAI_API_KEY', default=None)
 TMDB_API_KEY = config('TMDB_API_KEY', default=None)
+TMDB_API_BASE_URL = config('TMDB_API_BASE_URL', default="https://api.themoviedb.org/3")
 # print(OPENAI_API_KEY)
 PERMIT_API_KEY = config('PERMIT_API_KEY',default=None)
 
-PERMIT_PDP_URL = config('PERMIT_PDP_URL', default="https://cloudpdp.api.permit.io")
\ No newline at end of file
+PERMIT_PDP_URL = config('PERMIT_PDP_URL', default="https://cloudpdp.api.permit.io")
+
+# LLM HTTP connection pool (shared by every ChatOpenAI client in the process;
+# the async one keeps a pool per event loop)
+LLM_HTTP_MAX_CONNECTIONS = config('LLM_HTTP_MAX_CONNECTIONS', default=20, cast=int)
+LLM_HTTP_MAX_KEEPALIVE = config('LLM_HTTP_MAX_KEEPALIVE', default=10, cast=int)
+LLM_HTTP_KEEPALIVE_EXPIRY = config('LLM_HTTP_KEEPALIVE_EXPIRY', default=30.0, cast=float)
+LLM_HTTP_TIMEOUT = config('LLM_HTTP_TIMEOUT', default=60.0, cast=float)
+LLM_HTTP_CONNECT_TIMEOUT = config('LLM_HTTP_CONNECT_TIMEOUT', default=5.0, cast=float)
+
+# LLM response cache (ai.cache.DatabaseLLMCache)
+LLM_CACHE_ENABLED = config('LLM_CACHE_ENABLED', default=False, cast=bool)
+LLM_CACHE_DATABASE = config('LLM_CACHE_DATABASE', default='default')
+LLM_CACHE_TTL = config('LLM_CACHE_TTL', default=86400, cast=int)
+LLM_CACHE_MAX_ENTRIES = config('LLM_CACHE_MAX_ENTRIES', default=10000, cast=int)
+LLM_CACHE_SEMANTIC = config('LLM_CACHE_SEMANTIC', default=False, cast=bool)
+LLM_CACHE_SIMILARITY_THRESHOLD = config('LLM_CACHE_SIMILARITY_THRESHOLD', default=0.95, cast=float)
+LLM_CACHE_EMBEDDING_MODEL = config('LLM_CACHE_EMBEDDING_MODEL', default='text-embedding-3-small')
+
+# Agent checkpoints (ai.checkpointer.DjangoCheckpointSaver)
+CHECKPOINT_DATABASE = config('CHECKPOINT_DATABASE', default='default')
+CHECKPOINT_KEEP_LAST = config('CHECKPOINT_KEEP_LAST', default=20, cast=int)
+CHECKPOINT_IDLE_DAYS = config('CHECKPOINT_IDLE_DAYS', default=30, cast=int)
+
+# Read-only tool results reused within a thread (ai.memo), kept in its
+# checkpointed state; writes drop them early by leaving a mark in
+# TOOL_MEMO_CACHE_ALIAS, which must be shared between processes (memoization
+# stays off otherwise). 0 disables memoization
+TOOL_MEMO_TTL = config('TOOL_MEMO_TTL', default=600, cast=int)
+TOOL_MEMO_CACHE_ALIAS = config('TOOL_MEMO_CACHE_ALIAS', default='shared')
+TOOL_MEMO_MAX_ENTRIES = config('TOOL_MEMO_MAX_ENTRIES', default=50, cast=int)
+
+# Per-call token budget for agent/supervisor history (0 disables trimming)
+HISTORY_TOKEN_BUDGET = config('HISTORY_TOKEN_BUDGET', default=6000, cast=int)
+HISTORY_TOOL_OUTPUT_CHARS = config('HISTORY_TOOL_OUTPUT_CHARS', default=500, cast=int)
+# Rolling summaries of trimmed history, per (agent, thread); shared so every
+# worker reuses a summary instead of paying for a new one
+HISTORY_SUMMARY_CACHE_ALIAS = config('HISTORY_SUMMARY_CACHE_ALIAS', default='shared')
+
+# Let the supervisor fan independent sub-tasks out to both agents concurrently
+SUPERVISOR_PARALLEL = config('SUPERVISOR_PARALLEL', default=False, cast=bool)
+
+# Admission control for agent runs (ai.scheduler); keep AGENT_RUN_MAX_CONCURRENT
+# below the DB connection limit and the OpenAI rate limit
+AGENT_RUN_MAX_CONCURRENT = config('AGENT_RUN_MAX_CONCURRENT', default=8, cast=int)
+AGENT_RUN_MAX_QUEUED = config('AGENT_RUN_MAX_QUEUED', default=64, cast=int)
+AGENT_RUN_MAX_QUEUED_PER_USER = config('AGENT_RUN_MAX_QUEUED_PER_USER', default=4, cast=int)
+
+# Shrink tool results (field selection, truncation) before they reach the model (ai.compaction)
+TOOL_OUTPUT_COMPACTION = config('TOOL_OUTPUT_COMPACTION', default=True, cast=bool)
+
+# Span tracing of agent turns, tools, Permit and TMDB calls (movies.tracing); spans
+# are kept in memory and mirrored to OpenTelemetry when it is installed and bridged
+TRACING_ENABLED = config('TRACING_ENABLED', default=False, cast=bool)
+TRACING_OTEL_BRIDGE = config('TRACING_OTEL_BRIDGE', default=False, cast=bool)
+
+# Who may scrape /metrics (ai.views.metrics): clients at these addresses, or any
+# client sending "Authorization: Bearer <METRICS_TOKEN>" when a token is set.
+# Behind a proxy REMOTE_ADDR is the proxy's, so use the token there
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+METRICS_TOKEN = config('METRICS_TOKEN', default=None)
+
+# Permit decisions for tool calls are cached per (user, resource, action) in this
+# Django cache (ai.tools.secured); 0 disables caching
+PERMIT_CACHE_ALIAS = config('PERMIT_CACHE_ALIAS', default='default')
+PERMIT_CACHE_TTL = config('PERMIT_CACHE_TTL', default=60, cast=int)
+
+# Parsed TMDB search and movie-detail responses (tmdb.client); 0 disables caching
+TMDB_CACHE_ALIAS = config('TMDB_CACHE_ALIAS', default='default')
+TMDB_CACHE_TTL = config('TMDB_CACHE_TTL', default=3600, cast=int)
+
+# Circuit breakers (ai.circuit) around the Permit PDP and TMDB. After
+# *_CIRCUIT_FAILURES failed or slower-than-*_CIRCUIT_SLOW_CALL calls in a row,
+# calls fail fast for *_CIRCUIT_RESET_TIMEOUT seconds, then one probe call
+# decides whether to close the circuit. Meanwhile cached permission denials
+# and TMDB responses are served up to *_STALE_TTL seconds past expiry.
+PERMIT_PDP_TIMEOUT = config('PERMIT_PDP_TIMEOUT', default=5.0, cast=float)
+PERMIT_CIRCUIT_FAILURES = config('PERMIT_CIRCUIT_FAILURES', default=5, cast=int)
+PERMIT_CIRCUIT_SLOW_CALL = config('PERMIT_CIRCUIT_SLOW_CALL', default=2.0, cast=float)
+PERMIT_CIRCUIT_RESET_TIMEOUT = config('PERMIT_CIRCUIT_RESET_TIMEOUT', default=30.0, cast=float)
+PERMIT_STALE_TTL = config('PERMIT_STALE_TTL', default=300, cast=int)
+# Stale permission *grants* keep tools working through a PDP outage, but a user
+# whose access was revoked in the last PERMIT_CACHE_TTL + PERMIT_STALE_TTL
+# seconds can still act until Permit is back. Off by default: only stale
+# denials are served, and grants fail closed with the Permit error.
+PERMIT_STALE_GRANTS = config('PERMIT_STALE_GRANTS', default=False, cast=bool)
+TMDB_TIMEOUT = config('TMDB_TIMEOUT', default=5.0, cast=float)
+TMDB_CIRCUIT_FAILURES = config('TMDB_CIRCUIT_FAILURES', default=5, cast=int)
+TMDB_CIRCUIT_SLOW_CALL = config('TMDB_CIRCUIT_SLOW_CALL', default=3.0, cast=float)
+TMDB_CIRCUIT_RESET_TIMEOUT = config('TMDB_CIRCUIT_RESET_TIMEOUT', default=30.0, cast=float)
+TMDB_STALE_TTL = config('TMDB_STALE_TTL', default=86400, cast=int)
+
+# Speculative prefetch (tmdb.prefetch) of the top TMDB_PREFETCH_TOP_K search
+# results' details into the TMDB cache; 0 disables it. At most
+# TMDB_PREFETCH_MAX_PENDING are queued and TMDB_PREFETCH_RATE started per second
+TMDB_PREFETCH_TOP_K = config('TMDB_PREFETCH_TOP_K', default=0, cast=int)
+TMDB_PREFETCH_WORKERS = config('TMDB_PREFETCH_WORKERS', default=2, cast=int)
+TMDB_PREFETCH_MAX_PENDING = config('TMDB_PREFETCH_MAX_PENDING', default=10, cast=int)
+TMDB_PREFETCH_RATE = config('TMDB_PREFETCH_RATE', default=5.0, cast=float)
+
+# Warm-up of graphs, connections and the TMDB cache (ai.warmup). With
+# AGENT_WARMUP_ON_START, movies.wsgi/movies.asgi warm up each server process
+# before it accepts requests and print the time per step (`manage.py warmup`
+# reports the same). AGENT_WARMUP_ON_FIRST_REQUEST is a fallback for servers
+# that can't: warm-up starts in the background on the first request, which
+# still pays the cold start. Management commands and the job runner never warm up.
+AGENT_WARMUP_ON_START = config('AGENT_WARMUP_ON_START', default=False, cast=bool)
+AGENT_WARMUP_ON_FIRST_REQUEST = config('AGENT_WARMUP_ON_FIRST_REQUEST', default=False, cast=bool)
+AGENT_WARMUP_TMDB_MOVIES = config('AGENT_WARMUP_TMDB_MOVIES', default=20, cast=int)
+
+# Background job queue (ai.jobs, `manage.py run_jobs`). Workers refresh a running
+# job's heartbeat every JOB_HEARTBEAT_INTERVAL seconds; a job without one for
+# JOB_STALE_AFTER seconds is assumed lost and retried, so keep it a few beats long
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=1.0, cast=float)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+JOB_RETRY_DELAY = config('JOB_RETRY_DELAY', default=10.0, cast=float)
+JOB_HEARTBEAT_INTERVAL = config('JOB_HEARTBEAT_INTERVAL', default=30.0, cast=float)
+JOB_STALE_AFTER = config('JOB_STALE_AFTER', default=120, cast=int)
+JOB_DELETE_BATCH_SIZE = config('JOB_DELETE_BATCH_SIZE', default=1000, cast=int)
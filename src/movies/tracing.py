@@ -0,0 +1,208 @@
+"""
+Span tracing for the whole project (agent turns, tools, Permit, TMDB and ORM calls).
+
+It lives in the project package, like the database router, because the Permit
+and TMDB clients use it as well as the agents; the LangChain callback handler
+that opens agent and tool spans is in ai.instrumentation.
+"""
+import logging
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional: spans are mirrored to OpenTelemetry when it is installed
+    otel_trace = None
+
+
+logger = logging.getLogger(__name__)
+
+# Copied from parent to child so every span in a turn can be filtered by them
+PROPAGATED_ATTRIBUTES = ("thread_id", "user_id")
+
+
+# -----------------------------
+# Spans
+# -----------------------------
+class Span:
+    """
+    One timed operation, shaped like an OpenTelemetry span (hex trace/span ids,
+    nanosecond timestamps, attributes, events and an OK/ERROR status).
+    """
+
+    def __init__(self, tracer, name, parent=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = {key: parent.attributes[key] for key in PROPAGATED_ATTRIBUTES if parent and key in parent.attributes}
+        self.attributes.update({key: value for key, value in (attributes or {}).items() if value is not None})
+        self.events = []
+        self.status = "UNSET"
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self._otel_span = tracer._start_otel_span(self)
+
+    @property
+    def parent_span_id(self):
+        return self.parent.span_id if self.parent else None
+
+    @property
+    def duration_ms(self):
+        return ((self.end_time or time.time_ns()) - self.start_time) / 1e6
+
+    def set_attribute(self, key, value):
+        if value is not None:
+            self.attributes[key] = value
+            if self._otel_span is not None:
+                self._otel_span.set_attribute(key, value)
+
+    def record_exception(self, exception):
+        self.status = "ERROR"
+        self.events.append({
+            "name": "exception",
+            "time": time.time_ns(),
+            "attributes": {"exception.type": type(exception).__name__, "exception.message": str(exception)},
+        })
+        if self._otel_span is not None:
+            self._otel_span.record_exception(exception)
+            self._otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+
+    def end(self):
+        if self.end_time is not None:
+            return
+        self.end_time = time.time_ns()
+        if self.status == "UNSET":
+            self.status = "OK"
+        if self._otel_span is not None:
+            self._otel_span.end()
+        self.tracer._export(self)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "status": self.status,
+            "attributes": dict(self.attributes),
+            "events": list(self.events),
+        }
+
+
+class InMemorySpanExporter:
+    """Keeps the most recent finished spans; meant for tests and local debugging."""
+
+    def __init__(self, max_spans=10000):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    def get_finished_spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+_current_span = ContextVar("ai_current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, exporters=(), otel_bridge=False):
+        self.exporters = list(exporters)
+        self._otel = otel_trace.get_tracer("ai") if otel_bridge and otel_trace else None
+
+    def _start_otel_span(self, span):
+        if self._otel is None:
+            return None
+        parent = span.parent._otel_span if span.parent else None
+        context = otel_trace.set_span_in_context(parent) if parent is not None else None
+        return self._otel.start_span(span.name, context=context, attributes=span.attributes)
+
+    def _export(self, span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                logger.exception("Span exporter %r failed", exporter)
+
+    def start_span(self, name, parent=None, attributes=None):
+        return Span(self, name, parent=parent, attributes=attributes)
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = self.start_span(name, parent=_current_span.get(), attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+# Always available so tests and the shell can inspect recent spans
+memory_exporter = InMemorySpanExporter()
+
+
+def get_tracer():
+    """Return the process-wide tracer, or None when TRACING_ENABLED is off."""
+    global _tracer
+
+    if not settings.TRACING_ENABLED:
+        return None
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(exporters=[memory_exporter], otel_bridge=settings.TRACING_OTEL_BRIDGE)
+    return _tracer
+
+
+def current_span():
+    return _current_span.get()
+
+
+def set_current_span(span):
+    """Make `span` the current span; returns a token for reset_current_span()."""
+    return _current_span.set(span)
+
+
+def reset_current_span(token):
+    _current_span.reset(token)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Trace the block as a child of the current span (no-op when tracing is off).
+
+    Yields:
+        Span | None: The open span.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movies.settings')
 
 application = get_wsgi_application()
+
+# Warm up before the server hands this process any request (AGENT_WARMUP_ON_START)
+from ai.warmup import warm_up_on_start  # noqa: E402
+
+warm_up_on_start()
@@ -1,3 +1,11 @@
-from .client import permit_client
+# The Permit SDK takes about a second to import, so the client module (and the
+# client itself) is only loaded when something asks for it
+__all__ = ["get_permit_client", "permit_client"]
 
-__all__ = ["permit_client"]
\ No newline at end of file
+
+def __getattr__(name):
+    if name in __all__:
+        from . import client
+
+        return getattr(client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,91 @@
+import asyncio
+import threading
+
 from django.conf import settings
-from permit import Permit
-def get_permit_client():
+from permit import Permit, PermitConnectionError
+
+from ai.circuit import get_breaker
+from ai.metrics import PERMISSION, phase
+from movies import tracing
+
+
+def get_permit_breaker():
+    """The process-wide PDP breaker, configured by the PERMIT_CIRCUIT_* settings."""
+    return get_breaker(
+        "permit",
+        failure_threshold=settings.PERMIT_CIRCUIT_FAILURES,
+        slow_call_seconds=settings.PERMIT_CIRCUIT_SLOW_CALL,
+        reset_timeout=settings.PERMIT_CIRCUIT_RESET_TIMEOUT,
+    )
+
+
+async def _pdp_call(awaitable):
+    # The SDK truncates its own pdp_timeout to whole seconds and lets the
+    # resulting TimeoutError escape unwrapped, so the limit is enforced here
+    try:
+        return await asyncio.wait_for(awaitable, settings.PERMIT_PDP_TIMEOUT)
+    except TimeoutError as e:
+        raise PermitConnectionError(f"PDP did not answer within {settings.PERMIT_PDP_TIMEOUT} s") from e
+
+
+class InstrumentedPermit(Permit):
+    """
+    Permit client whose checks are timed (ai.metrics), traced (movies.tracing) and
+    go through the "permit" circuit breaker (ai.circuit), so an unhealthy PDP
+    makes checks fail fast with CircuitOpenError.
+    """
+
+    async def check(self, user, action, resource, context=None):
+        with (
+            get_permit_breaker().guard(),
+            tracing.span("permit.check", action=action, resource=str(resource)) as span,
+            phase(PERMISSION),
+        ):
+            allowed = await _pdp_call(super().check(user, action, resource, context))
+            if span is not None:
+                span.set_attribute("allowed", allowed)
+        return allowed
+
+    async def bulk_check(self, checks, context=None):
+        with get_permit_breaker().guard(), tracing.span("permit.bulk_check", checks=len(checks)), phase(PERMISSION):
+            return await _pdp_call(super().bulk_check(checks, context))
+
+
+def create_permit_client():
     pdp_url = settings.PERMIT_PDP_URL
     api_key = settings.PERMIT_API_KEY
     if not api_key:
         raise ValueError("PERMIT_API_KEY is not set in settings.")
-    return Permit(
+    return InstrumentedPermit(
         pdp=pdp_url, 
         token=api_key
     )
 
-permit_client = get_permit_client()
 
+_permit_client = None
+_permit_client_lock = threading.Lock()
+
+
+def get_permit_client():
+    """Return the process-wide Permit client, created from settings on first use."""
+    global _permit_client
+
+    if _permit_client is None:
+        with _permit_client_lock:
+            if _permit_client is None:
+                _permit_client = create_permit_client()
+    return _permit_client
+
+
+def reset_permit_client():
+    """Drop the shared client so the next use reads PERMIT_* settings again."""
+    global _permit_client
+
+    with _permit_client_lock:
+        _permit_client = None
+
+
+def __getattr__(name):
+    if name == "permit_client":
+        return get_permit_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,15 @@
 # tmdb/client.py  (or wherever your TMDB functions live)
 
+import hashlib
+
 import requests
 from django.conf import settings
+from django.core.cache import caches
+
+from ai.circuit import ServiceUnavailable, StaleCache, get_breaker
+from ai.metrics import HTTP, STALE_SERVED, phase
+from movies import tracing
+from tmdb import prefetch
 
 def get_header():
     return {
@@ -10,29 +18,119 @@ def get_header():
     }
 
 def search_movie(query: str, page: int = 1, raw: bool = False):
-    url = "https://api.themoviedb.org/3/search/movie"
+    url = f"{settings.TMDB_API_BASE_URL}/search/movie"
     params = {
         "query": query,
         "page": page,
         "include_adult": False,
         "language": "en-US"
     }
-    headers = get_header()
-    response = requests.get(url=url, headers=headers, params=params)  # Fixed: param → params
-
-    if raw:
-        return response
-    return response.json()
+    return _cached_get(_search_key(query, page), url, params, raw, "tmdb.search_movie", query=query, page=page)
 
 def movies_details(movie_id: int, raw: bool = False):
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}"
+    if not raw:
+        # Joins a running prefetch (tmdb.prefetch) rather than fetching twice
+        prefetch.claim(movie_id)
+    return fetch_details(movie_id, raw)
+
+def fetch_details(movie_id, raw=False):
+    url = f"{settings.TMDB_API_BASE_URL}/movie/{movie_id}"
     params = {
         "include_adult": False,
         "language": "en-US"
     }
-    headers = get_header()
-    response = requests.get(url=url, headers=headers, params=params)
+    return _cached_get(_details_key(movie_id), url, params, raw, "tmdb.movie_details", movie_id=movie_id)
+
+def popular_movies(page: int = 1, raw: bool = False):
+    url = f"{settings.TMDB_API_BASE_URL}/movie/popular"
+    params = {
+        "page": page,
+        "language": "en-US"
+    }
+    response = _get(url, params, "tmdb.popular_movies", page=page)
+    if raw:
+        return response
+    return response.json()
+
+
+# -----------------------------
+# Requests
+# -----------------------------
+# Every request goes through the "tmdb" circuit breaker (ai.circuit) with a
+# TMDB_TIMEOUT limit. Timeouts, connection errors, 429 and 5xx responses count
+# as failures and raise ServiceUnavailable; so does calling while the circuit is open.
+def get_tmdb_breaker():
+    """The process-wide TMDB breaker, configured by the TMDB_CIRCUIT_* settings."""
+    return get_breaker(
+        "tmdb",
+        failure_threshold=settings.TMDB_CIRCUIT_FAILURES,
+        slow_call_seconds=settings.TMDB_CIRCUIT_SLOW_CALL,
+        reset_timeout=settings.TMDB_CIRCUIT_RESET_TIMEOUT,
+    )
+
+def _get(url, params, span_name, **attributes):
+    with get_tmdb_breaker().guard(), tracing.span(span_name, **attributes) as span, phase(HTTP):
+        try:
+            response = requests.get(url=url, headers=get_header(), params=params, timeout=settings.TMDB_TIMEOUT)
+        except requests.RequestException as e:
+            raise ServiceUnavailable("tmdb", f"{type(e).__name__}: {e}") from e
+        if span is not None:
+            span.set_attribute("http.status_code", response.status_code)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise ServiceUnavailable("tmdb", f"HTTP {response.status_code}")
+    return response
+
+def _cached_get(key, url, params, raw, span_name, **attributes):
+    if not raw:
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+    try:
+        response = _get(url, params, span_name, **attributes)
+    except ServiceUnavailable:
+        # Movie metadata rarely changes, so an expired copy beats an error
+        stale = None if raw else _cache_get(key, stale=True)
+        if stale is None:
+            raise
+        STALE_SERVED.labels("tmdb").inc()
+        return stale
 
     if raw:
         return response
-    return response.json()
\ No newline at end of file
+    return _cache_response(key, response)
+
+
+# -----------------------------
+# Response cache
+# -----------------------------
+# Parsed (raw=False) responses are fresh for TMDB_CACHE_TTL seconds and kept
+# TMDB_STALE_TTL seconds longer for when TMDB is down; error responses are never cached.
+def _search_key(query, page):
+    digest = hashlib.md5(query.strip().lower().encode()).hexdigest()
+    return f"tmdb:search:{digest}:{page}"
+
+def _details_key(movie_id):
+    return f"tmdb:movie:{movie_id}"
+
+def get_cache():
+    """StaleCache holding TMDB responses, or None when TMDB_CACHE_TTL is 0."""
+    if not settings.TMDB_CACHE_TTL:
+        return None
+    return StaleCache(caches[settings.TMDB_CACHE_ALIAS], settings.TMDB_CACHE_TTL, settings.TMDB_STALE_TTL)
+
+def _cache_get(key, stale=False):
+    cache = get_cache()
+    if cache is None:
+        return None
+    return cache.get_stale(key) if stale else cache.get(key)
+
+def is_details_cached(movie_id):
+    """Whether fresh details of `movie_id` are in the cache."""
+    return _cache_get(_details_key(movie_id)) is not None
+
+def _cache_response(key, response):
+    data = response.json()
+    cache = get_cache()
+    if cache is not None and response.ok:
+        cache.set(key, data)
+    return data
@@ -0,0 +1,201 @@
+"""
+Speculative prefetch of movie details after a search.
+
+After search_movies the agent nearly always asks for the details of one of the
+top results. prefetch_details() fetches those into the TMDB cache on a small
+background pool, so the follow-up get_movie_details is a cache hit instead of
+another serial round trip. It is best effort and bounded:
+
+- at most TMDB_PREFETCH_MAX_PENDING prefetches are queued or running, and a
+  token bucket starts at most TMDB_PREFETCH_RATE per second; extra ones are dropped;
+- nothing is prefetched while the TMDB circuit is not closed;
+- looking up a movie whose prefetch is still queued cancels the prefetch and
+  fetches it directly; one already running is waited for instead.
+
+agent_prefetch_hits_total divided by agent_prefetch_total{outcome="fetched"} is
+the share of extra upstream calls that saved a round trip.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from django.conf import settings
+
+from ai.circuit import CLOSED
+from ai.metrics import PREFETCH_HITS, PREFETCHES
+
+logger = logging.getLogger(__name__)
+
+
+# Prefetched movie IDs remembered until their details are looked up
+REMEMBER = 1000
+
+
+class TokenBucket:
+    """Allows `rate` takes per second on average, up to `burst` at once. Not thread-safe."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class Prefetcher:
+    """
+    Args:
+        workers (int): Background threads fetching details.
+        max_pending (int): Prefetches queued or running at once.
+        rate (float): Prefetches started per second, on average.
+        burst (int): Prefetches that may start at once.
+    """
+
+    def __init__(self, workers, max_pending, rate, burst):
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="tmdb-prefetch")
+        self._max_pending = max(max_pending, 1)
+        self._bucket = TokenBucket(rate, burst)
+        self._pending = {}
+        self._fetched = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, movie_ids):
+        """Queue prefetches of `movie_ids`; returns how many were queued."""
+        from tmdb.client import get_tmdb_breaker, is_details_cached
+
+        if get_tmdb_breaker().state != CLOSED:
+            PREFETCHES.labels("dropped").inc(len(movie_ids))
+            return 0
+        queued = 0
+        for movie_id in movie_ids:
+            if is_details_cached(movie_id):
+                PREFETCHES.labels("cached").inc()
+                continue
+            with self._lock:
+                if movie_id in self._pending:
+                    continue
+                if len(self._pending) >= self._max_pending or not self._bucket.take():
+                    PREFETCHES.labels("dropped").inc()
+                    continue
+                # _fetch removes the entry under the same lock, so it can't finish first
+                self._pending[movie_id] = self._pool.submit(self._fetch, movie_id)
+                queued += 1
+        return queued
+
+    def _fetch(self, movie_id):
+        from tmdb.client import fetch_details, is_details_cached
+
+        outcome = "fetched"
+        try:
+            if is_details_cached(movie_id):
+                outcome = "cached"
+            else:
+                fetch_details(movie_id)
+        except Exception as e:
+            outcome = "failed"
+            logger.debug("Prefetch of movie %s failed: %s", movie_id, e)
+        with self._lock:
+            self._pending.pop(movie_id, None)
+            if outcome == "fetched":
+                self._fetched[movie_id] = time.monotonic()
+                if len(self._fetched) > REMEMBER:
+                    self._fetched.popitem(last=False)
+        PREFETCHES.labels(outcome).inc()
+
+    def claim(self, movie_id):
+        """
+        Call before looking up a movie's details. Cancels its prefetch if still
+        queued and waits for it if running.
+
+        Returns:
+            bool: True when a prefetch fetched it and this is the first lookup since.
+        """
+        with self._lock:
+            future = self._pending.get(movie_id)
+            if future is not None and future.cancel():
+                del self._pending[movie_id]
+                PREFETCHES.labels("cancelled").inc()
+                future = None
+        if future is not None:
+            try:
+                future.result(timeout=settings.TMDB_TIMEOUT)
+            except (CancelledError, TimeoutError):
+                pass
+        with self._lock:
+            hit = self._fetched.pop(movie_id, None) is not None
+        if hit:
+            PREFETCH_HITS.inc()
+        return hit
+
+    def shutdown(self):
+        """Cancel queued prefetches and stop the pool without waiting for running ones."""
+        with self._lock:
+            cancelled = sum(future.cancel() for future in self._pending.values())
+            self._pending.clear()
+        if cancelled:
+            PREFETCHES.labels("cancelled").inc(cancelled)
+        self._pool.shutdown(wait=False)
+
+
+# -----------------------------
+# Process-wide prefetcher
+# -----------------------------
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = Prefetcher(
+                    workers=settings.TMDB_PREFETCH_WORKERS,
+                    max_pending=settings.TMDB_PREFETCH_MAX_PENDING,
+                    rate=settings.TMDB_PREFETCH_RATE,
+                    burst=settings.TMDB_PREFETCH_TOP_K,
+                )
+    return _prefetcher
+
+
+def reset_prefetcher():
+    """Cancel pending prefetches and drop the prefetcher (e.g. after changing settings)."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is not None:
+            _prefetcher.shutdown()
+        _prefetcher = None
+
+
+def prefetch_details(movie_ids):
+    """
+    Prefetch details of the first TMDB_PREFETCH_TOP_K movies in the background.
+
+    Args:
+        movie_ids (list[int]): TMDB IDs in result order.
+
+    Returns:
+        int: Prefetches queued; 0 when prefetching or the TMDB cache is disabled.
+    """
+    top_k = settings.TMDB_PREFETCH_TOP_K
+    if top_k <= 0 or not settings.TMDB_CACHE_TTL:
+        return 0
+    return get_prefetcher().submit([movie_id for movie_id in movie_ids[:top_k] if movie_id])
+
+
+def claim(movie_id):
+    """Prefetcher.claim() on the process-wide prefetcher, if one was started."""
+    prefetcher = _prefetcher
+    if prefetcher is None:
+        return False
+    return prefetcher.claim(movie_id)